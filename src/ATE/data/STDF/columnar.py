@@ -0,0 +1,262 @@
+'''
+Created on Oct 18, 2026
+
+Columnar (numpy) access to the high volume records of an STDF file.
+
+Instead of creating an object per record, the fixed part of all records of
+one type is decoded in one go into a numpy structured array.
+
+With an index (see ATE.data.STDF.indexing) the PTR results of all parts are
+scattered in one go into a part x test matrix (see part_test_matrix).
+'''
+import struct
+from array import array
+
+import numpy as np
+
+from ATE.utils.magicnumber import is_compressed_file
+from ATE.utils.seekable import seekable_file
+from ATE.data.STDF.records import PTR, PRR, STDFError, records_from_mmap
+from ATE.data.STDF.utils import records_from_file
+
+PTR_prefix_size = 12 # TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG & RESULT
+PRR_prefix_size = 13 # HEAD_NUM, SITE_NUM, PART_FLG, NUM_TEST, HARD_BIN, SOFT_BIN, X_COORD & Y_COORD (V4)
+
+PTR_invalid_result = 0x12 # TEST_FLG bit 1 (RESULT is not valid) or bit 4 (test not executed)
+PRR_failed = 0x18         # PART_FLG bit 3 (part failed) or bit 4 (no pass/fail indication)
+
+def ptr_dtype(endian):
+    '''
+    returns the numpy structured dtype of the fixed (12 byte) prefix of a PTR for endian.
+    Note : the prefix is the same for V3 and V4.
+    '''
+    if endian not in ['<', '>']:
+        raise STDFError("ptr_dtype(%s) : unsupported endian" % endian)
+    return np.dtype([('TEST_NUM', '%su4' % endian),
+                     ('HEAD_NUM', 'u1'),
+                     ('SITE_NUM', 'u1'),
+                     ('TEST_FLG', 'u1'),
+                     ('PARM_FLG', 'u1'),
+                     ('RESULT',   '%sf4' % endian)])
+
+def ptr_limits(ptr):
+    '''
+    returns a dictionary with the (OPT_FLAG decoded) limit information of the PTR object ptr.
+
+    Everything that OPT_FLAG marks as invalid or not present (or that is not in the record) is NaN,
+    see the (compiled) Field Present Expressions of PTR and STDR.is_present.
+    '''
+    def valid(FieldID):
+        if FieldID not in ptr.fields or not ptr.is_present(FieldID):
+            return np.nan
+        value = ptr.get_value(FieldID)
+        if value == None:
+            return np.nan
+        return value
+
+    retval = {}
+    retval['TEST_TXT'] = ptr.get_value('TEST_TXT')
+    retval['UNITS'] = ptr.get_value('UNITS')
+    retval['RES_SCAL'] = valid('RES_SCAL')
+    retval['LLM_SCAL'] = valid('LLM_SCAL')
+    retval['HLM_SCAL'] = valid('HLM_SCAL')
+    retval['LO_LIMIT'] = valid('LO_LIMIT')
+    retval['HI_LIMIT'] = valid('HI_LIMIT')
+    retval['LO_SPEC'] = valid('LO_SPEC')
+    retval['HI_SPEC'] = valid('HI_SPEC')
+    return retval
+
+def ptr_columns(FileName):
+    '''
+    Decodes all PTR's in FileName into numpy arrays.
+
+    returns a tuple (columns, limits) where :
+        columns is a numpy structured array (see ptr_dtype) with one element per PTR (in file order)
+        limits is a dictionary (TEST_NUM as key) holding the ptr_limits of the *first* PTR of each test
+
+    Uncompressed files are memory mapped, the PTR offsets are gathered in one pass over the
+    record headers and all prefixes are decoded with a column wise gather (see record_prefixes). Compressed files
+    are streamed, and the prefixes collected on the way.
+    Note : PTR's that are shorter than the prefix are zero padded.
+    '''
+    if is_compressed_file(FileName):
+        return _ptr_columns_from_stream(FileName)
+    return _ptr_columns_from_mmap(FileName)
+
+def _ptr_columns_from_mmap(FileName):
+    limits = {}
+    offsets = array('Q')
+    with records_from_mmap(FileName, ['PTR']) as stdf:
+        endian = stdf.endian
+        TEST_NUM_unpack = struct.Struct('%sI' % stdf.endian).unpack_from
+        for offset, _, _, REC in stdf:
+            offsets.append(offset)
+            if len(REC) >= 8:
+                TEST_NUM = TEST_NUM_unpack(REC, 4)[0]
+                if TEST_NUM not in limits:
+                    limits[TEST_NUM] = ptr_limits(PTR(stdf.version, stdf.endian, bytes(REC)))
+            REC.release()
+    dtype = ptr_dtype(endian)
+    if len(offsets) == 0:
+        return np.zeros(0, dtype=dtype), limits
+    prefixes = record_prefixes(FileName, np.frombuffer(offsets, dtype=np.uint64), 4 + PTR_prefix_size)
+    del offsets
+    REC_LEN = prefixes[:, :2].copy().view('%su2' % endian).ravel()
+    for column in range(PTR_prefix_size): # a short PTR
+        prefixes[REC_LEN <= column, 4 + column] = 0
+    return np.ascontiguousarray(prefixes[:, 4:]).view(dtype).ravel(), limits
+
+def _ptr_columns_from_stream(FileName):
+    limits = {}
+    prefixes = bytearray()
+    padding = bytes(PTR_prefix_size)
+    stdf = records_from_file(FileName)
+    if stdf.fd == None:
+        raise STDFError("ptr_columns(%s) : not a (supported) STDF file" % FileName)
+    dtype = ptr_dtype(stdf.endian)
+    TEST_NUM_unpack = struct.Struct('%sI' % stdf.endian).unpack_from
+    for REC_LEN, REC_TYP, REC_SUB, REC in stdf:
+        if (REC_TYP, REC_SUB) != (15, 10):
+            continue
+        if REC_LEN >= PTR_prefix_size:
+            prefixes += REC[4:4 + PTR_prefix_size]
+        else:
+            prefixes += REC[4:]
+            prefixes += padding[REC_LEN:]
+        if REC_LEN >= 4:
+            TEST_NUM = TEST_NUM_unpack(REC, 4)[0]
+            if TEST_NUM not in limits:
+                limits[TEST_NUM] = ptr_limits(PTR(stdf.version, stdf.endian, bytes(REC)))
+    return np.frombuffer(bytes(prefixes), dtype=dtype), limits
+
+def header_dtype(endian):
+    '''
+    returns the numpy structured dtype of the (4 byte) record header for endian.
+    '''
+    return [('REC_LEN', '%su2' % endian), ('REC_TYP', 'u1'), ('REC_SUB', 'u1')]
+
+def prr_dtype(endian):
+    '''
+    returns the numpy structured dtype of the header and the fixed (13 byte) prefix of a V4 PRR for endian.
+    '''
+    if endian not in ['<', '>']:
+        raise STDFError("prr_dtype(%s) : unsupported endian" % endian)
+    return np.dtype(header_dtype(endian) + 
+                    [('HEAD_NUM', 'u1'),
+                     ('SITE_NUM', 'u1'),
+                     ('PART_FLG', 'u1'),
+                     ('NUM_TEST', '%su2' % endian),
+                     ('HARD_BIN', '%su2' % endian),
+                     ('SOFT_BIN', '%su2' % endian),
+                     ('X_COORD',  '%si2' % endian),
+                     ('Y_COORD',  '%si2' % endian)])
+
+def record_prefixes(FileName, offsets, size, checkpoints=None):
+    '''
+    returns a numpy uint8 array of shape (len(offsets), size) with the first size bytes (header included) 
+    of the records at offsets in FileName. 
+    Note : the bytes after a (short) record are not cleared, use REC_LEN to know what is valid.
+
+    Uncompressed files are memory mapped and gathered one byte column at the time (no (offsets x size)
+    index array), compressed files are read with a seekable_file (with the checkpoints of the index).
+    '''
+    offsets = np.asarray(offsets, dtype=np.uint64)
+    if len(offsets) == 0:
+        return np.zeros((0, size), dtype=np.uint8)
+    if is_compressed_file(FileName):
+        if checkpoints is not None and len(checkpoints) == 0:
+            checkpoints = None
+        prefixes = [None] * len(offsets)
+        with seekable_file(FileName, checkpoints) as fd:
+            for position in np.argsort(offsets, kind='stable'): # in file order
+                fd.seek(int(offsets[position]))
+                prefixes[position] = fd.read(size).ljust(size, b'\x00')
+        return np.frombuffer(b''.join(prefixes), dtype=np.uint8).reshape(-1, size)
+    prefixes = np.zeros((len(offsets), size), dtype=np.uint8)
+    with records_from_mmap(FileName) as stdf:
+        data = np.frombuffer(stdf.view, dtype=np.uint8)
+        positions = offsets.astype(np.int64)
+        clip = int(positions.max()) + size > stdf.size # only a record at the end can be short
+        for column in range(size):
+            if clip:
+                inside = positions < stdf.size
+                prefixes[inside, column] = data[positions[inside]]
+            else:
+                prefixes[:, column] = data[positions]
+            positions += 1
+        del data
+    return prefixes
+
+def part_test_matrix(FileName, index, catalog, dtype=np.float32):
+    '''
+    Builds the part x test result matrix of FileName, from its index (in array form, see 
+    ATE.data.STDF.indexing.index_arrays) and its test catalog (see ATE.data.STDF.indexing.test_catalog)
+
+    returns a dictionary with :
+        'RESULT'   : a (parts, tests) matrix of dtype, the columns in catalog order, NaN if a part has no (valid) result for a test
+        'TEST_NUM' : the TEST_NUM of the columns
+        'HEAD_NUM', 'SITE_NUM' : per part (from the index)
+        'PART_FLG', 'HARD_BIN', 'SOFT_BIN', 'X_COORD', 'Y_COORD' : per part, from the PRR (the missing values if there is no PRR)
+        'PF'       : per part, True if the part passed (see PRR_failed)
+
+    The PTR's of all parts are found with the index, only their header and fixed prefix is read (see record_prefixes)
+    and all results are scattered in the matrix in one go. A result is NaN if TEST_FLG says so (see PTR_invalid_result),
+    if a test is repeated in a part, the last result is kept. The columns of MPR's and FTR's are NaN.
+    '''
+    endian = index['endian']
+    checkpoints = index.get('checkpoints')
+    parts = len(index['part_head'])
+    tests = len(catalog)
+    retval = {'RESULT' : np.full((parts, tests), np.nan, dtype=dtype),
+              'TEST_NUM' : np.asarray(catalog['TEST_NUM']),
+              'HEAD_NUM' : np.array(index['part_head']),
+              'SITE_NUM' : np.array(index['part_site'])}
+    pointers = index['part_pointers'].astype(np.int64)
+    part_offsets = index['offsets'][index['part_records']]
+    rows = np.repeat(np.arange(parts), np.diff(pointers))
+    codes = index['codes'][index['part_records']]
+    # results
+    is_ptr = codes == 0x0F0A
+    ptr_dtype_with_header = np.dtype(header_dtype(endian) + ptr_dtype(endian).descr)
+    ptrs = record_prefixes(FileName, part_offsets[is_ptr], 4 + PTR_prefix_size, checkpoints).view(ptr_dtype_with_header).ravel()
+    columns = np.minimum(np.searchsorted(catalog['TEST_NUM'], ptrs['TEST_NUM']), max(tests - 1, 0))
+    valid = ((ptrs['REC_LEN'] >= PTR_prefix_size) & 
+             (ptrs['TEST_FLG'] & PTR_invalid_result == 0))
+    if tests != 0:
+        valid &= catalog['TEST_NUM'][columns] == ptrs['TEST_NUM']
+    retval['RESULT'][rows[is_ptr][valid], columns[valid]] = ptrs['RESULT'][valid]
+    # part results
+    last = pointers[1:] - 1
+    has_prr = np.zeros(parts, dtype=bool)
+    if parts != 0:
+        has_prr = codes[last] == 0x0514
+    prr_offsets = part_offsets[last[has_prr]]
+    missing = {'PART_FLG' : 0x11, 'HARD_BIN' : 0, 'SOFT_BIN' : 65535, 'X_COORD' : -32768, 'Y_COORD' : -32768}
+    types = {'PART_FLG' : np.uint8, 'HARD_BIN' : np.uint16, 'SOFT_BIN' : np.uint16, 'X_COORD' : np.int16, 'Y_COORD' : np.int16}
+    for name in missing:
+        retval[name] = np.full(parts, missing[name], dtype=types[name])
+    if index['version'] == 'V4':
+        prrs = record_prefixes(FileName, prr_offsets, 4 + PRR_prefix_size, checkpoints).view(prr_dtype(endian)).ravel()
+        for name in missing:
+            end = prr_dtype(endian).fields[name][1] + prr_dtype(endian).fields[name][0].itemsize - 4
+            present = prrs['REC_LEN'] >= end
+            retval[name][np.nonzero(has_prr)[0][present]] = prrs[name][present]
+    else: # the V3 PRR has a variable length field before the bins, decode the records in one ordered pass
+        from ATE.data.STDF.indexing import indexed_records # indexing imports this module
+        rows = np.nonzero(has_prr)[0]
+        records = indexed_records(FileName, checkpoints)
+        try:
+            PRRs = {}
+            for position in np.argsort(prr_offsets, kind='stable'):
+                PRRs[position] = PRR(index['version'], endian, records[prr_offsets[position]])
+        finally:
+            records.close()
+        for position, prr in PRRs.items():
+            row = rows[position]
+            for name in missing:
+                value = prr.get_value(name)
+                if name == 'PART_FLG':
+                    value = int(''.join(value), 2)
+                retval[name][row] = value
+    retval['PF'] = retval['PART_FLG'] & PRR_failed == 0
+    return retval
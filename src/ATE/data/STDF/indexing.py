@@ -0,0 +1,733 @@
+'''
+Created on Oct 18, 2026
+
+Indexing of (big) STDF files.
+
+An index holds the offsets of all records (per record type) and the offsets
+of the records that belong to each part (PIR ... PRR).
+
+Uncompressed files are memory mapped and cut in chunks on record boundaries,
+the chunks are indexed in parallel (one process per chunk) and the partial
+indexes are merged, carrying the parts that are open (PIR seen, but no PRR yet)
+across the chunk edges.
+
+Compressed files are indexed in one sequential pass, that also gathers the 
+checkpoints (see ATE.utils.seekable) to jump into the compressed file later on.
+'''
+import os
+import struct
+import pickle
+import hashlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from tqdm import tqdm
+
+from ATE.utils.magicnumber import is_compressed_file, extension_from_magic_number_in_file
+from ATE.utils.compression import supported_compressions_extensions
+from ATE.data.STDF.records import STDFError, records_from_mmap, create_record_object, id_to_ts
+from ATE.data.STDF.utils import (ts_to_id, HEAD_NUM_and_SITE_NUM_from_record, HEAD_NUM_and_SITE_NUM_offsets,
+                                 records_from_file, endian_and_version_from_file)
+from ATE.utils.compression import get_deflated_file_size
+from ATE.utils.seekable import seekable_file
+from ATE.data.STDF.columnar import ptr_limits
+
+part_records = {(5, 10) : 'PIR', (5, 20) : 'PRR', (15, 10) : 'PTR', (15, 15) : 'MPR', (15, 20) : 'FTR'}
+test_codes = [0x0F0A, 0x0F0F, 0x0F14] # PTR, MPR & FTR as REC_TYP * 256 + REC_SUB
+
+minimum_chunk_size = 16 * 1024 * 1024 # smaller chunks are not worth a process
+
+progress_step = 1024 * 1024 # update the progress bar per MB
+
+def record_boundaries(FileName, chunks):
+    '''
+    Cuts the (uncompressed) STDF file FileName in (at most) chunks pieces on record boundaries.
+
+    This is a header-only pass : only REC_LEN is read from each record header,
+    and the walk stops as soon as the last boundary is found.
+    returns a list of offsets, the first is 0, the last is the file size.
+    '''
+    with records_from_mmap(FileName) as stdf:
+        size = stdf.size
+        targets = [(size * chunk) // chunks for chunk in range(1, chunks)]
+        boundaries = [0]
+        REC_LEN_unpack = struct.Struct('%sH' % stdf.endian).unpack_from
+        view = stdf.view
+        offset = 0
+        for target in targets:
+            if target <= boundaries[-1]:
+                continue
+            while offset < target and offset + 4 <= size:
+                offset += REC_LEN_unpack(view, offset)[0] + 4
+            if offset >= size:
+                break
+            boundaries.append(offset)
+        boundaries.append(size)
+    return boundaries
+
+def index_records(FileName, version, endian, records):
+    '''
+    Indexes the records (an iterator of (offset, (REC_TYP, REC_SUB), REC) tuples) of FileName.
+
+    returns a partial index, a dictionary with :
+        'records' : {REC_ID : array of offsets}
+        'parts'   : [(HEAD_NUM, SITE_NUM, array of offsets, closed), ...] the parts that start (PIR) in these records
+        'carried' : {(HEAD_NUM, SITE_NUM) : (array of offsets, closed)} the records of parts that started before
+        'tests'   : (array of offsets, array of TEST_NUM) of the PTR's, MPR's and FTR's
+    where closed indicates that the PRR of the part is in these records.
+    '''
+    partial_records = {}
+    parts = []
+    carried = {}
+    test_offsets = array('Q')
+    test_numbers = array('I')
+    PIP = {} # parts in process (in these records)
+    TS2ID = ts_to_id(version)
+    TEST_NUM_unpack = struct.Struct('%sI' % endian).unpack_from
+    for offset, TS, REC in records:
+        if TS in TS2ID:
+            REC_ID = TS2ID[TS]
+        else:
+            REC_ID = TS
+        if REC_ID not in partial_records:
+            partial_records[REC_ID] = array('Q')
+        partial_records[REC_ID].append(offset)
+        if TS not in part_records:
+            continue
+        if len(REC) >= 10:
+            HEAD_SITE = HEAD_NUM_and_SITE_NUM_from_record(REC)
+            if TS[0] == 15:
+                test_offsets.append(offset)
+                test_numbers.append(TEST_NUM_unpack(REC, 4)[0])
+        else: # short record, the missing defaults apply
+            obj = create_record_object(version, endian, TS, bytes(REC), True)
+            HEAD_SITE = (obj.get_value('HEAD_NUM'), obj.get_value('SITE_NUM'))
+            if TS[0] == 15:
+                test_offsets.append(offset)
+                test_numbers.append(obj.get_value('TEST_NUM'))
+        if part_records[TS] == 'PIR':
+            if HEAD_SITE in PIP:
+                raise STDFError("index_records(%s) : PIR @ %s for a part in process" % (FileName, offset))
+            part = (HEAD_SITE[0], HEAD_SITE[1], array('Q', [offset]), False)
+            PIP[HEAD_SITE] = len(parts)
+            parts.append(part)
+        elif HEAD_SITE in PIP:
+            parts[PIP[HEAD_SITE]][2].append(offset)
+            if part_records[TS] == 'PRR':
+                HEAD_NUM, SITE_NUM, offsets, _ = parts[PIP[HEAD_SITE]]
+                parts[PIP[HEAD_SITE]] = (HEAD_NUM, SITE_NUM, offsets, True)
+                del PIP[HEAD_SITE]
+        else: # belongs to a part that started before these records
+            if HEAD_SITE not in carried:
+                carried[HEAD_SITE] = (array('Q'), False)
+            offsets, closed = carried[HEAD_SITE]
+            if closed:
+                raise STDFError("index_records(%s) : %s @ %s outside of a part" % (FileName, part_records[TS], offset))
+            offsets.append(offset)
+            if part_records[TS] == 'PRR':
+                carried[HEAD_SITE] = (offsets, True)
+    return {'records' : partial_records, 'parts' : parts, 'carried' : carried, 'tests' : (test_offsets, test_numbers)}
+
+def index_chunk(FileName, start, end):
+    '''
+    Indexes the records of the uncompressed FileName from offset start up to (not including) offset end.
+    start and end must be on record boundaries (see record_boundaries).
+    returns a partial index (see index_records)
+    '''
+    with records_from_mmap(FileName) as stdf:
+        REC_LEN_unpack = struct.Struct('%sH' % stdf.endian).unpack_from
+        size = min(end, stdf.size)
+
+        def records(view):
+            offset = start
+            while offset + 4 <= size:
+                REC_LEN = REC_LEN_unpack(view, offset)[0]
+                if offset + 4 + REC_LEN > size: # a truncated trailing record
+                    break
+                REC = view[offset:offset + REC_LEN + 4]
+                yield offset, (view[offset + 2], view[offset + 3]), REC
+                REC.release()
+                offset += REC_LEN + 4
+
+        partial = index_records(FileName, stdf.version, stdf.endian, records(stdf.view))
+    return partial
+
+def index_stream(FileName, progress_bar=None):
+    '''
+    Indexes all records of the (compressed) FileName in one sequential pass.
+    returns a partial index (see index_records) with the checkpoints of the compressed file added.
+    '''
+    stdf = records_from_file(FileName)
+    if stdf.fd == None:
+        raise STDFError("index_stream(%s) : not a (supported) STDF file" % FileName)
+
+    def records():
+        offset = 0
+        for REC_LEN, REC_TYP, REC_SUB, REC in stdf:
+            yield offset, (REC_TYP, REC_SUB), REC
+            offset += REC_LEN + 4
+            if progress_bar != None and offset - progress_bar.n >= progress_step:
+                progress_bar.update(offset - progress_bar.n)
+
+    partial = index_records(FileName, stdf.version, stdf.endian, records())
+    partial['checkpoints'] = stdf.fd.checkpoint_table()
+    return partial
+
+def merge_indexes(index, partial_indexes, PIP=None):
+    '''
+    Merges the partial indexes (of consecutive chunks, in order) into index.
+    The parts are numbered (from 1 on) in the order of their PIR's.
+    The offsets are kept in arrays (8 bytes per offset), not in lists of Python integers.
+    PIP holds the parts in process {(HEAD_NUM, SITE_NUM) : part number}, pass the same 
+    dictionary to merge the partial indexes of the next chunks into index later on.
+    '''
+    records = index['records']
+    parts = index['parts']
+    part_sites = index['part_sites']
+    test_offsets, test_numbers = index['tests']
+    if PIP == None:
+        PIP = {} # parts in process
+    PN = len(parts) + 1
+    for partial in partial_indexes:
+        for REC_ID in partial['records']:
+            if REC_ID not in records:
+                records[REC_ID] = partial['records'][REC_ID]
+            else:
+                records[REC_ID].extend(partial['records'][REC_ID])
+        for HEAD_SITE, (offsets, closed) in partial['carried'].items():
+            if HEAD_SITE not in PIP:
+                raise STDFError("merge_indexes : records @ %s outside of a part" % offsets[0])
+            parts[PIP[HEAD_SITE]].extend(offsets)
+            if closed:
+                del PIP[HEAD_SITE]
+        for HEAD_NUM, SITE_NUM, offsets, closed in partial['parts']:
+            if (HEAD_NUM, SITE_NUM) in PIP:
+                raise STDFError("merge_indexes : PIR @ %s for a part in process" % offsets[0])
+            parts[PN] = offsets
+            part_sites[PN] = (HEAD_NUM, SITE_NUM)
+            if not closed:
+                PIP[(HEAD_NUM, SITE_NUM)] = PN
+            PN += 1
+        test_offsets.extend(partial['tests'][0])
+        test_numbers.extend(partial['tests'][1])
+    return index
+
+def open_STDF(FileName, checkpoints=None):
+    '''
+    returns a (binary, read-only) file object on the uncompressed contents of FileName,
+    compressed files are opened as a seekable_file (with the checkpoints from the index if available)
+    '''
+    if not is_compressed_file(FileName):
+        return open(FileName, 'rb')
+    ext = extension_from_magic_number_in_file(FileName)
+    if len(ext) != 1 or ext[0] not in supported_compressions_extensions:
+        raise STDFError("open_STDF(%s) : unsupported compression" % FileName)
+    compression = supported_compressions_extensions[ext[0]]
+    if compression in ['lzma', 'bz2', 'gzip']:
+        if checkpoints is not None and len(checkpoints) == 0:
+            checkpoints = None
+        return seekable_file(FileName, checkpoints)
+    raise STDFError("open_STDF(%s) : the %s compression is supported but not implemented" % (FileName, compression))
+
+class indexed_records(object):
+    '''
+    Dictionary like access (offset as key) to the records of the STDF file FileName,
+    so that an index doesn't need to hold the records themself.
+    Uncompressed files are memory mapped, compressed files are read by seeking in
+    the decompressed stream, from the nearest checkpoint on (pass index['checkpoints']
+    to skip the discovery of the checkpoints).
+    '''
+    def __init__(self, FileName, checkpoints=None):
+        self.stdf = None
+        self.fd = None
+        if is_compressed_file(FileName):
+            endian, _ = endian_and_version_from_file(FileName)
+            self.header = struct.Struct('%sH' % endian)
+            self.fd = open_STDF(FileName, checkpoints)
+        else:
+            self.stdf = records_from_mmap(FileName)
+
+    def __getitem__(self, offset):
+        offset = int(offset)
+        if self.stdf != None:
+            try:
+                return bytes(self.stdf.record_at(offset))
+            except STDFError:
+                raise KeyError(offset)
+        self.fd.seek(offset)
+        header = self.fd.read(4)
+        if len(header) != 4:
+            raise KeyError(offset)
+        REC_LEN = self.header.unpack_from(header)[0]
+        body = self.fd.read(REC_LEN)
+        if len(body) != REC_LEN:
+            raise KeyError(offset)
+        return header + body
+
+    def close(self):
+        if self.stdf != None:
+            self.stdf.close()
+        if self.fd != None:
+            self.fd.close()
+
+def index_STDF(FileName, workers=None, progress=False):
+    '''
+    Indexes the STDF file FileName, uncompressed files are indexed with workers processes 
+    (default = number of CPU's), compressed files are indexed in one sequential pass.
+
+    returns a dictionary with :
+        'version'    : the STDF version
+        'endian'     : the endian of the file
+        'records'    : {REC_ID : array of offsets}
+        'parts'      : {part number : array of offsets} the records from PIR to PRR of each part
+        'part_sites' : {part number : (HEAD_NUM, SITE_NUM)}
+        'tests'      : (array of offsets, array of TEST_NUM) of the PTR's, MPR's and FTR's
+        'checkpoints': the checkpoints of a compressed file (see ATE.utils.seekable), empty otherwise
+    The records themself are not held, use indexed_records(FileName, index['checkpoints'])[offset]
+    '''
+    if not isinstance(FileName, str) or not os.path.isfile(FileName):
+        raise STDFError("index_STDF(%s) : not an existing file" % FileName)
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise STDFError("index_STDF(%s, %s) : need at least one worker" % (FileName, workers))
+    if progress:
+        desc = "Indexing STDF file '%s'" % os.path.basename(FileName)
+        progress_bar = tqdm(total=get_deflated_file_size(FileName), desc=desc, leave=False, unit='b')
+    else:
+        progress_bar = None
+    partial_indexes = []
+    checkpoints = np.zeros((0, 4), dtype=np.uint64)
+    if is_compressed_file(FileName):
+        partial_indexes.append(index_stream(FileName, progress_bar))
+        checkpoints = partial_indexes[-1]['checkpoints']
+        endian, version = endian_and_version_from_file(FileName)
+    else:
+        with records_from_mmap(FileName) as stdf:
+            endian = stdf.endian
+            version = stdf.version
+            size = stdf.size
+        chunks = max(1, min(workers * 4, size // minimum_chunk_size))
+        boundaries = record_boundaries(FileName, chunks)
+        spans = list(zip(boundaries[:-1], boundaries[1:]))
+        if workers == 1 or len(spans) == 1:
+            for start, end in spans:
+                partial_indexes.append(index_chunk(FileName, start, end))
+                if progress:
+                    progress_bar.update(end - start)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(index_chunk, FileName, start, end) for start, end in spans]
+                for (start, end), future in zip(spans, futures):
+                    partial_indexes.append(future.result())
+                    if progress:
+                        progress_bar.update(end - start)
+    if progress:
+        progress_bar.close()
+    index = {'version' : version, 'endian' : endian, 'records' : {}, 'parts' : {}, 'part_sites' : {}, 'tests' : (array('Q'), array('I')),
+             'checkpoints' : checkpoints}
+    return merge_indexes(index, partial_indexes)
+
+class following_index(object):
+    '''
+    Incremental index (see index_STDF) of the STDF file FileName while it is still being written.
+
+    Each update indexes the records that are appended since the previous update, from the last
+    complete record boundary on (a truncated trailing record is picked up by the next update),
+    so polling a growing file only costs the new bytes, not a re-scan.
+    The parts that have no PRR yet are in parts_in_process {(HEAD_NUM, SITE_NUM) : part number}.
+    '''
+    def __init__(self, FileName):
+        if not isinstance(FileName, str) or not os.path.isfile(FileName):
+            raise STDFError("following_index(%s) : not an existing file" % FileName)
+        self.FileName = FileName
+        self.stdf = records_from_file(FileName, follow=True)
+        if self.stdf.fd == None:
+            raise STDFError("following_index(%s) : not a (supported) STDF file" % FileName)
+        self.compressed = is_compressed_file(FileName)
+        self.parts_in_process = {}
+        self.index = {'version' : self.stdf.version, 'endian' : self.stdf.endian, 
+                      'records' : {}, 'parts' : {}, 'part_sites' : {}, 'tests' : (array('Q'), array('I')),
+                      'checkpoints' : np.zeros((0, 4), dtype=np.uint64)}
+
+    @property
+    def boundary(self):
+        '''
+        the offset of the last complete record boundary (what is indexed so far)
+        '''
+        return self.stdf.boundary
+
+    def update(self):
+        '''
+        Indexes the records that are appended since the previous update.
+        returns the number of new records.
+        '''
+        stdf = self.stdf
+        start = stdf.boundary
+
+        def records():
+            offset = start
+            for REC_LEN, REC_TYP, REC_SUB, REC in stdf:
+                yield offset, (REC_TYP, REC_SUB), REC
+                offset += REC_LEN + 4
+
+        partial = index_records(self.FileName, stdf.version, stdf.endian, records())
+        merge_indexes(self.index, [partial], self.parts_in_process)
+        if self.compressed:
+            self.index['checkpoints'] = stdf.fd.checkpoint_table()
+        return sum([len(offsets) for offsets in partial['records'].values()])
+
+test_record_types = {(15, 10) : 'P', (15, 15) : 'M', (15, 20) : 'F'} # PTR, MPR & FTR
+
+catalog_limits = ['LO_LIMIT', 'HI_LIMIT', 'LO_SPEC', 'HI_SPEC', 'RES_SCAL', 'LLM_SCAL', 'HLM_SCAL']
+
+def test_catalog(FileName, index=None):
+    '''
+    returns the test catalog of FileName, a numpy structured array (sorted on TEST_NUM) with one row per test :
+        'TEST_NUM', 'TEST_TYP' ('P', 'M' or 'F'), 'TEST_NAM', 'UNITS' and the catalog_limits (NaN if not valid)
+    
+    index is the index of FileName in array form (see index_arrays), if None it is loaded from the sidecar (or made).
+    Only the first PTR, MPR or FTR of each test (see 'test_numbers' in the index) and the TSR's are decoded :
+    TEST_NUM, TEST_NAM and TEST_TYP come from the first TSR of a test, or from the test record itself (TEST_TXT)
+    if there is no TSR (or it has no name). UNITS, limits and scaling come from the test record (OPT_FLAG decoded).
+    '''
+    if index == None:
+        index = load_STDF_index(FileName)
+        if index == None:
+            index = index_arrays(index_STDF(FileName))
+    if 'test_catalog' in index:
+        return index['test_catalog']
+    version = index['version']
+    endian = index['endian']
+    tests = {}
+    numbers, first = np.unique(index['test_numbers'], return_index=True)
+    records = indexed_records(FileName, index.get('checkpoints'))
+    try:
+        for offset in index['offsets'][test_rows(index)[np.sort(first)]]: # in file order
+            REC = records[offset]
+            obj = create_record_object(version, endian, (REC[2], REC[3]), REC)
+            test = {'TEST_TYP' : test_record_types[(REC[2], REC[3])], 
+                    'TEST_NAM' : obj.get_value('TEST_TXT'), 
+                    'UNITS' : ''}
+            if test['TEST_TYP'] != 'F':
+                limits = ptr_limits(obj)
+                test['UNITS'] = limits['UNITS']
+                for name in catalog_limits:
+                    test[name] = limits[name]
+            tests[obj.get_value('TEST_NUM')] = test
+        if 'TSR' in ts_to_id(version).values():
+            named = set()
+            for offset in record_offsets(index, 'TSR'):
+                tsr = create_record_object(version, endian, 'TSR', records[offset], True) # lazy, most are skipped
+                TEST_NUM = tsr.get_value('TEST_NUM')
+                if TEST_NUM in named:
+                    continue
+                named.add(TEST_NUM)
+                if TEST_NUM not in tests:
+                    tests[TEST_NUM] = {'TEST_TYP' : '', 'TEST_NAM' : '', 'UNITS' : ''}
+                TEST_NAM = tsr.get_value('TEST_NAM')
+                TEST_TYP = tsr.get_value('TEST_TYP')
+                if TEST_NAM != None and TEST_NAM.strip() != '':
+                    tests[TEST_NUM]['TEST_NAM'] = TEST_NAM
+                if TEST_TYP != None and TEST_TYP.strip() != '':
+                    tests[TEST_NUM]['TEST_TYP'] = TEST_TYP.strip().upper()
+    finally:
+        records.close()
+    TEST_NUMs = sorted(tests)
+    names = [tests[TEST_NUM]['TEST_NAM'] or '' for TEST_NUM in TEST_NUMs]
+    units = [tests[TEST_NUM]['UNITS'] or '' for TEST_NUM in TEST_NUMs]
+    dtype = [('TEST_NUM', 'u4'), ('TEST_TYP', 'U1'),
+             ('TEST_NAM', 'U%d' % max([1] + [len(name) for name in names])), 
+             ('UNITS', 'U%d' % max([1] + [len(unit) for unit in units]))] + [(name, 'f8') for name in catalog_limits]
+    catalog = np.zeros(len(TEST_NUMs), dtype=dtype)
+    catalog['TEST_NUM'] = TEST_NUMs
+    catalog['TEST_TYP'] = [tests[TEST_NUM]['TEST_TYP'][:1] for TEST_NUM in TEST_NUMs]
+    catalog['TEST_NAM'] = names
+    catalog['UNITS'] = units
+    for name in catalog_limits:
+        catalog[name] = [tests[TEST_NUM].get(name, np.nan) for TEST_NUM in TEST_NUMs]
+    return catalog
+
+sidecar_extension = '.idx'
+sidecar_magic = b'STDFIDX2'
+sidecar_alignment = 64
+fingerprint_size = 1024 * 1024
+
+def sidecar_name(FileName):
+    '''
+    returns the name of the index sidecar of FileName (next to it)
+    '''
+    return FileName + sidecar_extension
+
+def file_fingerprint(FileName):
+    '''
+    returns the md5 (hex) digest of the size, the first and the last MB of FileName.
+    (hashing the whole file would cost more than loading the index saves)
+    '''
+    size = os.path.getsize(FileName)
+    _hash = hashlib.md5(struct.pack('<Q', size))
+    with open(FileName, 'rb') as fd:
+        _hash.update(fd.read(fingerprint_size))
+        if size > fingerprint_size:
+            fd.seek(max(fingerprint_size, size - fingerprint_size))
+            _hash.update(fd.read(fingerprint_size))
+    return _hash.hexdigest()
+
+def index_arrays(index):
+    '''
+    Converts index (see index_STDF) in a dictionary with 'version', 'endian' and the numpy arrays :
+        'offsets'       : the offsets of all records (in file order)
+        'codes'         : REC_TYP * 256 + REC_SUB for all records
+        'part_pointers' : the parts as CSR, the records of part PN are the rows (in offsets and codes)
+        'part_records'    part_records[part_pointers[PN-1]:part_pointers[PN]]
+        'part_head'     : HEAD_NUM of each part
+        'part_site'     : SITE_NUM of each part
+        'test_numbers'  : the TEST_NUM of the PTR's, MPR's and FTR's (in file order, see test_rows)
+        'checkpoints'   : the checkpoints of a compressed file (one row per checkpoint, see ATE.utils.seekable)
+    The offsets are only held once, the parts refer to them by row (uint32 unless there are more than 2**32 records).
+    '''
+    ID2TS = id_to_ts(index['version'])
+    offsets = []
+    codes = []
+    for REC_ID in index['records']:
+        if isinstance(REC_ID, tuple):
+            REC_TYP, REC_SUB = REC_ID
+        else:
+            REC_TYP, REC_SUB = ID2TS[REC_ID]
+        offsets.append(np.asarray(index['records'][REC_ID], dtype=np.uint64))
+        codes.append(np.full(len(index['records'][REC_ID]), REC_TYP * 256 + REC_SUB, dtype=np.uint16))
+    if len(offsets) != 0:
+        offsets = np.concatenate(offsets)
+        codes = np.concatenate(codes)
+        order = np.argsort(offsets, kind='stable')
+        offsets = offsets[order]
+        codes = codes[order]
+    else:
+        offsets = np.zeros(0, dtype=np.uint64)
+        codes = np.zeros(0, dtype=np.uint16)
+    rows = np.uint32 if len(offsets) <= 0xFFFFFFFF else np.uint64
+    PNs = sorted(index['parts'])
+    part_pointers = np.zeros(len(PNs) + 1, dtype=rows)
+    part_pointers[1:] = np.cumsum([len(index['parts'][PN]) for PN in PNs])
+    if len(PNs) != 0:
+        part_offsets = np.concatenate([np.asarray(index['parts'][PN], dtype=np.uint64) for PN in PNs])
+        part_records = np.searchsorted(offsets, part_offsets).astype(rows)
+        del part_offsets
+    else:
+        part_records = np.zeros(0, dtype=rows)
+    part_head = np.array([index['part_sites'][PN][0] for PN in PNs], dtype=np.uint8)
+    part_site = np.array([index['part_sites'][PN][1] for PN in PNs], dtype=np.uint8)
+    test_offsets = np.asarray(index['tests'][0], dtype=np.uint64)
+    test_numbers = np.asarray(index['tests'][1], dtype=np.uint32)[np.argsort(test_offsets, kind='stable')]
+    checkpoints = np.asarray(index.get('checkpoints', np.zeros((0, 4))), dtype=np.uint64).reshape(-1, 4)
+    return {'version' : index['version'], 'endian' : index['endian'],
+            'offsets' : offsets, 'codes' : codes, 
+            'part_pointers' : part_pointers, 'part_records' : part_records, 'part_head' : part_head, 'part_site' : part_site,
+            'test_numbers' : test_numbers, 'checkpoints' : checkpoints}
+
+def save_STDF_index(FileName, index=None, workers=None):
+    '''
+    Saves the index of FileName (indexed now if None) in the sidecar next to it (see sidecar_name)
+    
+    The sidecar is a magic, the length of a pickled header (validation data and the 
+    array layout) and the header itself, followed by the raw (aligned) arrays of 
+    index_arrays and the test_catalog, so that load_STDF_index can memory map them.
+    The sidecar is written to a temporary file first, there are never half-written sidecars.
+    returns the name of the sidecar.
+    '''
+    if index == None:
+        index = index_STDF(FileName, workers)
+    arrays = index_arrays(index)
+    arrays['test_catalog'] = test_catalog(FileName, arrays)
+    del arrays['version'], arrays['endian']
+    stat = os.stat(FileName)
+    header = {'version' : index['version'],
+              'endian' : index['endian'],
+              'size' : stat.st_size,
+              'mtime' : stat.st_mtime_ns,
+              'fingerprint' : file_fingerprint(FileName),
+              'arrays' : {}}
+    position = 0
+    for name, data in arrays.items():
+        if data.dtype.names != None: # structured
+            header['arrays'][name] = (data.dtype.descr, data.shape, position)
+        else:
+            header['arrays'][name] = (data.dtype.str, data.shape, position)
+        position += -(-data.nbytes // sidecar_alignment) * sidecar_alignment
+    pickled_header = pickle.dumps(header)
+    start = -(-(len(sidecar_magic) + 4 + len(pickled_header)) // sidecar_alignment) * sidecar_alignment
+    sidecar = sidecar_name(FileName)
+    temporary = "%s.%s.tmp" % (sidecar, os.getpid())
+    try:
+        with open(temporary, 'wb') as fd:
+            fd.write(sidecar_magic)
+            fd.write(struct.pack('<I', len(pickled_header)))
+            fd.write(pickled_header)
+            for name, data in arrays.items():
+                fd.seek(start + header['arrays'][name][2])
+                fd.write(np.ascontiguousarray(data).tobytes())
+            fd.truncate(start + position)
+        os.replace(temporary, sidecar)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return sidecar
+
+def load_STDF_index(FileName, check_fingerprint=True):
+    '''
+    Loads the index of FileName from its sidecar (see save_STDF_index), the arrays are memory mapped.
+    
+    returns None if there is no sidecar, or if it doesn't match FileName (anymore) 
+    (size, modification time and fingerprint), otherwise a dictionary like index_arrays.
+    '''
+    sidecar = sidecar_name(FileName)
+    if not os.path.isfile(FileName) or not os.path.isfile(sidecar):
+        return None
+    with open(sidecar, 'rb') as fd:
+        if fd.read(len(sidecar_magic)) != sidecar_magic:
+            return None
+        header_size = struct.unpack('<I', fd.read(4))[0]
+        try:
+            header = pickle.loads(fd.read(header_size))
+        except Exception:
+            return None
+    stat = os.stat(FileName)
+    if header['size'] != stat.st_size or header['mtime'] != stat.st_mtime_ns:
+        return None
+    if check_fingerprint and header['fingerprint'] != file_fingerprint(FileName):
+        return None
+    start = -(-(len(sidecar_magic) + 4 + header_size) // sidecar_alignment) * sidecar_alignment
+    data = np.memmap(sidecar, dtype=np.uint8, mode='r')
+    index = {'version' : header['version'], 'endian' : header['endian']}
+    for name, (dtype, shape, position) in header['arrays'].items():
+        dtype = np.dtype(dtype)
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        index[name] = data[start + position:start + position + nbytes].view(dtype).reshape(shape)
+    return index
+
+def record_offsets(index, REC_ID):
+    '''
+    returns the offsets of the REC_ID records from an index in array form (see index_arrays)
+    '''
+    REC_TYP, REC_SUB = id_to_ts(index['version'])[REC_ID]
+    return index['offsets'][index['codes'] == REC_TYP * 256 + REC_SUB]
+
+def part_offsets(index, PN):
+    '''
+    returns the offsets of the records of part PN (from 1 on) from an index in array form (see index_arrays)
+    '''
+    return index['offsets'][index['part_records'][index['part_pointers'][PN - 1]:index['part_pointers'][PN]]]
+
+def test_rows(index):
+    '''
+    returns the rows (in offsets and codes) of the PTR's, MPR's and FTR's from an index in array form (see index_arrays),
+    these go with index['test_numbers'].
+    '''
+    return np.nonzero(np.isin(index['codes'], test_codes))[0]
+
+def census_STDF(FileName, use_index=True):
+    '''
+    Header-only census of the STDF file FileName.
+
+    Only the 4 byte record headers are read (uncompressed files are memory mapped and walked 
+    with a REC_LEN stride), the bodies are skipped, except for the HEAD_NUM and SITE_NUM of the 
+    PIR's (see HEAD_NUM_and_SITE_NUM_offsets). If use_index is True and the index sidecar of 
+    FileName is up to date (see load_STDF_index), the census comes from the index in one go.
+
+    returns a dictionary with :
+        'version'   : the STDF version
+        'endian'    : the endian of the file
+        'records'   : {(REC_TYP, REC_SUB) : number of records}
+        'bytes'     : {(REC_TYP, REC_SUB) : number of bytes (headers included)}
+        'parts'     : {(HEAD_NUM, SITE_NUM) : number of parts (PIR's)}
+        'size'      : the size of the (uncompressed) file
+        'truncated' : the size of a truncated trailing record (0 if the file ends on a record boundary)
+    so the number of parts is the number of PRR's, the number of wafers the number of WIR's, ...
+    '''
+    if not isinstance(FileName, str) or not os.path.isfile(FileName):
+        raise STDFError("census_STDF(%s) : not an existing file" % FileName)
+    index = None
+    if use_index:
+        index = load_STDF_index(FileName)
+    if index != None:
+        return _census_from_index(FileName, index)
+    if is_compressed_file(FileName):
+        return _census_from_stream(FileName)
+    return _census_from_mmap(FileName)
+
+def _census(version, endian, counts, sizes, parts, size, truncated):
+    records = {}
+    record_bytes = {}
+    for code in np.nonzero(counts)[0]:
+        TS = (int(code) >> 8, int(code) & 0xFF)
+        records[TS] = int(counts[code])
+        record_bytes[TS] = int(sizes[code]) + 4 * int(counts[code])
+    return {'version' : version, 'endian' : endian, 'records' : records, 'bytes' : record_bytes, 
+            'parts' : parts, 'size' : size, 'truncated' : truncated}
+
+def _census_from_mmap(FileName):
+    counts = [0] * 65536 # per REC_TYP * 256 + REC_SUB
+    sizes = [0] * 65536
+    parts = {}
+    PIR_HEAD_NUM = HEAD_NUM_and_SITE_NUM_offsets[(5, 10)]
+    with records_from_mmap(FileName) as stdf:
+        view = stdf.view
+        size = stdf.size
+        REC_LEN_unpack = struct.Struct('%sH' % stdf.endian).unpack_from
+        code_unpack = struct.Struct('>H').unpack_from # REC_TYP, REC_SUB as one number
+        offset = 0
+        while offset + 4 <= size:
+            REC_LEN = REC_LEN_unpack(view, offset)[0]
+            if offset + 4 + REC_LEN > size:
+                break
+            code = code_unpack(view, offset + 2)[0]
+            counts[code] += 1
+            sizes[code] += REC_LEN
+            if code == 0x050A and REC_LEN >= 2: # PIR
+                HEAD_SITE = (view[offset + PIR_HEAD_NUM], view[offset + PIR_HEAD_NUM + 1])
+                parts[HEAD_SITE] = parts.get(HEAD_SITE, 0) + 1
+            offset += REC_LEN + 4
+        del view
+        return _census(stdf.version, stdf.endian, counts, sizes, parts, size, size - offset)
+
+def _census_from_stream(FileName):
+    counts = [0] * 65536
+    sizes = [0] * 65536
+    parts = {}
+    stdf = records_from_file(FileName, follow=True) # stops at a truncated trailing record
+    if stdf.fd == None:
+        raise STDFError("census_STDF(%s) : not a (supported) STDF file" % FileName)
+    for REC_LEN, REC_TYP, REC_SUB, REC in stdf:
+        code = REC_TYP * 256 + REC_SUB
+        counts[code] += 1
+        sizes[code] += REC_LEN
+        if code == 0x050A:
+            HEAD_SITE = HEAD_NUM_and_SITE_NUM_from_record(REC)
+            parts[HEAD_SITE] = parts.get(HEAD_SITE, 0) + 1
+    return _census(stdf.version, stdf.endian, counts, sizes, parts, stdf.boundary + stdf.pending, stdf.pending)
+
+def _census_from_index(FileName, index):
+    offsets = index['offsets']
+    codes = index['codes']
+    if len(offsets) != 0:
+        last = indexed_records(FileName, index.get('checkpoints'))
+        try:
+            end = int(offsets[-1]) + len(last[offsets[-1]])
+        finally:
+            last.close()
+        lengths = np.diff(offsets, append=np.uint64(end)) - np.uint64(4)
+    else:
+        end = 0
+        lengths = np.zeros(0, dtype=np.uint64)
+    counts = np.bincount(codes, minlength=65536)
+    sizes = np.bincount(codes, weights=lengths, minlength=65536)
+    parts = {}
+    HEAD_SITE = index['part_head'].astype(np.uint16) * 256 + index['part_site']
+    for code, count in zip(*np.unique(HEAD_SITE, return_counts=True)):
+        parts[(int(code) >> 8, int(code) & 0xFF)] = int(count)
+    if is_compressed_file(FileName):
+        size = get_deflated_file_size(FileName)
+    else:
+        size = os.path.getsize(FileName)
+    return _census(index['version'], index['endian'], counts, sizes, parts, size, size - end)
@@ -28,15 +28,17 @@ if sys.version_info[0] < 3:
     raise Exception("The STDF library is made for Python 3") 
 
 from abc import ABC
+from types import MappingProxyType
 
-import os, time, struct, io, pickle, bz2
+import os, time, struct, io, mmap
 import gzip, hashlib, re, shutil
 from tqdm import tqdm
-from mimetypes import guess_type
 from shutil import copyfileobj
 
 # from ATE.Data.Formats.STDF.utils import File
 from ATE.utils import DT, magicnumber
+from ATE.utils.magicnumber import is_compressed_file
+from ATE.utils.seekable import seekable_file
 
 import pandas as pd
 import numpy as np
@@ -122,11 +124,17 @@ RecordDefinitions = {
 class STDFError(Exception):
     pass
 
+ts_to_id_cache = {}
+
 def ts_to_id(Version=__latest_STDF_version__, Extensions=None):
     '''
     This function returns a dictionary of TS -> ID for the given STDF version and Extension(s)
     If Extensions==None, then all available extensions are used
+    Note : the dictionaries are memoized, so don't modify the returned dictionary!
     '''
+    key = (Version, None if Extensions==None else tuple(Extensions))
+    if key in ts_to_id_cache:
+        return ts_to_id_cache[key]
     retval = {}
     if Version in supported().versions():
         if Extensions==None:
@@ -143,17 +151,25 @@ def ts_to_id(Version=__latest_STDF_version__, Extensions=None):
                 for ext, _obligatory_flag in RecordDefinitions[(REC_TYP, REC_SUB)][Version][2]:
                     if ext in Extensions:
                         retval[(REC_TYP, REC_SUB)] = RecordDefinitions[(REC_TYP, REC_SUB)][Version][0]
+    ts_to_id_cache[key] = retval
     return retval
 
+id_to_ts_cache = {}
+
 def id_to_ts(Version=__latest_STDF_version__, Extensions=None):
     '''
     This function returns a dictionary ID -> TS for the given STDF version and Extension(s)
     If Extensions==None, then all available extensions are used
+    Note : the dictionaries are memoized, so don't modify the returned dictionary!
     '''
+    key = (Version, None if Extensions==None else tuple(Extensions))
+    if key in id_to_ts_cache:
+        return id_to_ts_cache[key]
     retval = {}
     temp = ts_to_id(Version, Extensions)
     for item in temp:
         retval[temp[item]]= item
+    id_to_ts_cache[key] = retval
     return retval
 
 class supported(object):
@@ -192,19 +208,296 @@ class supported(object):
         '''
         retval = {}
         for version in self.supported_versions():
-            retval[version] = self.extensions_for_version(version) 
+            retval[version] = self.extensions_for_version(version)
+
+class not_decoded_marker(object):
+    '''
+    The (only) instance not_decoded marks the values of a lazy record that are not decoded yet.
+    '''
+    def __repr__(self):
+        return 'not_decoded'
+
+not_decoded = not_decoded_marker()
+
+class record_definition(object):
+    '''
+    Scratch object on which a record class' define method is run (once!) to build its record_schema.
+    '''
+    def __init__(self):
+        self.id = ''
+        self.version = None
+        self.info = ''
+        self.local_debug = False
+        self.fields = {}
+
+class record_schema(object):
+    '''
+    The immutable description of the fields of a record class for one version.
+    
+    The record classes describe their fields in a 'define' method, that is only
+    run once per (class, version) to build the schema, all records of that class 
+    and version share it. The records themselves only hold a list of values, 
+    ordered by the '#' of the fields.
+    
+    Use record_schema.get(cls, version) to obtain it.
+    '''
+    cache = {}
+
+    def __init__(self, cls, version=None, arguments=None):
+        if arguments == None:
+            arguments = {}
+        definition = record_definition()
+        cls.define(definition, version, **arguments)
+        self.id = definition.id
+        self.version = definition.version
+        self.info = definition.info
+        self.local_debug = definition.local_debug
+        self.arguments = dict(arguments)
+        fields = definition.fields
+        self.names = tuple(sorted(fields, key=lambda field: fields[field]['#']))
+        self.index = {field : index for index, field in enumerate(self.names)}
+        self.numbers = {fields[field]['#'] : field for field in self.names}
+        self.fields = MappingProxyType({field : MappingProxyType(fields[field]) for field in self.names})
+        self.types = tuple(fields[field]['Type'] for field in self.names)
+        self.refs = tuple(fields[field]['Ref'] for field in self.names)
+        self.missing = tuple(fields[field]['Missing'] for field in self.names)
+        self.FPEs = tuple(fields[field].get('FPE') for field in self.names)
+        self.presence = tuple(self.compile_FPE(field, FPE) for field, FPE in zip(self.names, self.FPEs))
+        self.defaults = tuple(fields[field]['Value'] for field in self.names)
+        self.codecs = {}
+
+    FPE_reference = re.compile(r"self\.fields\['(\w+)'\]\['Value'\]")
+
+    def compile_FPE(self, field, FPE):
+        '''
+        Compiles the Field Present Expression FPE of field (once per schema) in a callable 
+        that takes the record and returns True if the field holds valid data.
+        
+        FPE can be :
+            None : the field is always present (None is returned)
+            an int : a bit mask on OPT_FLAG, the field is present if none of the bits is set
+            a string : a python expression on self, where self.fields['X']['Value'] is 
+                       compiled to self.get_value('X')
+        '''
+        if FPE == None:
+            return None
+        if isinstance(FPE, int):
+            if 'OPT_FLAG' not in self.index:
+                raise STDFError("%s.%s : bit mask FPE without OPT_FLAG" % (self.id, field))
+            mask = FPE
+            def OPT_FLAG_clear(record):
+                OPT_FLAG = record.get_value('OPT_FLAG')
+                if isinstance(OPT_FLAG, list): # MSB first
+                    OPT_FLAG = int(''.join(OPT_FLAG), 2)
+                elif not isinstance(OPT_FLAG, int):
+                    return False
+                return OPT_FLAG & mask == 0
+            return OPT_FLAG_clear
+        if isinstance(FPE, str):
+            expression = self.FPE_reference.sub(r"self.get_value('\1')", FPE)
+            try:
+                return eval(compile("lambda self: bool(%s)" % expression, "<%s.%s FPE>" % (self.id, field), 'eval'), {})
+            except SyntaxError:
+                raise STDFError("%s.%s : invalid FPE '%s'" % (self.id, field, FPE))
+        raise STDFError("%s.%s : unsupported FPE '%s'" % (self.id, field, FPE))
+
+    @classmethod
+    def get(cls, record_class, version=None, arguments=None):
+        '''
+        returns the (cached) schema of record_class for version (and the extra define arguments)
+        '''
+        if arguments:
+            key = (record_class, version, tuple(sorted(arguments.items())))
+        else:
+            key = (record_class, version)
+        schema = cls.cache.get(key)
+        if schema == None:
+            schema = cls(record_class, version, arguments)
+            cls.cache[key] = schema
+        return schema
+
+    def missing_value(self, FieldID):
+        '''
+        returns a fresh copy of the 'Missing' default of FieldID (a callable default is called)
+        '''
+        value = self.missing[self.index[FieldID]]
+        if callable(value):
+            return value()
+        if isinstance(value, list):
+            return list(value)
+        return value
+
+class record_field(object):
+    '''
+    dictionary like view on one field of a record, only 'Value' can be written.
+    '''
+    __slots__ = ('record', 'field')
+
+    def __init__(self, record, field):
+        self.record = record
+        self.field = field
+
+    def __getitem__(self, key):
+        if key == 'Value':
+            return self.record.get_value(self.field)
+        if key == 'Missing':
+            return self.record.schema.missing_value(self.field)
+        return self.record.schema.fields[self.field][key]
+
+    def __setitem__(self, key, value):
+        if key != 'Value':
+            raise STDFError("%s.fields['%s']['%s'] : the schema is read-only" % (self.record.id, self.field, key))
+        if self.record.is_lazy():
+            self.record._decode()
+        self.record.values[self.record.schema.index[self.field]] = value
+
+    def __contains__(self, key):
+        return key in self.record.schema.fields[self.field]
+
+    def __iter__(self):
+        return iter(self.record.schema.fields[self.field])
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self):
+        return self.record.schema.fields[self.field].keys()
+
+class record_fields(object):
+    '''
+    dictionary like view on the fields of a record (FieldID -> record_field) 
+    for backwards compatibility with the time records held their own 'fields' dictionary.
+    '''
+    __slots__ = ('record',)
+
+    def __init__(self, record):
+        self.record = record
+
+    def __getitem__(self, FieldID):
+        if FieldID not in self.record.schema.index:
+            raise KeyError(FieldID)
+        return record_field(self.record, FieldID)
+
+    def __contains__(self, FieldID):
+        return FieldID in self.record.schema.index
+
+    def __iter__(self):
+        return iter(self.record.schema.names)
+
+    def __len__(self):
+        return len(self.record.schema.names)
+
+    def keys(self):
+        return list(self.record.schema.names)
+
+    def items(self):
+        return [(field, record_field(self.record, field)) for field in self.record.schema.names]
+
+    def values(self):
+        return [record_field(self.record, field) for field in self.record.schema.names]
+
+class record_codec(object):
+    '''
+    Pre-compiled decoder for one record schema, for a given endian.
+
+    All leading fixed width fields (U*#, I*#, R*#, C*# and B*1) are decoded
+    by one single struct.Struct.unpack_from call, the variable length tail
+    (starting with the first field that is not fixed width) is left to the
+    per-field logic in STDR._unpack_item.
+
+    A codec is compiled only once per (schema, endian),
+    use record_codec.get(record) to obtain it.
+    '''
+    fixed_formats = {'U*1' : 'B', 'U*2' : 'H', 'U*4' : 'I', 'U*8' : 'Q',
+                     'I*1' : 'b', 'I*2' : 'h', 'I*4' : 'i', 'I*8' : 'q',
+                     'R*4' : 'f', 'R*8' : 'd',
+                     'B*1' : 'B'}
+
+    def __init__(self, schema, endian):
+        fmt = endian
+        self.fixed = []
+        self.tail = []
+        self.items = {} # index -> (offset, struct, decode) for the fixed width fields
+        for index, field in enumerate(schema.names):
+            Type = schema.types[index]
+            if Type in self.fixed_formats:
+                item_fmt = self.fixed_formats[Type]
+                if Type == 'B*1':
+                    decode = self.B1_decode
+                else:
+                    decode = None
+            elif Type.startswith('C*') and Type[2:].isdigit():
+                item_fmt = '%ss' % Type[2:]
+                decode = self.Cx_decoder(int(Type[2:]))
+            else:
+                self.tail = schema.names[index:]
+                break
+            self.items[index] = (struct.calcsize(fmt), struct.Struct(endian + item_fmt), decode)
+            self.fixed.append((index, decode))
+            fmt += item_fmt
+        self.struct = struct.Struct(fmt)
+        self.size = self.struct.size
+
+    @classmethod
+    def get(cls, record):
+        '''
+        returns the (cached) codec for record
+        '''
+        codec = record.schema.codecs.get(record.endian)
+        if codec == None:
+            codec = cls(record.schema, record.endian)
+            record.schema.codecs[record.endian] = codec
+        return codec
+
+    @staticmethod
+    def B1_decode(value):
+        '''
+        B*1 : one byte to a list of 8 '0'/'1' characters (MSB first), as set_value does.
+        '''
+        return ['1' if value & (0x80 >> Bit) else '0' for Bit in range(8)]
+
+    @staticmethod
+    def Cx_decoder(length):
+        '''
+        C*# : returns a decoder for a fixed length string, stripped like set_value does.
+        '''
+        def Cx_decode(value):
+            return value.decode().strip()[:length]
+        return Cx_decode
+
+    def unpack(self, record, buffer):
+        '''
+        decodes the fixed width head of buffer into the values of record.
+        returns the number of bytes consumed.
+        '''
+        values = record.values
+        for (index, decode), value in zip(self.fixed, self.struct.unpack_from(buffer, 0)):
+            if decode == None:
+                values[index] = value
+            else:
+                values[index] = decode(value)
+        return self.size
 
 class STDR(ABC):
     '''
     This is the Abstract Base Class Record for all STDF records
+    
+    The fields of a record are described in its 'define' method, which is only run once 
+    per version to build the (shared) record_schema. The instances only hold the values.
     '''
-    buffer = b''
+    __slots__ = ('schema', 'values', 'endian', 'missing_fields', 'buffer', 'offset')
     
-    def __init__(self, endian=None, record=None):
+    def __init__(self, version=None, endian=None, record=None, lazy=False, **arguments):
+        self.schema = record_schema.get(self.__class__, version, arguments)
+        self.values = list(self.schema.defaults)
+        self._default_init(endian, record, lazy)
+    
+    def define(self, version=None):
         self.id = 'STDR'
-        self.missing_fields = 0
+        self.version = version
         self.local_debug = True
-        self.buffer = ''
         self.fields = {
             'REC_LEN'  : {'#' :  0, 'Type' :  'U*2', 'Ref' : None, 'Value' :      0, 'Text' : 'Bytes of data following header        ', 'Missing' : None},
             'REC_TYP'  : {'#' :  1, 'Type' :  'U*1', 'Ref' : None, 'Value' :      0, 'Text' : 'Record type                           ', 'Missing' : None},
@@ -245,13 +538,41 @@ class STDR(ABC):
 # kxTYPE Array of data of the type specified.
 
         }
-        self._default_init(endian, record)
+
+    @property
+    def id(self):
+        return self.schema.id
+
+    @property
+    def version(self):
+        return self.schema.version
+
+    @property
+    def info(self):
+        return self.schema.info
+
+    @property
+    def local_debug(self):
+        return self.schema.local_debug
+
+    @property
+    def fields(self):
+        '''
+        dictionary like view on the fields (schema and values) of this record.
+        '''
+        return record_fields(self)
+
+    def __reduce__(self):
+        if self.is_lazy():
+            self._decode()
+        return (record_from_values, (self.__class__, self.schema.version, self.schema.arguments, self.endian, self.values))
     
-    def _default_init(self, endian=None, record=None):
+    def _default_init(self, endian=None, record=None, lazy=False):
         # missing fields
         self.missing_fields = 0
         # Buffer
-        self.buffer = ''
+        self.buffer = b''
+        self.offset = 0
         # Endian
         if endian == None:
             self.endian = sys_endian()
@@ -262,7 +583,10 @@ class STDR(ABC):
         # Record
         if record != None:
             if self.local_debug: print("len(%s) = %s" % (self.id, len(record)))
-            self._unpack(record)
+            if lazy:
+                self._lazy_unpack(record)
+            else:
+                self._unpack(record)
     
     def __call__(self, endian = None, record = None):
         '''
@@ -282,53 +606,85 @@ class STDR(ABC):
         if FieldID is provided either in a string or numerical way.
         If it is not provided, it returns a (IN ORDER) list of (string) keys. 
         '''
+        schema = self.schema
         if FieldID == None:
-            retval = [None] * len(self.fields)
-            for field in self.fields:
-                retval[self.fields[field]['#']] = field
-            return retval
+            return list(schema.names)
         else:
-            if isinstance(FieldID, str):
-                if FieldID in self.fields:
-                    return(self.fields[FieldID]['#'],
-                           self.fields[FieldID]['Type'], 
-                           self.fields[FieldID]['Ref'],
-                           self.fields[FieldID]['Value'],
-                           self.fields[FieldID]['Text'],
-                           self.fields[FieldID]['Missing'])
-                else:
-                    return (None, None, None, None, None)
-            elif isinstance(FieldID, int):
-                if FieldID in range(len(self.fields)):
-                    for field in self.fields:
-                        if self.fields[field]['#'] == FieldID:
-                            return(self.fields[field]['#'],
-                                   self.fields[field]['Type'], 
-                                   self.fields[field]['Ref'],
-                                   self.fields[field]['Value'],
-                                   self.fields[field]['Text'],
-                                   self.fields[field]['Missing'])
-                else:
+            if isinstance(FieldID, int):
+                if FieldID not in schema.numbers:
                     return (None, None, None, None, None)
-            else:
+                FieldID = schema.numbers[FieldID]
+            elif not isinstance(FieldID, str):
                 raise STDFError("%s.get_value(%s) Error : '%s' is not a string or integer" % (self.id, FieldID, FieldID))
+            if FieldID in schema.index:
+                index = schema.index[FieldID]
+                field = schema.fields[FieldID]
+                return(field['#'],
+                       schema.types[index], 
+                       schema.refs[index],
+                       self.get_value(FieldID),
+                       field['Text'],
+                       schema.missing_value(FieldID))
+            else:
+                return (None, None, None, None, None)
 
     def get_value(self, FieldID):
-        return self.fields[FieldID]['Value']
+        value = self.values[self.schema.index[FieldID]]
+        if value is not_decoded:
+            return self._decode(FieldID)
+        return value
+
+    def is_present(self, FieldID):
+        '''
+        returns True if FieldID holds valid data, that is : it was not missing from the 
+        unpacked record and its (compiled) Field Present Expression holds.
+        '''
+        index = self.schema.index[FieldID]
+        if self.is_lazy() and index not in record_codec.get(self).items:
+            self._decode()
+        if index >= len(self.values) - self.missing_fields:
+            return False
+        presence = self.schema.presence[index]
+        if presence == None:
+            return True
+        return presence(self)
+
+    def _packed_fields(self):
+        '''
+        Private method that returns the fields to pack, the trailing fields that are not
+        present (see is_present) are left out, as the standard allows.
+        '''
+        names = self.schema.names
+        presence = self.schema.presence
+        end = len(names) - self.missing_fields
+        while end > 3 and presence[end - 1] != None and not presence[end - 1](self):
+            end -= 1
+        return names[:end]
 
     def set_value(self, FieldID, Value):
         '''
         Setter, sets the Value of the FieldID
         '''
+        if self.is_lazy():
+            self._decode()
+        self._set_value(FieldID, Value)
+        if self.missing_fields: # a field missing from the unpacked record gets a value
+            if isinstance(FieldID, int):
+                FieldID = self.schema.numbers[FieldID]
+            self.missing_fields = min(self.missing_fields, len(self.values) - self.schema.index[FieldID] - 1)
+
+    def _set_value(self, FieldID, Value):
+        '''
+        Private setter, sets the Value of the FieldID (without looking at laziness)
+        '''
         FieldKey = ''
         if isinstance(FieldID, int):
-            for field in self.fields:
-                if self.fields[field]['#'] == FieldID:
-                    FieldKey = field
+            if FieldID in self.schema.numbers:
+                FieldKey = self.schema.numbers[FieldID]
             if FieldKey == '':
                 raise STDFError("%s.set_value(%s, %s) Error : '%s' is not a valid key" % (self.id, FieldID, Value, FieldID))
         elif isinstance(FieldID, str):
-            if FieldID not in self.fields:
+            if FieldID not in self.schema.index:
                 raise STDFError("%s.set_value(%s, %s) Error : '%s' is not a valid key" % (self.id, FieldID, Value, FieldID))
             else:
                 FieldKey = FieldID
@@ -344,7 +700,7 @@ class STDR(ABC):
         if Type.startswith('x'):
             if not isinstance(Value, list):
                 raise STDFError("%s.set_value(%s, %s) Error : '%s' does not references a list." % (self.id, FieldKey, Value, "*".join((str(K), Type, Bytes))))
-            length_type = self.fields[Ref]['Type']  
+            length_type = self.schema.fields[Ref]['Type']  
             if not length_type.startswith('U*'):
                 raise STDFError("%s.set_value(%s, %s) Error : '%s' references a non unsigned integer." % (self.id, FieldKey, Value, "*".join((str(K), Type, Bytes))))
             if not length_type in ['U*1', 'U*2', 'U*4', 'U*8']:
@@ -382,8 +738,8 @@ class STDR(ABC):
                             raise STDFError("%s.set_value(%s, %s) Error : 'index[%s]' is not an integer." % (self.id, FieldKey, Value, index))
                 else:
                     raise STDFError("%s.set_value(%s, %s) Error : '%s' is an unsupported Type" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
                 
             elif Type == 'xI': # list of signed integers
@@ -418,8 +774,8 @@ class STDR(ABC):
                             raise STDFError("%s.set_value(%s, %s) Error : 'index[%s]' is not an integer." % (self.id, FieldKey, Value, index))
                 else:
                     raise STDFError("%s.set_value(%s, %s) Error : '%s' is an unsupported Type" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
             
             elif Type == 'xR': # list of floats
@@ -429,8 +785,8 @@ class STDR(ABC):
                         temp[index] = float(Value[index]) # no checking for float & double, pack will cast with appropriate precision, cast integers.
                 else:
                     raise STDFError("%s.set_value(%s, %s) Error : '%s' is an unsupported Type" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
             
             elif Type == 'xC': # list of strings
@@ -443,8 +799,8 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
             
             elif Type == 'xB': # list of list of single character strings being '0' or '1' (max length = 255*8 = 2040 bits)
@@ -459,8 +815,8 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
                 
             elif Type == 'xD': # list of list of single character strings being '0' and '1'(max length = 65535 bits)
@@ -492,8 +848,8 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, str(K) + '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
-                self.fields[Ref]['Value'] = len(temp)
+                self.values[self.schema.index[FieldKey]] = temp
+                self.values[self.schema.index[Ref]] = len(temp)
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s, Reference '%s' = %s" % (self.id, FieldKey, Value, temp, Ref, len(temp)))
                                    
             elif Type == 'xV': # list of tuple (type, value) where type is defined in spec page 62tuples
@@ -544,7 +900,7 @@ class STDR(ABC):
                     else: raise STDFError("%s.set_value(%s, %s) Error : '%s' can not be casted into U*8" % (self.id, FieldKey, Value, Value))
                 else:
                     raise STDFError("%s.set_value(%s, %s) Error : '%s' is an unsupported Type" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
 
             elif Type == 'I': # signed integer
@@ -564,7 +920,7 @@ class STDR(ABC):
                     else: raise STDFError("%s.set_value(%s, %s) : '%s' can not be casted into I*8" % (self.id, FieldKey, Value, Value))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
 
             elif Type == 'R': # float
@@ -572,7 +928,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : '%s' is not a float" % (self.id, FieldKey, Value, Value))
                 if ((Bytes == '4') or (Bytes == '8')): temp = float(Value) # no checking for float & double, pack will cast with appropriate precision
                 else: raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
                 
             elif Type == 'C': # string
@@ -587,7 +943,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
 
             elif Type == 'B': # list of single character strings being '0' or '1' (max length = 255*8 = 2040 bits)
@@ -652,7 +1008,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
                 
             elif Type == 'D': # list of single character strings being '0' and '1'(max length = 65535 bits)
@@ -672,7 +1028,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
                 
             elif Type == 'N': # list of integers
@@ -695,7 +1051,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
 
             elif Type == 'V': # tuple (type, value) where type is defined in spec page 62
@@ -728,7 +1084,7 @@ class STDR(ABC):
                     raise STDFError("%s.set_value(%s, %s) : Unimplemented type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
-                self.fields[FieldKey]['Value'] = temp
+                self.values[self.schema.index[FieldKey]] = temp
                 if self.local_debug: print("%s._set_value(%s, %s) -> Value = %s" % (self.id, FieldKey, Value, temp))
 
             else:
@@ -740,13 +1096,12 @@ class STDR(ABC):
         '''
         FieldKey = ''
         if isinstance(FieldID, int):
-            for field in self.fields:
-                if self.fields[field]['#'] == FieldID:
-                    FieldKey = field
+            if FieldID in self.schema.numbers:
+                FieldKey = self.schema.numbers[FieldID]
             if FieldKey == '':
                 raise STDFError("%s._type_size(%s) : '%s' is not a valid key" % (self.id, FieldID, FieldID))
         elif isinstance(FieldID, str):
-            if FieldID not in self.fields:
+            if FieldID not in self.schema.index:
                 raise STDFError("%s._type_size(%s) : '%s' is not a valid key" % (self.id, FieldID, FieldID))
             else:
                 FieldKey = FieldID
@@ -754,6 +1109,7 @@ class STDR(ABC):
             raise STDFError("%s._type_size(%s) : '%s' is not a string or integer." % (self.id, FieldID,FieldID))
         
         Type, Ref, Value = self.get_fields(FieldKey)[1:4]
+        if Value == None: Value = self.get_fields(FieldKey)[5] # the 'missing' default, as _pack_item does
         K = None
         if Ref != '':
             K = self.get_fields(Ref)[3]
@@ -805,7 +1161,7 @@ class STDR(ABC):
                     raise STDFError("%s_type_size(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
             elif Type == 'xN':
                 if Bytes.isdigit():
-                    bytes_to_pack = int(Bytes) / 2
+                    bytes_to_pack = int(Bytes) // 2
                     if (int(Bytes) % 2) != 0:
                         bytes_to_pack += 1
                     retval = bytes_to_pack * K
@@ -865,7 +1221,7 @@ class STDR(ABC):
                     return retval
                 elif Bytes == 'n':
                     bits_to_pack = len(Value)
-                    bytes_to_pack = bits_to_pack / 8
+                    bytes_to_pack = bits_to_pack // 8
                     if (bits_to_pack % 8) != 0:
                         bytes_to_pack += 1
                     if bytes_to_pack <= 255:
@@ -880,7 +1236,7 @@ class STDR(ABC):
                     raise STDFError("%s_type_size(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
             elif Type == 'D':
                 if Bytes.isdigit():
-                    bytes_to_pack = int(Bytes) / 8
+                    bytes_to_pack = int(Bytes) // 8
                     if (int(Bytes) % 8) != 0:
                         bytes_to_pack += 1
                     retval = bytes_to_pack
@@ -888,7 +1244,7 @@ class STDR(ABC):
                     return retval
                 elif Bytes == 'n':
                     bits_to_pack = len(Value)
-                    bytes_to_pack = bits_to_pack / 8
+                    bytes_to_pack = bits_to_pack // 8
                     if (bits_to_pack % 8) != 0:
                         bytes_to_pack += 1
                     if bytes_to_pack <= 8192:
@@ -903,7 +1259,7 @@ class STDR(ABC):
                     raise STDFError("%s_type_size(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
             elif Type == 'N':
                 if Bytes.isdigit():
-                    bytes_to_pack = int(Bytes) / 2
+                    bytes_to_pack = int(Bytes) // 2
                     if (int(Bytes) % 2) != 0:
                         bytes_to_pack += 1
                     retval = bytes_to_pack
@@ -911,7 +1267,7 @@ class STDR(ABC):
                     return retval  
                 elif Bytes == 'n':
                     nibbles_to_pack = len(Value)
-                    bytes_to_pack = nibbles_to_pack / 2
+                    bytes_to_pack = nibbles_to_pack // 2
                     if (nibbles_to_pack % 2) != 0:
                         bytes_to_pack += 1
                     retval = bytes_to_pack + 1
@@ -938,13 +1294,13 @@ class STDR(ABC):
         Private method that updates the "bytes following the header" in the 'REC_LEN' field
         '''
         reclen = 0
-        for field in self.fields:
+        for field in self._packed_fields():
             if field == 'REC_LEN' : continue
             if field == 'REC_TYP' : continue
             if field == 'REC_SUB' : continue
             reclen += self._type_size(field)
         if self.local_debug: print("%s._update_rec_len() = %s" % (self.id, reclen))
-        self.fields['REC_LEN']['Value'] = reclen    
+        self.values[self.schema.index['REC_LEN']] = reclen    
                 
     def _pack_item(self, FieldID):
         '''
@@ -970,13 +1326,12 @@ class STDR(ABC):
         '''
         FieldKey = ''
         if isinstance(FieldID, int):
-            for field in self.fields:
-                if self.fields[field]['#'] == FieldID:
-                    FieldKey = field
+            if FieldID in self.schema.numbers:
+                FieldKey = self.schema.numbers[FieldID]
             if FieldKey == '':
                 raise STDFError("%s._pack_item(%s) Error : not a valid integer key" % (self.id, FieldID))
         elif isinstance(FieldID, str):
-            if FieldID not in self.fields:
+            if FieldID not in self.schema.index:
                 raise STDFError("%s._pack_item(%s) Error : not a valid string key" % (self.id, FieldID))
             else:
                 FieldKey = FieldID
@@ -1068,7 +1423,10 @@ class STDR(ABC):
                 for i in range(K):
                     if Size == 'n':
                         pkg += struct.pack('B', len(ValueMask[i]))
-                    pkg += ValueMask[i]
+                    if Size.isdigit():
+                        pkg += ValueMask[i].ljust(int(Size)).encode('utf-8')
+                    else:
+                        pkg += ValueMask[i].encode('utf-8')
             else:
                 if TypeMultiplier: raise STDFError("%s._pack_item(%s) : Unsupported type-format '%s'" % (self.id, FieldKey, str(K) + TypeFormat))
                 else: raise STDFError("%s._pack_item(%s) : Unsupported type-format '%s'" % (self.id, FieldKey, TypeFormat))
@@ -1082,7 +1440,7 @@ class STDR(ABC):
                 for i in range(K):
                     if Size == 'n':
                         pkg += struct.pack('%sH' % self.endian, len(ValueMask[i]))
-                    pkg += ValueMask[i]
+                    pkg += ValueMask[i].encode('utf-8')
             else:
                 if TypeMultiplier: raise STDFError("%s._pack_item(%s) : Unsupported type-format '%s'" % (self.id, FieldKey, str(K) + TypeFormat))
                 else: raise STDFError("%s._pack_item(%s) : Unsupported type-format '%s'" % (self.id, FieldKey, TypeFormat))
@@ -1095,7 +1453,7 @@ class STDR(ABC):
             if Size.isdigit() or Size=='f' or Size == 'n': 
                 for i in range(K):
                     bits_to_pack = len(ValueMask[i])
-                    bytes_to_pack = bits_to_pack / 8 # Bits to pack should always be a multiple of 8, guaranteed by set_value
+                    bytes_to_pack = bits_to_pack // 8 # Bits to pack should always be a multiple of 8, guaranteed by set_value
                     if Size == 'n':
                         pkg += struct.pack('B', bytes_to_pack)
                     for Byte in range(bytes_to_pack):
@@ -1117,7 +1475,7 @@ class STDR(ABC):
                 for i in range(K):
                     temp_value = ValueMask[i]
                     bits_to_pack = len(temp_value)
-                    bytes_to_pack = int(bits_to_pack) / 8
+                    bytes_to_pack = int(bits_to_pack) // 8
                     if Size == 'n':
                         pkg += struct.pack('%sH' % self.endian, bits_to_pack)
                     if (bits_to_pack % 8) != 0:
@@ -1173,19 +1531,22 @@ class STDR(ABC):
         return pkg
 
     def _unpack_item(self, FieldID):
-        if len(self.buffer) == 0:
-            self.set_value(FieldID, self.fields[FieldID]['Missing'])
+        '''
+        Private method that unpacks one field from self.buffer (a memoryview) at the self.offset cursor,
+        and advances the cursor. No intermediate copies of the buffer are made.
+        '''
+        if self.offset >= len(self.buffer):
+            self._set_value(FieldID, self.schema.missing_value(FieldID))
             self.missing_fields += 1
         else:
             FieldKey = ''
             if isinstance(FieldID, int):
-                for field in self.fields:
-                    if self.fields[field]['#'] == FieldID:
-                        FieldKey = field
+                if FieldID in self.schema.numbers:
+                    FieldKey = self.schema.numbers[FieldID]
                 if FieldKey == '':
                     raise STDFError("%s._unpack_item(%s) : not a valid integer key" % (self.id, FieldID))
             elif isinstance(FieldID, str):
-                if FieldID not in self.fields:
+                if FieldID not in self.schema.index:
                     raise STDFError("%s._unpack_item(%s) : not a valid string key" % (self.id, FieldID))
                 else:
                     FieldKey = FieldID
@@ -1196,59 +1557,56 @@ class STDR(ABC):
             K = self.get_fields(Ref)[3]
             Type, Bytes = Type.split("*")
             fmt = ''
-            pkg = self.buffer
+            buffer = self.buffer
+            offset = self.offset
+            available = len(buffer) - offset
+            if self.local_debug: pkg = bytes(buffer[offset:])
             
             if Type.startswith('x'):
                 result = []
     
                 if Type == 'xU': # list of unsigned integers
                     if Bytes.isdigit():
-                        if Bytes == '1': fmt = self.endian + 'B'   # list of one byte unsigned integers 0..255
-                        elif Bytes == '2': fmt = self.endian + 'H' # list of 2 byte unsigned integers 0..65535
-                        elif Bytes == '4': fmt = self.endian + 'I' # list of 4 byte unsigned integers 0..4294967295
-                        elif Bytes == '8': fmt = self.endian + 'Q' # list of 8 byte unsigned integers 0..18446744073709551615
+                        if Bytes == '1': fmt = 'B'   # list of one byte unsigned integers 0..255
+                        elif Bytes == '2': fmt = 'H' # list of 2 byte unsigned integers 0..65535
+                        elif Bytes == '4': fmt = 'I' # list of 4 byte unsigned integers 0..4294967295
+                        elif Bytes == '8': fmt = 'Q' # list of 8 byte unsigned integers 0..18446744073709551615
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    for _ in range(K):
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result.append(struct.unpack(fmt, working_buffer)[0])
+                    result = list(struct.unpack_from("%s%d%s" % (self.endian, K, fmt), buffer, offset))
+                    self.offset += K * int(Bytes)
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))    
-                    self.set_value(FieldKey, result)     
+                    self._set_value(FieldKey, result)     
                     
                 elif Type == 'xI': # list of signed integers
                     if Bytes.isdigit():
-                        if Bytes == '1': fmt = self.endian + 'b'   # list of one byte signed integers -127..127
-                        elif Bytes == '2': fmt = self.endian + 'h' # list of 2 byte signed integers 
-                        elif Bytes == '4': fmt = self.endian + 'i' # list of 4 byte signed integers 
-                        elif Bytes == '8': fmt = self.endian + 'q' # list of 8 byte signed integers 
+                        if Bytes == '1': fmt = 'b'   # list of one byte signed integers -127..127
+                        elif Bytes == '2': fmt = 'h' # list of 2 byte signed integers 
+                        elif Bytes == '4': fmt = 'i' # list of 4 byte signed integers 
+                        elif Bytes == '8': fmt = 'q' # list of 8 byte signed integers 
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    for _ in range(K):
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result.append(struct.unpack(fmt, working_buffer)[0])
+                    result = list(struct.unpack_from("%s%d%s" % (self.endian, K, fmt), buffer, offset))
+                    self.offset += K * int(Bytes)
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
+                    self._set_value(FieldKey, result)     
                 
                 elif Type == 'xR': # list of floating point numbers
                     if Bytes.isdigit():
-                        if Bytes == '4': fmt = self.endian + 'f'   # list of 4 byte floating point numbers (float) 
-                        elif Bytes == '8': fmt = self.endian + 'd' # list of 8 byte floating point numbers (double) 
+                        if Bytes == '4': fmt = 'f'   # list of 4 byte floating point numbers (float) 
+                        elif Bytes == '8': fmt = 'd' # list of 8 byte floating point numbers (double) 
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    for _ in range(K):
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result.append(struct.unpack(fmt, working_buffer)[0])
+                    result = list(struct.unpack_from("%s%d%s" % (self.endian, K, fmt), buffer, offset))
+                    self.offset += K * int(Bytes)
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
+                    self._set_value(FieldKey, result)     
                 
                 elif Type == 'xC': # list of strings
                     if Bytes.isdigit():
@@ -1262,12 +1620,6 @@ class STDR(ABC):
                         raise STDFError("%s._unpack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    for _ in range(K):
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result.append(struct.unpack(fmt, working_buffer)[0])
-                    if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
                 
                 elif Type == 'xB': # list of list of '0' or '1'
                     if Bytes.isdigit():
@@ -1278,8 +1630,6 @@ class STDR(ABC):
                         raise STDFError("%s._unpack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
                 
                 elif Type == 'xD': # list of list of '0' or '1'
                     if Bytes.isdigit():
@@ -1290,32 +1640,23 @@ class STDR(ABC):
                         raise STDFError("%s._unpack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
                 
                 elif Type == 'xN': # list of a list of nibbles
                     if Bytes.isdigit():
                         result = []
                         if int(Bytes) <= 510:
-                            if int(Bytes) == 1:
-                                byteS = 1
-                            else:
-                                byteS = int(Bytes)/2
-                                if is_odd(byteS): 
-                                    byteS+=1
+                            n_nibbles = int(Bytes)
+                            n_bytes = (n_nibbles + 1) // 2
+                            if available < K * n_bytes:
+                                raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, K * n_bytes, available))
                             for _i in range(K):
                                 tmp = []
-                                for _j in range(byteS):
-                                    working_buffer = self.buffer[0:1]
-                                    self.buffer = self.buffer[1:]
-                                    B = struct.unpack('B', working_buffer)[0]
-                                    N1 = B & 0x0F
-                                    N2 = (B & 0xF0) >> 4
-                                    tmp.append(N1)
-                                    tmp.append(N2)
-                                if is_odd(byteS):
-                                    tmp = tmp[0:-1] # remove the last element (which will be 0) from the list
-                                result.append(tmp)
+                                for B in buffer[offset:offset + n_bytes]:
+                                    tmp.append(B & 0x0F)
+                                    tmp.append((B & 0xF0) >> 4)
+                                offset += n_bytes
+                                result.append(tmp[:n_nibbles]) # an odd number of nibbles has a 0 nibble padded
+                            self.offset = offset
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     elif Bytes == 'n':
@@ -1325,7 +1666,7 @@ class STDR(ABC):
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)
+                    self._set_value(FieldKey, result)
                     
                 elif Type == 'xV': # list of 2-element tuples
                     if Bytes.isdigit():
@@ -1336,8 +1677,6 @@ class STDR(ABC):
                         raise STDFError("%s._unpack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
-                    if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), str(K) + '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldKey, result)     
                 else:
                     raise STDFError("%s._pack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, str(K) + '*'.join((Type, Bytes))))
             else:
@@ -1349,15 +1688,14 @@ class STDR(ABC):
                         elif Bytes == '8': fmt = "%sQ" % self.endian # unsigned long long
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result = struct.unpack(fmt, working_buffer)[0]
+                        if available < int(Bytes):
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, available))
+                        result = struct.unpack_from(fmt, buffer, offset)[0]
+                        self.offset += int(Bytes)
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                     
                 elif Type == 'I': # signed integer
                     if Bytes.isdigit():
@@ -1367,15 +1705,14 @@ class STDR(ABC):
                         elif Bytes == '8': fmt = "%sq" % self.endian # signed long long
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result = struct.unpack(fmt, working_buffer)[0]
+                        if available < int(Bytes):
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, available))
+                        result = struct.unpack_from(fmt, buffer, offset)[0]
+                        self.offset += int(Bytes)
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))    
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                 
                 elif Type == 'R': # float
                     if Bytes.isdigit():
@@ -1383,123 +1720,93 @@ class STDR(ABC):
                         elif Bytes == '8': fmt = "%sd" % self.endian # double
                         else:
                             raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result = struct.unpack(fmt, working_buffer)[0]
+                        if available < int(Bytes):
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, available))
+                        result = struct.unpack_from(fmt, buffer, offset)[0]
+                        self.offset += int(Bytes)
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))    
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                 
                 elif Type == 'C': # string
                     if Bytes.isdigit(): # C*1 C*2 ...
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        result = working_buffer.decode()
+                        n_bytes = int(Bytes)
                     elif Bytes == 'n': # C*n
-                        working_buffer = self.buffer[0:1]
-                        self.buffer = self.buffer[1:]
-                        n_bytes = struct.unpack('B', working_buffer)[0]
-                        if len(self.buffer) < n_bytes:
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:n_bytes]
-                        self.buffer = self.buffer[n_bytes:]
-                        result = working_buffer.decode('utf-8')
+                        n_bytes = buffer[offset]
+                        offset += 1
+                        available -= 1
                     elif Bytes == 'f': # C*f
                         n_bytes = self.get_fields(Ref)[3]
-                        if len(self.buffer) < n_bytes:
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:n_bytes]
-                        self.buffer = self.buffer[n_bytes:]
-                        result = working_buffer.decode()
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))    
+                    if available < n_bytes:
+                        raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, available))
+                    result = str(buffer[offset:offset + n_bytes], 'utf-8')
+                    self.offset = offset + n_bytes
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                 
                 elif Type == 'B': # list of single character strings being '0' or '1' (max length = 255*8 = 2040 bits)
                     if Bytes.isdigit(): # B*1 B*2 ...
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        temp = struct.unpack('B' * int(Bytes), working_buffer) # temp is a list (tuple) of 'Bytes' unsigned 1 byte bytes
-                        result = ['0'] * (int(Bytes) * 8)
-                        for Byte in range(len(temp)):
-                            for Bit in range(8):
-                                mask = pow(2, 7 - Bit)
-                                if (temp[Byte] & mask) == mask : 
-                                    result[(Byte * 8) + Bit] = '1'
+                        n_bytes = int(Bytes)
                     elif Bytes == 'n': # B*n
-                        working_buffer = self.buffer[0:1]
-                        self.buffer = self.buffer[1:]
-                        n_bytes = struct.unpack('B', working_buffer)[0]
-                        if len(self.buffer) < n_bytes:
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:n_bytes]
-                        self.buffer = self.buffer[n_bytes:]
-                        temp = struct.unpack('B' * n_bytes, working_buffer)
-                        result = ['0'] * (n_bytes * 8)
-                        for Byte in range(len(temp)):
-                            for Bit in range(8):
-                                mask = pow(2, 7 - Bit)
-                                if (temp[Byte] & mask) == mask : 
-                                    result[(Byte * 8) + Bit] = '1'
+                        n_bytes = buffer[offset]
+                        offset += 1
+                        available -= 1
                     elif Bytes == 'f': # B*f
                         raise STDFError("%s._pack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))
+                    if available < n_bytes:
+                        raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, available))
+                    result = []
+                    for B in buffer[offset:offset + n_bytes]:
+                        for Bit in range(8):
+                            result.append('1' if B & (0x80 >> Bit) else '0')
+                    self.offset = offset + n_bytes
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                                     
                 elif Type == 'D': # list of single character strings being '0' and '1'(max length = 65535 bits)
                     if Bytes.isdigit():
                         raise STDFError("%s._pack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     elif Bytes == 'n':
-                        working_buffer = self.buffer[0:2]
-                        self.buffer = self.buffer[2:]
-                        n_bits = struct.unpack('%sH' % self.endian, working_buffer)[0]
+                        if available < 2:
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, 2, available))
+                        n_bits = struct.unpack_from('%sH' % self.endian, buffer, offset)[0]
+                        offset += 2
+                        available -= 2
                         n_bytes = int(n_bits/8)
                         if n_bits % 8 != 0:
                             n_bytes += 1
-                        result = ['0'] * (n_bytes * 8)
-                        if len(self.buffer) < n_bytes:
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:n_bytes]
-                        self.buffer = self.buffer[n_bytes:]
-                        result = ['0'] * n_bytes
-                        for Byte in range(n_bytes):
-                            B = struct.unpack('B', working_buffer[Byte])[0]
+                        if available < n_bytes:
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, available))
+                        result = []
+                        for B in buffer[offset:offset + n_bytes]:
                             for Bit in range(8):
-                                if B & pow(2, Bit) == 1:
-                                    result[(Byte * 8) + Bit] = '1'
+                                result.append('1' if B & (1 << Bit) else '0')
                         result = result[:n_bits] # strip off the paddings
+                        self.offset = offset + n_bytes
                     elif Bytes == 'f':
                         raise STDFError("%s._pack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                 
                 elif Type == 'N': # list of integers
                     if Bytes.isdigit():
-                        if len(self.buffer) < int(Bytes):
-                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, Bytes, len(self.buffer)))
-                        working_buffer = self.buffer[0:int(Bytes)]
-                        self.buffer = self.buffer[int(Bytes):]
-                        brol = []
-                        for index in range(len(working_buffer)):
-                            B = struct.unpack("%sB" % self.endian, working_buffer[index])[0]
-                            N1 = B & 0x0F
-                            N2 = (B & 0xF0) >> 4
-                            brol.append(N1)
-                            brol.append(N2)
-                        brol = brol[:int(Bytes)]
-                        self.set_value(FieldID, brol)
+                        n_nibbles = int(Bytes)
+                        n_bytes = (n_nibbles + 1) // 2
+                        if available < n_bytes:
+                            raise STDFError("%s._unpack_item(%s) : Not enough bytes in buffer (need %s while %s available)." % (self.id, FieldKey, n_bytes, available))
+                        result = []
+                        for B in buffer[offset:offset + n_bytes]:
+                            result.append(B & 0x0F)
+                            result.append((B & 0xF0) >> 4)
+                        result = result[:n_nibbles]
+                        self.offset = offset + n_bytes
                     elif Bytes == 'n':
                         raise STDFError("%s._pack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     elif Bytes == 'f':
@@ -1507,7 +1814,7 @@ class STDR(ABC):
                     else:
                         raise STDFError("%s._unpack_item(%s) : Unsupported type '%s'." % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
+                    self._set_value(FieldID, result)
                 
                 elif Type == 'V': # tuple (type, value) where type is defined in spec page 62
                     '''
@@ -1533,8 +1840,6 @@ class STDR(ABC):
                         raise STDFError("%s._pack_item(%s) : Unimplemented type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
                     else:
                         raise STDFError("%s._pack_item(%s) : Unsupported type '%s'" % (self.id, FieldKey, '*'.join((Type, Bytes))))
-                    if self.local_debug: print("%s._unpack_item(%s)\n   '%s' [%s] -> %s" % (self.id, FieldKey, hexify(pkg), '*'.join((Type, Bytes)), result))
-                    self.set_value(FieldID, result)
                         
                 else:
                     raise STDFError("%s.set_value(%s, %s) : Unsupported type '%s'" % (self.id, FieldKey, Value, '*'.join((Type, Bytes))))
@@ -1542,23 +1847,85 @@ class STDR(ABC):
     def _unpack(self, record):
         '''
         Private method to unpack a record (including header -to-check-record-type-) and set the appropriate values in fields.
+        record can be bytes, bytearray or a memoryview (eg: into a shared read buffer), it is never copied.
         '''
-        self.buffer = record
+        self.buffer = memoryview(record)
+        self.offset = 0
         
         if self.local_debug: print("%s._unpack(%s) with buffer length = %s" % (self.id, hexify(record), len(record))) 
 
-        if record[2] != self.fields['REC_TYP']['Value']:
+        if record[2] != self.get_value('REC_TYP'):
             raise STDFError("%s_unpack(%s) : REC_TYP doesn't match record" % hexify(record))
         
-        if record[3] != self.fields['REC_SUB']['Value']:
+        if record[3] != self.get_value('REC_SUB'):
             raise STDFError("%s_unpack(%s) : REC_SUB doesn't match record" % (self.id, hexify(record)))
 
-        items = {}
-        for index in self.fields:
-            items[self.fields[index]['#']]=index
-        for index in range(len(items)):
-            self._unpack_item(items[index])
+        codec = record_codec.get(self)
+        if len(record) >= codec.size: # all fixed width leading fields are present
+            self.offset = codec.unpack(self, self.buffer)
+            for field in codec.tail:
+                self._unpack_item(field)
+        else: # short record, some of the fixed width fields are missing
+            for field in self.schema.names:
+                self._unpack_item(field)
+        self.buffer = b'' # don't hold on to the (shared) read buffer
+        self.offset = 0
         
+    def _lazy_unpack(self, record):
+        '''
+        Private method to unpack a record lazy : only the header is checked and the raw record is kept,
+        the fields are decoded on first access (see get_value).
+        '''
+        if record[2] != self.get_value('REC_TYP'):
+            raise STDFError("%s_unpack(%s) : REC_TYP doesn't match record" % (self.id, hexify(record)))
+        if record[3] != self.get_value('REC_SUB'):
+            raise STDFError("%s_unpack(%s) : REC_SUB doesn't match record" % (self.id, hexify(record)))
+        if len(record) < record_codec.get(self).size: # short record, not worth being lazy
+            self._unpack(record)
+            return
+        self.buffer = bytes(record)
+        self.offset = 0
+        self.values = [not_decoded] * len(self.values)
+
+    def is_lazy(self):
+        '''
+        returns True if (some of) the fields of this record are not decoded yet.
+        '''
+        return len(self.buffer) != 0
+
+    def _decode(self, FieldID=None):
+        '''
+        Private method that decodes a lazy record up to FieldID (everything if FieldID is None) 
+        and returns the value of FieldID.
+        A fixed width field (in the head of the record) costs one unpack_from, a field in the 
+        (variable length) tail needs the head and all tail fields before it to be decoded.
+        '''
+        codec = record_codec.get(self)
+        schema = self.schema
+        if FieldID != None:
+            index = schema.index[FieldID]
+            if index in codec.items:
+                offset, item, decode = codec.items[index]
+                value = item.unpack_from(self.buffer, offset)[0]
+                if decode != None:
+                    value = decode(value)
+                self.values[index] = value
+                return value
+        if self.offset == 0: # the head holds the references for the tail
+            self.offset = codec.unpack(self, self.buffer)
+        for field in codec.tail:
+            if self.values[schema.index[field]] is not_decoded:
+                self.values[schema.index[field]] = schema.defaults[schema.index[field]]
+                self._unpack_item(field)
+            if field == FieldID:
+                break
+        if FieldID == None or self.values[-1] is not not_decoded: # completely decoded
+            self.buffer = b''
+            self.offset = 0
+        if FieldID == None:
+            return None
+        return self.values[index]
+
     def Vn_decode(self, BUFF, endian):
         '''
         This method unpacks a V*n field
@@ -1665,8 +2032,10 @@ class STDR(ABC):
         return retval
     
     def __len__(self):
+        if self.is_lazy():
+            self._decode()
         retval = 0
-        for field in self.fields:
+        for field in self._packed_fields():
             retval += self._type_size(field)
         return retval
     
@@ -1675,14 +2044,12 @@ class STDR(ABC):
         '''
         Method that packs the whole record and returns the packed version.
         '''
-        sequence = {}
+        if self.is_lazy():
+            self._decode()
+        sequence = self._packed_fields()
         header = b''
         body = b''
 
-        # create the sequence order
-        for field in self.fields:
-            sequence[self.fields[field]['#']] = field
-            
         # pack the body
         for item in range(3, len(sequence)):
             body += self._pack_item(sequence[item])
@@ -1708,28 +2075,28 @@ class STDR(ABC):
         Method used by print to print the STDF record.
         '''
         time_fields = ['MOD_TIM', 'SETUP_T', 'START_T', 'FINISH_T']
-        sequence = {}
-        for field in self.fields:
-            sequence[self.fields[field]['#']] = field
+        if self.is_lazy():
+            self._decode()
+        schema = self.schema
         retval = "   %s (%d,%d) @ %s\n" % (self.id, self.get_value('REC_TYP'), self.get_value('REC_SUB'), self.version)
-        for field in sorted(sequence):
-            retval += "      %s = '%s'" % (sequence[field], self.fields[sequence[field]]['Value'])
-            retval += " [%s] (%s)" %  (self.fields[sequence[field]]['Type'], self.fields[sequence[field]]['Text'].strip())
-            if self.fields[sequence[field]]['Ref'] != None:
-                retval += " -> %s" % self.fields[sequence[field]]['Ref']
-            if sequence[field] in time_fields:
-                retval += " = %s" % DT(float(self.fields[sequence[field]]['Value']))
+        for index, field in enumerate(schema.names):
+            retval += "      %s = '%s'" % (field, self.values[index])
+            retval += " [%s] (%s)" %  (schema.types[index], schema.fields[field]['Text'].strip())
+            if schema.refs[index] != None:
+                retval += " -> %s" % schema.refs[index]
+            if field in time_fields:
+                retval += " = %s" % DT(float(self.values[index]))
             retval += "\n"
         return retval
                 
 ###################################################################################################################################################
 #TODO: change 'V4' and 'V3' in self.version to 4 and 3 respectively
-#TODO: Implement the FPE (Field Present Expression) in all records
-#TODO: Impleent support for the FPE in packing/unpacking
-#TODO: Run trough all records and set the FPE correct
+#TODO: Run trough all records and set the FPE correct (done for PTR and MPR)
 
 class ADR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = ''
         self.local_debug = False
         # Version
@@ -1763,10 +2130,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class ASR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = ''
         self.local_debug = False
         # Version
@@ -1801,10 +2169,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class ATR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'ATR'
         self.local_debug = False
         # Version
@@ -1839,10 +2208,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class BPS(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self. id = 'BPS'
         self.local_debug = False
         # Version
@@ -1870,10 +2240,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class BRR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self. id = 'BRR'
         self.local_debug = False
         # Version
@@ -1902,10 +2273,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class BSR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'BSR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -1940,10 +2312,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class CDR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'CDR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -1982,10 +2355,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class CNR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'CNR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2014,10 +2388,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class DTR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'DTR'
         self.local_debug = False
         # Version
@@ -2049,10 +2424,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class EPDR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'EPDR'
         self.local_debug = False
         # Version
@@ -2085,10 +2461,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class EPS(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'EPS'
         self.local_debug = False
         # Version
@@ -2114,10 +2491,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class ETSR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'ETSR'
         self.local_debug = False
         # Version
@@ -2162,10 +2540,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class FAR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'FAR'
         self.local_debug = False
         if version==None or version=='V4' or version=='V3':
@@ -2194,10 +2573,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class FDR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'FDR'
         self.local_debug = False
         if version==None or version=='V3':
@@ -2226,10 +2606,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class FSR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'FSR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -2263,10 +2644,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class FTR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'FTR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2366,10 +2748,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class GDR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'GDR'
         self.local_debug = False
         if version==None or version=='V4' or version=='V3':
@@ -2400,10 +2783,11 @@ Location:
             }    
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class GTR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'GTR'
         self.local_debug = False
         if version==None or version=='V3':
@@ -2427,10 +2811,11 @@ Location:
             }    
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class HBR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'HBR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -2500,10 +2885,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class IDR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'IDR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2535,10 +2921,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class MCR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MCR'
         self.local_debug = False
         if version == 'V4':
@@ -2570,10 +2957,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class MIR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MIR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2602,7 +2990,7 @@ Location:
                 'REC_TYP'  : {'#' :  1, 'Type' : 'U*1', 'Ref' : None, 'Value' :    1, 'Text' : 'Record type                           ', 'Missing' :       None},
                 'REC_SUB'  : {'#' :  2, 'Type' : 'U*1', 'Ref' : None, 'Value' :   10, 'Text' : 'Record sub-type                       ', 'Missing' :       None},
                 'SETUP_T'  : {'#' :  3, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time of job setup            ', 'Missing' :  'START_T'},
-                'START_T'  : {'#' :  4, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time first part tested       ', 'Missing' : DT().epoch},
+                'START_T'  : {'#' :  4, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time first part tested       ', 'Missing' : sys_epoch},
                 'STAT_NUM' : {'#' :  5, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : 'Tester station number                 ', 'Missing' :          0},
                 'MODE_COD' : {'#' :  6, 'Type' : 'C*1', 'Ref' : None, 'Value' : None, 'Text' : 'Test mode code : A/M/P/E/M/P/Q/space  ', 'Missing' :        ' '},
                 'RTST_COD' : {'#' :  7, 'Type' : 'C*1', 'Ref' : None, 'Value' : None, 'Text' : 'Lot retest code : Y/N/0..9/space      ', 'Missing' :        ' '},
@@ -2673,7 +3061,7 @@ Location:
                 'PROT_COD' : {'#' :  9, 'Type' : 'C*1', 'Ref' : None, 'Value' : None, 'Text' : 'Data protection code 0..9/A..Z/space  ', 'Missing' :          ' '},
                 'CMOD_COD' : {'#' : 10, 'Type' : 'C*1', 'Ref' : None, 'Value' : None, 'Text' : 'Command mode code                     ', 'Missing' :          ' '},
                 'SETUP_T'  : {'#' : 11, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time of job setup            ', 'Missing' :    'START_T'},
-                'START_T'  : {'#' : 12, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time first part tested       ', 'Missing' :   DT().epoch},
+                'START_T'  : {'#' : 12, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time first part tested       ', 'Missing' :    sys_epoch},
                 'LOT_ID'   : {'#' : 13, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Lot ID (customer specified)           ', 'Missing' :           ''},
                 'PART_TYP' : {'#' : 14, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Part Type (or product ID)             ', 'Missing' :           ''},
                 'JOB_NAM'  : {'#' : 15, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Job name (test program name)          ', 'Missing' :           ''},
@@ -2690,10 +3078,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class MMR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MMR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2731,10 +3120,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class MPR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MPR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -2758,43 +3148,44 @@ Location:
     and before the corresponding Part Result Record (PRR).
 '''
             self.fields = {
-                'REC_LEN'  : {'#' :  0, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Bytes of data following header        ', 'Missing' :                                     None},
-                'REC_TYP'  : {'#' :  1, 'Type' : 'U*1',  'Ref' :       None, 'Value' :   15, 'Text' : 'Record type                           ', 'Missing' :                                     None},
-                'REC_SUB'  : {'#' :  2, 'Type' : 'U*1',  'Ref' :       None, 'Value' :   15, 'Text' : 'Record sub-type                       ', 'Missing' :                                     None},        
-                'TEST_NUM' : {'#' :  3, 'Type' : 'U*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test number                           ', 'Missing' :                                     None},
-                'HEAD_NUM' : {'#' :  4, 'Type' : 'U*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test head number                      ', 'Missing' :                                        1},
-                'SITE_NUM' : {'#' :  5, 'Type' : 'U*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test site number                      ', 'Missing' :                                        1},
-                'TEST_FLG' : {'#' :  6, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test flags (fail, alarm, etc.)        ', 'Missing' :                                  ['0']*8},
-                'PARM_FLG' : {'#' :  7, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Parametric test flags (drift, etc.)   ', 'Missing' : ['1', '1', '0', '0', '0', '0', '0', '0']}, # 0xC0
-                'RTN_ICNT' : {'#' :  8, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Count (j) of PMR indexes              ', 'Missing' :                                        0},
-                'RSLT_CNT' : {'#' :  9, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Count (k) of returned results         ', 'Missing' :                                        0},
-                'RTN_STAT' : {'#' : 10, 'Type' : 'xN*1', 'Ref' : 'RTN_ICNT', 'Value' : None, 'Text' : 'Array of j returned states            ', 'Missing' :                                       []}, # RTN_ICNT = 0
-                'RTN_RSLT' : {'#' : 11, 'Type' : 'xR*4', 'Ref' : 'RSLT_CNT', 'Value' : None, 'Text' : 'Array of k returned results           ', 'Missing' :                                       []}, # RSLT_CNT = 0
-                'TEST_TXT' : {'#' : 12, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Descriptive text or label             ', 'Missing' :                                       ''},
-                'ALARM_ID' : {'#' : 13, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Name of alarm                         ', 'Missing' :                                       ''},
-                'OPT_FLAG' : {'#' : 14, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Optional data flag See note           ', 'Missing' : ['0', '0', '0', '0', '0', '0', '1', '0']}, # 0x02
-                'RES_SCAL' : {'#' : 15, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test result scaling exponent          ', 'Missing' :                                        0}, # OPT_FLAG bit 0 = 1
-                'LLM_SCAL' : {'#' : 16, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test low limit scaling exponent       ', 'Missing' :                                        0}, # OPT_FLAG bit 4 or 6 = 1
-                'HLM_SCAL' : {'#' : 17, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test high limit scaling exponent      ', 'Missing' :                                        0}, # OPT_FLAG bit 5 or 7 = 1
-                'LO_LIMIT' : {'#' : 18, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test low limit value                  ', 'Missing' :                                      0.0}, # OPT_FLAG bit 4 or 6 = 1
-                'HI_LIMIT' : {'#' : 19, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test high limit value                 ', 'Missing' :                                      0.0}, # OPT_FLAG bit 5 or 7 = 1
-                'START_IN' : {'#' : 20, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Starting input value [condition]      ', 'Missing' :                                      0.0}, # OPT_FLAG bit 1 = 1
-                'INCR_IN'  : {'#' : 21, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Increment of input condition          ', 'Missing' :                                       -1}, # OPT_FLAG bit 1 = 1
-                'RTN_INDX' : {'#' : 22, 'Type' : 'xU*2', 'Ref' : 'RTN_ICNT', 'Value' : None, 'Text' : 'Array of j PMR indexes                ', 'Missing' :                                       []}, # RTN_ICNT = 0
-                'UNITS'    : {'#' : 23, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Units of returned results             ', 'Missing' :                                       ''},
-                'UNITS_IN' : {'#' : 24, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Input condition units                 ', 'Missing' :                                       ''},
-                'C_RESFMT' : {'#' : 25, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C result format string           ', 'Missing' :                                       ''},
-                'C_LLMFMT' : {'#' : 26, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C low limit format string        ', 'Missing' :                                       ''},
-                'C_HLMFMT' : {'#' : 27, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C high limit format string       ', 'Missing' :                                       ''},
-                'LO_SPEC'  : {'#' : 28, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Low specification limit value         ', 'Missing' :                                      0.0}, # OPT_FLAG bit 2 = 1
-                'HI_SPEC'  : {'#' : 29, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'High specification limit value        ', 'Missing' :                                      0.0}  # OPT_FLAG bit 3 = 1    
+                'REC_LEN'  : {'#' :  0, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Bytes of data following header        ', 'FPE' : None, 'Missing' :                                     None},
+                'REC_TYP'  : {'#' :  1, 'Type' : 'U*1',  'Ref' :       None, 'Value' :   15, 'Text' : 'Record type                           ', 'FPE' : None, 'Missing' :                                     None},
+                'REC_SUB'  : {'#' :  2, 'Type' : 'U*1',  'Ref' :       None, 'Value' :   15, 'Text' : 'Record sub-type                       ', 'FPE' : None, 'Missing' :                                     None},        
+                'TEST_NUM' : {'#' :  3, 'Type' : 'U*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test number                           ', 'FPE' : None, 'Missing' :                                     None},
+                'HEAD_NUM' : {'#' :  4, 'Type' : 'U*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test head number                      ', 'FPE' : None, 'Missing' :                                        1},
+                'SITE_NUM' : {'#' :  5, 'Type' : 'U*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test site number                      ', 'FPE' : None, 'Missing' :                                        1},
+                'TEST_FLG' : {'#' :  6, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test flags (fail, alarm, etc.)        ', 'FPE' : None, 'Missing' :                                  ['0']*8},
+                'PARM_FLG' : {'#' :  7, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Parametric test flags (drift, etc.)   ', 'FPE' : None, 'Missing' : ['1', '1', '0', '0', '0', '0', '0', '0']}, # 0xC0
+                'RTN_ICNT' : {'#' :  8, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Count (j) of PMR indexes              ', 'FPE' : None, 'Missing' :                                        0},
+                'RSLT_CNT' : {'#' :  9, 'Type' : 'U*2',  'Ref' :       None, 'Value' : None, 'Text' : 'Count (k) of returned results         ', 'FPE' : None, 'Missing' :                                        0},
+                'RTN_STAT' : {'#' : 10, 'Type' : 'xN*1', 'Ref' : 'RTN_ICNT', 'Value' : None, 'Text' : 'Array of j returned states            ', 'FPE' : None, 'Missing' :                                       []}, # RTN_ICNT = 0
+                'RTN_RSLT' : {'#' : 11, 'Type' : 'xR*4', 'Ref' : 'RSLT_CNT', 'Value' : None, 'Text' : 'Array of k returned results           ', 'FPE' : None, 'Missing' :                                       []}, # RSLT_CNT = 0
+                'TEST_TXT' : {'#' : 12, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Descriptive text or label             ', 'FPE' : None, 'Missing' :                                       ''},
+                'ALARM_ID' : {'#' : 13, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Name of alarm                         ', 'FPE' : None, 'Missing' :                                       ''},
+                'OPT_FLAG' : {'#' : 14, 'Type' : 'B*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Optional data flag See note           ', 'FPE' : None, 'Missing' : ['0', '0', '0', '0', '0', '0', '1', '0']}, # 0x02
+                'RES_SCAL' : {'#' : 15, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test result scaling exponent          ', 'FPE' : 0x01, 'Missing' :                                        0}, # OPT_FLAG bit 0 = 1
+                'LLM_SCAL' : {'#' : 16, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test low limit scaling exponent       ', 'FPE' : 0x50, 'Missing' :                                        0}, # OPT_FLAG bit 4 or 6 = 1
+                'HLM_SCAL' : {'#' : 17, 'Type' : 'I*1',  'Ref' :       None, 'Value' : None, 'Text' : 'Test high limit scaling exponent      ', 'FPE' : 0xA0, 'Missing' :                                        0}, # OPT_FLAG bit 5 or 7 = 1
+                'LO_LIMIT' : {'#' : 18, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test low limit value                  ', 'FPE' : 0x50, 'Missing' :                                      0.0}, # OPT_FLAG bit 4 or 6 = 1
+                'HI_LIMIT' : {'#' : 19, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Test high limit value                 ', 'FPE' : 0xA0, 'Missing' :                                      0.0}, # OPT_FLAG bit 5 or 7 = 1
+                'START_IN' : {'#' : 20, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Starting input value [condition]      ', 'FPE' : 0x02, 'Missing' :                                      0.0}, # OPT_FLAG bit 1 = 1
+                'INCR_IN'  : {'#' : 21, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Increment of input condition          ', 'FPE' : 0x02, 'Missing' :                                       -1}, # OPT_FLAG bit 1 = 1
+                'RTN_INDX' : {'#' : 22, 'Type' : 'xU*2', 'Ref' : 'RTN_ICNT', 'Value' : None, 'Text' : 'Array of j PMR indexes                ', 'FPE' : None, 'Missing' :                                       []}, # RTN_ICNT = 0
+                'UNITS'    : {'#' : 23, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Units of returned results             ', 'FPE' : None, 'Missing' :                                       ''},
+                'UNITS_IN' : {'#' : 24, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'Input condition units                 ', 'FPE' : None, 'Missing' :                                       ''},
+                'C_RESFMT' : {'#' : 25, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C result format string           ', 'FPE' : None, 'Missing' :                                       ''},
+                'C_LLMFMT' : {'#' : 26, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C low limit format string        ', 'FPE' : None, 'Missing' :                                       ''},
+                'C_HLMFMT' : {'#' : 27, 'Type' : 'C*n',  'Ref' :       None, 'Value' : None, 'Text' : 'ANSI C high limit format string       ', 'FPE' : None, 'Missing' :                                       ''},
+                'LO_SPEC'  : {'#' : 28, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'Low specification limit value         ', 'FPE' : 0x04, 'Missing' :                                      0.0}, # OPT_FLAG bit 2 = 1
+                'HI_SPEC'  : {'#' : 29, 'Type' : 'R*4',  'Ref' :       None, 'Value' : None, 'Text' : 'High specification limit value        ', 'FPE' : 0x08, 'Missing' :                                      0.0}  # OPT_FLAG bit 3 = 1    
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class MRR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MRR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -2820,7 +3211,7 @@ Location:
                 'REC_LEN'  : {'#' : 0, 'Type' : 'U*2', 'Ref' : None, 'Value' : None, 'Text' : 'Bytes of data following header        ', 'Missing' :       None}, 
                 'REC_TYP'  : {'#' : 1, 'Type' : 'U*1', 'Ref' : None, 'Value' :    1, 'Text' : 'Record type                           ', 'Missing' :       None},
                 'REC_SUB'  : {'#' : 2, 'Type' : 'U*1', 'Ref' : None, 'Value' :   20, 'Text' : 'Record sub-type                       ', 'Missing' :       None},
-                'FINISH_T' : {'#' : 3, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time last part tested        ', 'Missing' : DT().epoch},
+                'FINISH_T' : {'#' : 3, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time last part tested        ', 'Missing' : sys_epoch},
                 'DISP_COD' : {'#' : 4, 'Type' : 'C*1', 'Ref' : None, 'Value' : None, 'Text' : 'Lot disposition code                  ', 'Missing' :        ' '},
                 'USR_DESC' : {'#' : 5, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Lot description supplied by user      ', 'Missing' :         ''},
                 'EXC_DESC' : {'#' : 6, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Lot description supplied by exec      ', 'Missing' :         ''}
@@ -2848,7 +3239,7 @@ Location:
                 'REC_LEN'  : {'#' :  0, 'Type' : 'U*2', 'Ref' : None, 'Value' : None, 'Text' : 'Bytes of data following header        ', 'Missing' :       None}, 
                 'REC_TYP'  : {'#' :  1, 'Type' : 'U*1', 'Ref' : None, 'Value' :    1, 'Text' : 'Record type                           ', 'Missing' :       None},
                 'REC_SUB'  : {'#' :  2, 'Type' : 'U*1', 'Ref' : None, 'Value' :   20, 'Text' : 'Record sub-type                       ', 'Missing' :       None},
-                'FINISH_T' : {'#' :  3, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time last part tested        ', 'Missing' : DT().epoch},
+                'FINISH_T' : {'#' :  3, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Date and time last part tested        ', 'Missing' : sys_epoch},
                 'PART_CNT' : {'#' :  4, 'Type' : 'U*4', 'Ref' : None, 'Value' : None, 'Text' : 'Number of parts tested                ', 'Missing' :          0},
                 'RTST_CNT' : {'#' :  5, 'Type' : 'I*4', 'Ref' : None, 'Value' : None, 'Text' : 'Number of parts retested              ', 'Missing' :          0},
                 'ABRT_CNT' : {'#' :  6, 'Type' : 'I*4', 'Ref' : None, 'Value' : None, 'Text' : 'Number of parts aborted               ', 'Missing' :          0},
@@ -2860,10 +3251,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class MSR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'MSR'
         self.local_debug = False
         if version == 'V4':
@@ -2899,10 +3291,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class MTR(STDR):
-    def __init__(self, version=None, endian=None, record=None,  BSR__ADDR_SIZ=None, BSR__WC_SIZ=None):
+    __slots__ = ()
+
+    def define(self, version=None, BSR__ADDR_SIZ=None, BSR__WC_SIZ=None):
         self.id = 'MTR'
         self.local_debug = False
         if version == 'V4':
@@ -2991,10 +3384,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class NMR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'NMR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3027,10 +3421,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class PCR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PCR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3066,10 +3461,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class PDR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PDR'
         self.local_debug = False
         if version==None or version=='V3':
@@ -3111,10 +3507,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class PGR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PGR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3145,10 +3542,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
     
 class PIR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PIR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3208,10 +3606,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class PLR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PLR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3247,10 +3646,11 @@ Location:
             }    
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class PMR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PMR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3311,10 +3711,11 @@ Location:
             raise STDFError("%s object for STDF '%s' is not yet implemented" % (self.id, self.version))
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class PRR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PRR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3391,10 +3792,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class PSR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PSR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3436,10 +3838,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class PTR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'PTR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -3478,18 +3881,18 @@ Location:
                 'RESULT'   : {'#' :  8, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Test result                           ', 'FPE' : None,                                     'Missing' : 0.0    },
                 'TEST_TXT' : {'#' :  9, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Test description text or label        ', 'FPE' : None,                                     'Missing' : ''     },
                 'ALARM_ID' : {'#' : 10, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Name of alarm                         ', 'FPE' : None,                                     'Missing' : ''     },
-                'OPT_FLAG' : {'#' : 11, 'Type' : 'B*1', 'Ref' : None, 'Value' : None, 'Text' : 'Optional data flag                    ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 255    }, #TODO: Needs some more work
-                'RES_SCAL' : {'#' : 12, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Test results scaling exponent         ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0      },
-                'LLM_SCAL' : {'#' : 13, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Low limit scaling exponent            ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0      },
-                'HLM_SCAL' : {'#' : 14, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'High limit scaling exponent           ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0      },
-                'LO_LIMIT' : {'#' : 15, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low test limit value                  ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0.0    },
-                'HI_LIMIT' : {'#' : 16, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High test limit value                 ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0.0    },
+                'OPT_FLAG' : {'#' : 11, 'Type' : 'B*1', 'Ref' : None, 'Value' : None, 'Text' : 'Optional data flag                    ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 255    },
+                'RES_SCAL' : {'#' : 12, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Test results scaling exponent         ', 'FPE' : 0x01,                                     'Missing' : 0      },
+                'LLM_SCAL' : {'#' : 13, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Low limit scaling exponent            ', 'FPE' : 0x50,                                     'Missing' : 0      },
+                'HLM_SCAL' : {'#' : 14, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'High limit scaling exponent           ', 'FPE' : 0xA0,                                     'Missing' : 0      },
+                'LO_LIMIT' : {'#' : 15, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low test limit value                  ', 'FPE' : 0x50,                                     'Missing' : 0.0    },
+                'HI_LIMIT' : {'#' : 16, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High test limit value                 ', 'FPE' : 0xA0,                                     'Missing' : 0.0    },
                 'UNITS'    : {'#' : 17, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Test units                            ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : ''     },
                 'C_RESFMT' : {'#' : 18, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'ANSI C result format string           ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : ''     },
                 'C_LLMFMT' : {'#' : 19, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'ANSI C low limit format string        ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : ''     },
                 'C_HLMFMT' : {'#' : 20, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'ANSI C high limit format string       ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : ''     },
-                'LO_SPEC'  : {'#' : 21, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low specification limit value         ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0.0    },
-                'HI_SPEC'  : {'#' : 22, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High specification limit value        ', 'FPE' : "self.fields['OPT_FLAG']['Value']!=None", 'Missing' : 0.0    }
+                'LO_SPEC'  : {'#' : 21, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low specification limit value         ', 'FPE' : 0x04,                                     'Missing' : 0.0    },
+                'HI_SPEC'  : {'#' : 22, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High specification limit value        ', 'FPE' : 0x08,                                     'Missing' : 0.0    }
             }
         elif version == 'V3':
             self.version ='V3'
@@ -3526,29 +3929,30 @@ Location:
                 'PARM_FLG' : {'#' :  7, 'Type' : 'B*1', 'Ref' : None, 'Value' : None, 'Text' : 'Parametric test flags (drift, etc.)   ', 'FPE' : None, 'Missing' : ['0']*8  },
                 'RESULT'   : {'#' :  8, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Test result                           ', 'FPE' : None, 'Missing' : 0.0      },
                 'OPT_FLAG' : {'#' :  9, 'Type' : 'B*1', 'Ref' : None, 'Value' : None, 'Text' : 'Optional data flag                    ', 'FPE' : None, 'Missing' : ['0']*8  },
-                'RES_SCAL' : {'#' : 10, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Test results scaling exponent         ', 'FPE' : None, 'Missing' : 0        },
+                'RES_SCAL' : {'#' : 10, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Test results scaling exponent         ', 'FPE' : 0x01, 'Missing' : 0        },
                 'RES_LDIG' : {'#' : 11, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
                 'RES_RDIG' : {'#' : 12, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
                 'DESC_FLG' : {'#' : 13, 'Type' : 'B*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : ['0']*8  },
                 'UNITS'    : {'#' : 14, 'Type' : 'C*7', 'Ref' : None, 'Value' : None, 'Text' : 'Test units                            ', 'FPE' : None, 'Missing' : '       '},
-                'LLM_SCAL' : {'#' : 15, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Low limit scaling exponent            ', 'FPE' : None, 'Missing' : 0        },
-                'HLM_SCAL' : {'#' : 16, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'High limit scaling exponent           ', 'FPE' : None, 'Missing' : 0        },
+                'LLM_SCAL' : {'#' : 15, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'Low limit scaling exponent            ', 'FPE' : 0x50, 'Missing' : 0        },
+                'HLM_SCAL' : {'#' : 16, 'Type' : 'I*1', 'Ref' : None, 'Value' : None, 'Text' : 'High limit scaling exponent           ', 'FPE' : 0xA0, 'Missing' : 0        },
                 'LLM_LDIG' : {'#' : 17, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
                 'LLM_RDIG' : {'#' : 18, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
                 'HLM_LDIG' : {'#' : 19, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
                 'HLM_RDIG' : {'#' : 20, 'Type' : 'U*1', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : 0        },
-                'LO_LIMIT' : {'#' : 21, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low test limit value                  ', 'FPE' : None, 'Missing' : 0.0      },
-                'HI_LIMIT' : {'#' : 22, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High test limit value                 ', 'FPE' : None, 'Missing' : 0.0      },
+                'LO_LIMIT' : {'#' : 21, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'Low test limit value                  ', 'FPE' : 0x50, 'Missing' : 0.0      },
+                'HI_LIMIT' : {'#' : 22, 'Type' : 'R*4', 'Ref' : None, 'Value' : None, 'Text' : 'High test limit value                 ', 'FPE' : 0xA0, 'Missing' : 0.0      },
                 'TEST_NAM' : {'#' : 23, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : ''       },
                 'SEQ_NAME' : {'#' : 24, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : '                                      ', 'FPE' : None, 'Missing' : ''       },
                 'TEST_TXT' : {'#' : 25, 'Type' : 'C*n', 'Ref' : None, 'Value' : None, 'Text' : 'Test description text or label        ', 'FPE' : None, 'Missing' : ''       }
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class RDR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'RDR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -3578,20 +3982,25 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class RR1(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'RR1'
         raise STDFError("%s object creation error : reserved object", self.id)
 
 class RR2(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'RR2'
         raise STDFError("%s object creation error : reserved object", self.id)
 
 class SBR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SBR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3661,10 +4070,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class SCR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SCR'
         self.local_debug = False
         if version == 'V3':
@@ -3700,10 +4110,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class SDR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SDR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -3750,10 +4161,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class SHB(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SHB'
         self.local_debug = False
         if version==None or version == 'V3':
@@ -3787,10 +4199,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
     
 class SSB(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SSB'
         self.local_debug = False
         if version==None or version == 'V3':
@@ -3824,10 +4237,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class SSR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'SSR'
         self.local_debug = False
         if version==None or version == 'V4':
@@ -3857,10 +4271,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class STR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'STR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -3946,10 +4361,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class STS(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'STS'
         self.local_debug = False
         if version==None or version=='V3':
@@ -3993,10 +4409,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
             
 class TSR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'TSR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -4085,10 +4502,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class VUR(STDR):
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'VUR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -4115,10 +4533,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class WCR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'WCR'
         self.local_debug = False
         if version==None or version=='V4' or version=='V3':
@@ -4156,10 +4575,11 @@ Location:
             }        
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class WIR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'WIR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -4222,10 +4642,11 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
         
 class WRR(STDR):
-    def __init__(self, version=None, endian=None, record=None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'WRR'
         self.local_debug = False
         if version==None or version=='V4':
@@ -4307,10 +4728,11 @@ Location:
             }            
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 class WTR(STDR): 
-    def __init__(self, version=None, endian=None, record = None):
+    __slots__ = ()
+
+    def define(self, version=None):
         self.id = 'WTR'
         self.local_debug = False
         if version==None or version=='V3':
@@ -4336,7 +4758,6 @@ Location:
             }
         else:
             raise STDFError("%s object creation error: unsupported version '%s'" % (self.id, version))
-        self._default_init(endian, record)
 
 def hexify(input):
     '''
@@ -4345,7 +4766,7 @@ def hexify(input):
     the input can be a byte array or a string, but the output is always a string.
     '''
     retval = ''
-    if isinstance(input, bytes):
+    if isinstance(input, (bytes, bytearray, memoryview)):
         for b in range(len(input)):
             retval += hex(input[b]).upper().replace('0X', '0x')
     elif isinstance(input, str):
@@ -4355,6 +4776,14 @@ def hexify(input):
         raise Exception("input type needs to be bytes or str.")
     return retval
 
+def record_from_values(record_class, version, arguments, endian, values):
+    '''
+    This function re-creates a record object from its values (used for pickling).
+    '''
+    retval = record_class(version, endian, **arguments)
+    retval.values = list(values)
+    return retval
+
 def sys_endian():
     '''
     This function determines the endian of the running system.
@@ -4368,6 +4797,12 @@ def sys_cpu():
         return 2
     return 1
 
+def sys_epoch():
+    '''
+    This function returns the current time (epoch), it is used as 'Missing' default for time fields.
+    '''
+    return DT().epoch
+
 def is_odd(Number):
     '''
     This function will return True if the Number is odd, False otherwise    
@@ -4400,18 +4835,46 @@ def read_indexed_record(fd, fp, RHF):
     footer = fd.read(REC_LEN)
     return REC_LEN, REC_TYP, REC_SUB, header+footer
 
+def TS_of_interest(Version, of_interest=None):
+    '''
+    This function returns the set of (REC_TYP, REC_SUB) tuples for of_interest.
+    of_interest is a list of record ID's (eg: 'PTR') and/or (REC_TYP, REC_SUB) tuples,
+    if it is None, all records of Version are of interest.
+    If of_interest is not supported, None is returned.
+    '''
+    TS2ID = ts_to_id(Version)
+    if of_interest==None:
+        return set(TS2ID)
+    elif isinstance(of_interest, list):
+        ID2TS = id_to_ts(Version)
+        retval = set()
+        for item in of_interest:
+            if isinstance(item, str):
+                if item in ID2TS:
+                    retval.add(ID2TS[item])
+            elif isinstance(item, tuple) and len(item)==2:
+                if item in TS2ID:
+                    retval.add(item)
+        return retval
+    return None
+
 class records_from_file(object):
     '''
     Generator class to run over the records in FileName.
     The return values are 4-fold : REC_LEN, REC_TYP, REC_SUB and REC 
     REC is the complete record (including REC_LEN, REC_TYP & REC_SUB)
-    if unpack indicates if REC is to be the raw record or the unpacked object.
+    if unpack indicates if REC is to be the raw record or the unpacked object,
+    if unpack is 'lazy', the objects only decode their fields on first access.
     of_interest can be a list of records to return. By default of_interest is void
     meaning all records (of FileName's STDF Version) are used.
+    The file is read in big chunks (read_size bytes), if views is True, the raw 
+    records are returned as memoryviews into that (shared) read buffer, otherwise
+    they are returned as bytes.
     '''
     debug = False
+    read_size = 1024 * 1024
     
-    def __init__(self, FileName, unpack=False, of_interest=None):
+    def __init__(self, FileName, unpack=False, of_interest=None, views=False):
         if self.debug: print("initializing 'records_from_file")
         if isinstance(FileName, str):
             self.keep_open = False
@@ -4419,7 +4882,10 @@ class records_from_file(object):
                 STDFError("'%s' does not exist")
             self.endian = get_STDF_setup_from_file(FileName)[0]
             self.version = 'V%s' % struct.unpack('B', get_bytes_from_file(FileName, 5, 1))
-            self.fd = open(FileName, 'rb')
+            if is_compressed_file(FileName):
+                self.fd = seekable_file(FileName)
+            else:
+                self.fd = open(FileName, 'rb')
         elif isinstance(FileName, io.IOBase):
             self.keep_open = True
             self.fd = FileName
@@ -4436,24 +4902,13 @@ class records_from_file(object):
         else:
             STDFError("'%s' is not a string or an open file descriptor")
         self.unpack = unpack
+        self.views = views
         self.fmt = '%sHBB' % self.endian
-        TS2ID = ts_to_id(self.version)
-        if of_interest==None:
-            self.records_of_interest = TS2ID
-        elif isinstance(of_interest, list):
-            ID2TS = id_to_ts(self.version)
-            tmp_list = []
-            for item in of_interest:
-                if isinstance(item, str):
-                    if item in ID2TS:
-                        if ID2TS[item] not in tmp_list:
-                            tmp_list.append(ID2TS[item])
-                elif isinstance(item, tuple) and len(item)==2:
-                    if item in TS2ID:
-                        if item not in tmp_list:
-                            tmp_list.append(item)
-            self.records_of_interest = tmp_list
-        else:
+        self.header = struct.Struct(self.fmt)
+        self.chunk = memoryview(b'')
+        self.pos = 0
+        self.records_of_interest = TS_of_interest(self.version, of_interest)
+        if self.records_of_interest == None:
             raise STDFError("objects_from_file(%s, %s) : Unsupported of_interest" % (FileName, of_interest))
         
     def __del__(self):
@@ -4463,33 +4918,154 @@ class records_from_file(object):
     def __iter__(self):
         return self
     
+    def _fill(self, needed):
+        '''
+        Makes sure there are at least 'needed' bytes available in the read buffer (if the file allows).
+        The remainder of the current chunk is carried over into a new chunk, so that memoryviews
+        handed out before stay valid.
+        '''
+        remainder = self.chunk[self.pos:]
+        data = self.fd.read(max(self.read_size, needed - len(remainder)))
+        self.chunk = memoryview(bytes(remainder) + data)
+        self.pos = 0
+        return len(self.chunk) >= needed
+
     def __next__(self):
         while self.fd!=None:
-            header = self.fd.read(4)
-            if len(header)!=4:
+            if len(self.chunk) - self.pos < 4 and not self._fill(4):
                 raise StopIteration
-            else:
-                REC_LEN, REC_TYP, REC_SUB = struct.unpack(self.fmt, header)
-                footer = self.fd.read(REC_LEN)
-                if (REC_TYP, REC_SUB) in self.records_of_interest:
-                    if len(footer)!=REC_LEN:
-                        raise StopIteration()
-                    else:
-                        if self.unpack:
-                            return REC_LEN, REC_TYP, REC_SUB, create_record_object(self.version, self.endian, (REC_TYP, REC_SUB), header+footer)
-                        else:
-                            return REC_LEN, REC_TYP, REC_SUB, header+footer
+            REC_LEN, REC_TYP, REC_SUB = self.header.unpack_from(self.chunk, self.pos)
+            if len(self.chunk) - self.pos < 4 + REC_LEN and not self._fill(4 + REC_LEN):
+                raise StopIteration
+            start = self.pos
+            self.pos += 4 + REC_LEN
+            if (REC_TYP, REC_SUB) in self.records_of_interest:
+                record = self.chunk[start:self.pos]
+                if self.unpack == 'lazy':
+                    return REC_LEN, REC_TYP, REC_SUB, create_record_object(self.version, self.endian, (REC_TYP, REC_SUB), bytes(record), True)
+                elif self.unpack:
+                    return REC_LEN, REC_TYP, REC_SUB, create_record_object(self.version, self.endian, (REC_TYP, REC_SUB), record)
+                elif self.views:
+                    return REC_LEN, REC_TYP, REC_SUB, record
+                else:
+                    return REC_LEN, REC_TYP, REC_SUB, bytes(record)
+        raise StopIteration
+
+class records_from_mmap(object):
+    '''
+    Memory mapped reader for *uncompressed* STDF files.
+    
+    Iterating walks the record headers in place and yields 4-fold tuples :
+        offset, REC_TYP, REC_SUB and REC
+    where offset is the file position of the record and REC is a memoryview 
+    on the complete record (including REC_LEN, REC_TYP & REC_SUB) into the map.
+    of_interest can be a list of records to yield. By default of_interest is void
+    meaning all records (of FileName's STDF Version) are yielded.
+    
+    record_at(offset) returns the record at a known offset (from a previous
+    iteration or an index) without any seek or read.
+    
+    Note: the map can only be closed once all handed out memoryviews are released.
+    '''
+    def __init__(self, FileName, of_interest=None):
+        self.map = None
+        if not isinstance(FileName, str): 
+            raise STDFError("'%s' is not a string" % FileName)
+        if not os.path.isfile(FileName): 
+            raise STDFError("'%s' does not exist" % FileName)
+        if is_compressed_file(FileName):
+            raise STDFError("'%s' is compressed, can not memory map it" % FileName)
+        self.fd = open(FileName, 'rb')
+        self.size = os.fstat(self.fd.fileno()).st_size
+        if self.size < 6:
+            self.fd.close()
+            raise STDFError("'%s' is not an STDF file" % FileName)
+        self.map = mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        CPU_TYPE, STDF_VER = self.view[4], self.view[5]
+        if CPU_TYPE == 1: self.endian = '>'
+        elif CPU_TYPE == 2: self.endian = '<'
+        else: 
+            self.close()
+            raise STDFError("'%s' has an unsupported CPU_TYPE (%s)" % (FileName, CPU_TYPE))
+        self.version = 'V%s' % STDF_VER
+        self.header = struct.Struct('%sHBB' % self.endian)
+        self.records_of_interest = TS_of_interest(self.version, of_interest)
+        if self.records_of_interest == None:
+            self.close()
+            raise STDFError("records_from_mmap(%s, %s) : Unsupported of_interest" % (FileName, of_interest))
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError: # there are still memoryviews in use
+            pass
+        
+    def close(self):
+        '''
+        Closes the map (and file), raises BufferError if records are still referenced.
+        '''
+        if self.map != None:
+            self.view.release()
+            self.map.close()
+            self.map = None
+            self.fd.close()
+        
+    def __iter__(self):
+        view = self.view
+        size = self.size
+        unpack_from = self.header.unpack_from
+        records_of_interest = self.records_of_interest
+        offset = 0
+        while offset + 4 <= size:
+            REC_LEN, REC_TYP, REC_SUB = unpack_from(view, offset)
+            end = offset + 4 + REC_LEN
+            if end > size: # truncated record
+                break
+            if (REC_TYP, REC_SUB) in records_of_interest:
+                yield offset, REC_TYP, REC_SUB, view[offset:end]
+            offset = end
 
-def objects_from_indexed_file(FileName, index, records_of_interest=None):
+    def record_at(self, offset):
+        '''
+        returns a memoryview on the complete record at offset
+        '''
+        REC_LEN = self.header.unpack_from(self.view, offset)[0]
+        end = offset + 4 + REC_LEN
+        if end > self.size:
+            raise STDFError("record_at(%s) : record runs past the end of the file" % offset)
+        return self.view[offset:end]
+
+    def TS_at(self, offset):
+        '''
+        returns (REC_TYP, REC_SUB) of the record at offset
+        '''
+        return self.view[offset+2], self.view[offset+3]
+
+def objects_from_indexed_file(FileName, index, records_of_interest=None, checkpoints=None):
     '''
      This is a Generator of records (not in order!) 
+     Compressed files are read from the nearest checkpoint on (see ATE.utils.seekable),
+     checkpoints (optional) are the ones from a previous scan of the file.
     '''
     if not isinstance(FileName, str): STDFError("'%s' is not a string.")
     if not os.path.exists(FileName): STDFError("'%s' does not exist")
-    endian = get_STDF_setup_from_file(FileName)[0]
-    RLF = '%sH' % endian
-    version = 'V%s' % struct.unpack('B', get_bytes_from_file(FileName, 5, 1))
-    fd = open(FileName, 'rb')
+    if is_compressed_file(FileName):
+        endian, version = get_STDF_setup_from_file(FileName)
+        fd = seekable_file(FileName, checkpoints)
+        REC_LEN_FMT = '%sH' % endian
+        record_at = lambda offset: get_record_from_file_at_position(fd, offset, REC_LEN_FMT)
+    else:
+        mm = records_from_mmap(FileName)
+        endian = mm.endian
+        version = mm.version
+        record_at = mm.record_at
     
     ALL = list(id_to_ts(version).keys())
     if records_of_interest==None:
@@ -4505,7 +5081,7 @@ def objects_from_indexed_file(FileName, index, records_of_interest=None):
     for REC_ID in roi:
         if REC_ID in index:
             for fp in index[REC_ID]:
-                OBJ = create_record_object(version, endian, REC_ID, get_record_from_file_at_position(fd, fp, RLF))
+                OBJ = create_record_object(version, endian, REC_ID, record_at(fp))
                 yield OBJ
 
 # class xrecords_from_file(object):
@@ -4665,87 +5241,47 @@ def objects_from_indexed_file(FileName, index, records_of_interest=None):
 
 
 
-def create_record_object(Version, Endian, REC_ID, REC=None):
+record_constructors = {}
+
+def record_constructors_for_version(Version):
+    '''
+    This function returns the (memoized) dispatch table for Version.
+    Both the (REC_TYP, REC_SUB) tuple and the record ID (eg: 'PTR') map to the record class.
+    '''
+    if Version not in record_constructors:
+        if Version not in supported().versions():
+            raise STDFError("Unsupported STDF Version : %s" % Version)
+        table = {}
+        for (REC_TYP, REC_SUB), REC_ID in ts_to_id(Version).items():
+            if REC_TYP == -1 or REC_SUB == -1: # RR1 & RR2 can not be reached
+                continue
+            constructor = globals().get(REC_ID)
+            if isinstance(constructor, type) and issubclass(constructor, STDR):
+                table[(REC_TYP, REC_SUB)] = constructor
+                table[REC_ID] = constructor
+        record_constructors[Version] = table
+    return record_constructors[Version]
+
+def create_record_object(Version, Endian, REC_ID, REC=None, lazy=False):
     '''  
     This function will create and return the appropriate Object for REC
     based on REC_ID. REC_ID can be a 2-element tuple or a string.
-    If REC is not None, then the record will also be unpacked.
+    If REC is not None, then the record will also be unpacked, 
+    if lazy is True, the fields are only decoded when accessed.
+    If REC_ID is unknown for Version, None is returned.
     '''
-    retval = None
-    REC_TYP=-1
-    REC_SUB=-1
-    if Version not in supported().versions():
-        raise STDFError("Unsupported STDF Version : %s" % Version)
+    if Version in record_constructors:
+        table = record_constructors[Version]
+    else:
+        table = record_constructors_for_version(Version)
     if Endian not in ['<', '>']:
         raise STDFError("Unsupported Endian : '%s'" % Endian)
-    if isinstance(REC_ID, tuple) and len(REC_ID)==2:
-        TS2ID = ts_to_id(Version)
-        if (REC_ID[0], REC_ID[1]) in TS2ID:
-            REC_TYP = REC_ID[0]
-            REC_SUB = REC_ID[1]
-            REC_ID = TS2ID[(REC_TYP, REC_SUB)]
-    elif isinstance(REC_ID, str):
-        ID2TS = id_to_ts(Version)
-        if REC_ID in ID2TS:
-            (REC_TYP, REC_SUB) = ID2TS[REC_ID]
-    else:
+    if not isinstance(REC_ID, (tuple, str)):
         raise STDFError("Unsupported REC_ID : %s" % REC_ID)
-
-    if REC_TYP!=-1 and REC_SUB!=-1:
-        if REC_ID == 'PTR': retval = PTR(Version, Endian, REC)
-        elif REC_ID == 'FTR': retval = FTR(Version, Endian, REC)
-        elif REC_ID == 'MPR': retval = MPR(Version, Endian, REC)
-        elif REC_ID == 'STR': retval = STR(Version, Endian, REC)
-        elif REC_ID == 'MTR': retval = MTR(Version, Endian, REC)
-        elif REC_ID == 'PIR': retval = PIR(Version, Endian, REC)
-        elif REC_ID == 'PRR': retval = PRR(Version, Endian, REC)
-        elif REC_ID == 'FAR': retval = FAR(Version, Endian, REC)
-        elif REC_ID == 'ATR': retval = ATR(Version, Endian, REC)
-        elif REC_ID == 'VUR': retval = VUR(Version, Endian, REC)
-        elif REC_ID == 'MIR': retval = MIR(Version, Endian, REC)
-        elif REC_ID == 'MRR': retval = MRR(Version, Endian, REC)
-        elif REC_ID == 'WCR': retval = WCR(Version, Endian, REC)
-        elif REC_ID == 'WIR': retval = WIR(Version, Endian, REC)
-        elif REC_ID == 'WRR': retval = WRR(Version, Endian, REC)
-        elif REC_ID == 'ADR': retval = ADR(Version, Endian, REC)
-        elif REC_ID == 'ASR': retval = ASR(Version, Endian, REC)
-        elif REC_ID == 'BPS': retval = BPS(Version, Endian, REC)
-        elif REC_ID == 'BRR': retval = BRR(Version, Endian, REC)
-        elif REC_ID == 'BSR': retval = BSR(Version, Endian, REC)
-        elif REC_ID == 'CNR': retval = CNR(Version, Endian, REC)
-        elif REC_ID == 'DTR': retval = DTR(Version, Endian, REC)
-        elif REC_ID == 'EPDR': retval = EPDR(Version, Endian, REC)
-        elif REC_ID == 'EPS': retval = EPS(Version, Endian, REC)
-        elif REC_ID == 'ETSR': retval = ETSR(Version, Endian, REC)
-        elif REC_ID == 'FDR': retval = FDR(Version, Endian, REC)
-        elif REC_ID == 'FSR': retval = FSR(Version, Endian, REC)
-        elif REC_ID == 'GDR': retval = GDR(Version, Endian, REC)
-        elif REC_ID == 'GTR': retval = GTR(Version, Endian, REC)
-        elif REC_ID == 'HBR': retval = HBR(Version, Endian, REC)
-        elif REC_ID == 'IDR': retval = IDR(Version, Endian, REC)
-        elif REC_ID == 'MCR': retval = MCR(Version, Endian, REC)
-        elif REC_ID == 'MMR': retval = MMR(Version, Endian, REC)
-        elif REC_ID == 'MSR': retval = MSR(Version, Endian, REC)
-        elif REC_ID == 'NMR': retval = NMR(Version, Endian, REC)
-        elif REC_ID == 'PCR': retval = PCR(Version, Endian, REC)
-        elif REC_ID == 'PDR': retval = PDR(Version, Endian, REC)
-        elif REC_ID == 'PGR': retval = PGR(Version, Endian, REC)
-        elif REC_ID == 'PLR': retval = PLR(Version, Endian, REC)
-        elif REC_ID == 'PMR': retval = PMR(Version, Endian, REC)
-        elif REC_ID == 'PSR': retval = PSR(Version, Endian, REC)
-        elif REC_ID == 'RDR': retval = RDR(Version, Endian, REC)
-        elif REC_ID == 'SBR': retval = SBR(Version, Endian, REC)
-        elif REC_ID == 'SCR': retval = SCR(Version, Endian, REC)
-        elif REC_ID == 'SDR': retval = SDR(Version, Endian, REC)
-        elif REC_ID == 'SHB': retval = SHB(Version, Endian, REC)
-        elif REC_ID == 'SSB': retval = SSB(Version, Endian, REC)
-        elif REC_ID == 'SSR': retval = SSR(Version, Endian, REC)
-        elif REC_ID == 'STS': retval = STS(Version, Endian, REC)
-        elif REC_ID == 'TSR': retval = TSR(Version, Endian, REC)
-        elif REC_ID == 'WTR': retval = WTR(Version, Endian, REC)
-        elif REC_ID == 'RR1': retval = RR1(Version, Endian, REC) # can not be reached because of -1
-        elif REC_ID == 'RR2': retval = RR2(Version, Endian, REC) # can not be reached because of -1
-    return retval
+    constructor = table.get(REC_ID)
+    if constructor == None:
+        return None
+    return constructor(Version, Endian, REC, lazy)
 
 def wafer_map(data, parameter=None):
     '''
@@ -4763,13 +5299,16 @@ def wafer_map(data, parameter=None):
 def get_bytes_from_file(FileName, Offset, Number):
     '''
     This function will return 'Number' bytes starting after 'Offset' from 'FileName'
+    For compressed files, the bytes come from the uncompressed contents (see ATE.utils.seekable)
     '''
     if not isinstance(FileName, str): STDFError("'%s' is not a string")
     if not isinstance(Offset, int): STDFError("Offset is not an integer")
     if not isinstance(Number, int): STDFError("Number is not an integer")
     if not os.path.exists(FileName): STDFError("'%s' does not exist")
-    if guess_type(FileName)[1]=='gzip':
-        raise NotImplemented("Not yet implemented")
+    if is_compressed_file(FileName): # 'Offset' is in the uncompressed contents
+        with seekable_file(FileName) as fd:
+            fd.seek(Offset)
+            retval = fd.read(Number)
     else:
         with open(FileName, 'rb') as fd:
             fd.seek(Offset)
@@ -4777,6 +5316,10 @@ def get_bytes_from_file(FileName, Offset, Number):
     return retval
 
 def get_record_from_file_at_position(fd, offset, REC_LEN_FMT):
+    '''
+    Reads the record at offset from the open file descriptor fd.
+    Note: for uncompressed files, records_from_mmap(FileName).record_at(offset) is way faster.
+    '''
     fd.seek(offset)
     header = fd.read(4)
     REC_LEN = struct.unpack(REC_LEN_FMT, header[:2])[0]
@@ -4785,13 +5328,18 @@ def get_record_from_file_at_position(fd, offset, REC_LEN_FMT):
     
 def get_STDF_setup_from_file(FileName):
     '''
-    This function will determine the endian and the version of a given STDF file
+    This function will determine the endian and the version of a given (compressed) STDF file
     it must *NOT* be guaranteed that FileName exists or is an STDF File.
     '''    
     endian = None
     version = None
     if os.path.exists(FileName) and os.path.isfile(FileName):
-        if '.stdf' in magicnumber.extension_from_magic_number_in_file(FileName):
+        if is_compressed_file(FileName): # look at the uncompressed contents
+            header = get_bytes_from_file(FileName, 0, 6)
+            is_stdf = len(header) == 6 and header[2:4] == b'\x00\x0A'
+        else:
+            is_stdf = '.stdf' in magicnumber.extension_from_magic_number_in_file(FileName)
+        if is_stdf:
             CPU_TYP, STDF_VER = struct.unpack('BB', get_bytes_from_file(FileName, 4, 2))
             if CPU_TYP == 1: endian = '>'
             elif CPU_TYP == 2: endian = '<'
@@ -4820,27 +5368,13 @@ def get_partcount_from_file(FileName):
     it must *NOT* be guaranteed that FileName exists or is an STDF File.
     '''
     
-def save_STDF_index(FileName, index):
+def save_STDF_index(FileName, index=None):
     '''
+    Saves the index of FileName in the (memory mappable) sidecar next to it,
+    see ATE.data.STDF.indexing.save_STDF_index and load_STDF_index
     '''
-    if os.path.exists(FileName) and os.path.isfile(FileName):
-        Path, Name = os.path.split(FileName)
-        Base, Ext = os.path.splitext(Name)
-        if Ext in ['.stdf', '.pbz2']:
-            pickle_file = os.path.join(Path, "%s.pbz2" % Base)
-        else:
-            raise Exception("FileName should have '.stdf' or '.pbz2' extension")
-        with bz2.open(pickle_file, 'wb') as fd:
-            pickle.dump(index, fd)
-        
-
-
-
-
-
-    
-    
-       
+    from ATE.data.STDF.indexing import save_STDF_index as save_sidecar
+    return save_sidecar(FileName, index)
 
 if __name__ == '__main__':
     endian = '<'
@@ -3,7 +3,7 @@ Created on 11 Aug 2019
 
 @author: tho
 '''
-import sys, os, struct
+import sys, os, struct, mmap
 import re
 
 from ATE.utils.varia import os_is_case_sensitive, path_is_writeable_by_me
@@ -12,6 +12,7 @@ from ATE.utils.compression import supported_compressions, supported_compressions
 from ATE.data.STDF.records import *
 
 from ATE.utils.compression import get_deflated_file_size
+from ATE.utils.seekable import seekable_file
     
 # def stdfopen(FileName, mode='rb'):
 #     '''
@@ -1808,6 +1809,11 @@ def TS_from_record(record):
     '''
     return struct.unpack("BB", record[2:4])
 
+# the (byte) offset of HEAD_NUM (SITE_NUM follows) in the records (header included) that have them on a fixed offset
+HEAD_NUM_and_SITE_NUM_offsets = {(15, 10) : 8, (15, 15) : 8, (15, 20) : 8, # PTR, MPR & FTR
+                                 (5, 10) : 4, (5, 20) : 4, (5, 30) : 4,     # PIR, PRR
+                                 (1, 30) : 4, (1, 40) : 4, (1, 50) : 4}     # PCR, HBR, SBR
+
 def HEAD_NUM_and_SITE_NUM_from_record(record):
     '''
     given and STDF record (bytearray), extract the HEAD_NUM and SITE_NUM 
@@ -1828,18 +1834,12 @@ def HEAD_NUM_and_SITE_NUM_from_record(record):
            MPR      15       15        9          10    < most likely
            FTR      15       20        9          10    < most likely
     '''
-    REC_TYP, REC_SUB = TS_from_record(record)
+    TS = TS_from_record(record)
     HEAD_NUM = 0
     SITE_NUM = 0
-    if REC_TYP == 15: # PTR, MTR & FTR
-        if REC_SUB in [10, 15, 20]:
-            HEAD_NUM, SITE_NUM = struct.unpack("BB", record[8:10])
-    elif REC_TYP == 5: # PIR, PRR
-        if REC_SUB in [10, 20, 30]:
-            HEAD_NUM, SITE_NUM = struct.unpack("BB", record[4:6])
-    elif REC_TYP == 1: # PCR, HBR, SBR 
-        if REC_SUB in [30, 40, 50]:
-            HEAD_NUM, SITE_NUM = struct.unpack("BB", record[4:6])
+    if TS in HEAD_NUM_and_SITE_NUM_offsets:
+        offset = HEAD_NUM_and_SITE_NUM_offsets[TS]
+        HEAD_NUM, SITE_NUM = struct.unpack("BB", record[offset:offset + 2])
     return HEAD_NUM, SITE_NUM
             
 def TEST_NUM_from_record(record, endian):
@@ -1865,9 +1865,25 @@ class records_from_file(object):
     This is a *QUICK* iterator class that returns the next record from an STDF file each time it is called.
     It is fast because it doesn't check versions, extensions and it doesn't unpack the record and skips unknown records.
     It does support gzip, bz2 and lzma compression.
+    Uncompressed files are memory mapped, compressed files are read (with a seekable_file) in big chunks,
+    so there is no read (system call) per record anymore.
+
+    With follow=True the file is expected to grow (a tester that is still writing it) :
+    the file is read in chunks (a memory map can't grow), the iteration stops at the last
+    complete record and a truncated trailing record is kept. Iterating again (after the file
+    has grown) resumes from there, so polling a growing file only reads the new bytes.
+    'boundary' is the offset of the last complete record boundary, pass it as start to resume
+    in a new records_from_file.
     '''
-    def __init__(self, FileName):
+    read_size = 1024 * 1024
+    
+    def __init__(self, FileName, follow=False, start=0):
         self.fd = None
+        self.map = None
+        self.buffer = b''
+        self.offset = 0
+        self.buffer_start = 0 # the file offset of self.buffer[0]
+        self.follow = follow
         if not isinstance(FileName, str): return
         if not os.path.exists(FileName): return
         if not os.path.isfile(FileName): return
@@ -1876,46 +1892,102 @@ class records_from_file(object):
             ext = extension_from_magic_number_in_file(FileName)
             if len(ext)!=1: return
             compression = supported_compressions_extensions[ext[0]]
-            if compression=='lzma':
-                import lzma
-                self.fd = lzma.open(FileName, 'rb')
-            elif compression=='bz2':
-                import bz2
-                self.fd = bz2.open(FileName, 'rb')
-            elif compression=='gzip':
-                import gzip
-                self.fd = gzip.open(FileName, 'rb')
+            if compression in ['lzma', 'bz2', 'gzip']:
+                self.fd = seekable_file(FileName) # builds the checkpoints on the way (see self.fd.checkpoint_table)
             else:
                 raise Exception("the %s compression is supported but not fully implemented." % compression)
+        elif follow:
+            self.fd = open(FileName, 'rb')
         else:
             self.fd = open(FileName, 'rb')
-        buff = self.fd.read(6)
-        CPU_TYPE, STDF_VER = struct.unpack('BB', buff[4:])
+            self.map = mmap.mmap(self.fd.fileno(), 0, access=mmap.ACCESS_READ)
+            self.buffer = self.map
+        self._fill(6)
+        CPU_TYPE, STDF_VER = struct.unpack_from('BB', self.buffer, 4)
         if CPU_TYPE == 1: self.endian = '>'
         elif CPU_TYPE == 2: self.endian = '<'
         else: self.endian = '?'
         self.version = 'V%s' % STDF_VER
-        self.fd.seek(0)
         self.unpack_fmt = '%sHBB' % self.endian
+        if start != 0:
+            if self.map != None:
+                self.offset = start
+            else:
+                self.fd.seek(start)
+                self.buffer = b''
+                self.offset = 0
+                self.buffer_start = start
+
+    @property
+    def boundary(self):
+        '''
+        the offset (in the uncompressed file) of the last complete record boundary
+        '''
+        return self.buffer_start + self.offset
+
+    @property
+    def pending(self):
+        '''
+        the number of bytes (of a truncated trailing record) after the boundary
+        '''
+        return len(self.buffer) - self.offset
         
     def __del__(self):
+        if self.map != None:
+            self.map.close()
         if self.fd != None:
             self.fd.close()
         
     def __iter__(self):
         return self
+
+    def _fill(self, needed):
+        '''
+        Makes sure (if possible) that there are at least 'needed' bytes available from self.offset on.
+        Returns True if so, False otherwise (end of file).
+        '''
+        available = len(self.buffer) - self.offset
+        if available >= needed: 
+            return True
+        if self.map != None: # the map *is* the whole file
+            return False
+        chunks = [self.buffer[self.offset:]]
+        self.buffer_start += self.offset
+        while available < needed:
+            chunk = self.fd.read(max(self.read_size, needed - available))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            available += len(chunk)
+        self.buffer = b''.join(chunks)
+        self.offset = 0
+        return available >= needed
     
     def __next__(self):
-        while self.fd!=None:
-            while True:
-                header = self.fd.read(4)
-                if len(header)!=4:
-                    raise StopIteration
-                REC_LEN, REC_TYP, REC_SUB = struct.unpack(self.unpack_fmt, header)
-                footer = self.fd.read(REC_LEN)
-                if len(footer)!=REC_LEN:
-                    raise StopIteration
-                return REC_LEN, REC_TYP, REC_SUB, header+footer
+        if self.fd == None:
+            raise StopIteration
+        if not self._fill(4):
+            raise StopIteration
+        REC_LEN, REC_TYP, REC_SUB = struct.unpack_from(self.unpack_fmt, self.buffer, self.offset)
+        if not self._fill(4 + REC_LEN):
+            raise StopIteration
+        start = self.offset
+        self.offset += 4 + REC_LEN
+        return REC_LEN, REC_TYP, REC_SUB, self.buffer[start:self.offset]
+
+def ends_on_record_boundary(FileName):
+    '''
+    This function will return True if FileName ends on a record boundary, False if it doesn't
+    (a truncated trailing record, for example because the file is still being written).
+    
+    It presumes that FileName exists, because if it doesn't exist the return value is also False!
+    '''
+    stdf = records_from_file(FileName, follow=True)
+    if stdf.fd == None:
+        return False
+    for _ in stdf:
+        pass
+    return stdf.pending == 0
 
 
 if __name__ == '__main__':
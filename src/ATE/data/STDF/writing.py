@@ -0,0 +1,253 @@
+'''
+Created on Oct 18, 2026
+
+Writing of (big) STDF V4 files.
+
+The records are packed (struct.pack_into) straight into a large bytearray,
+that is written out (and compressed on the fly if asked for) when it is full,
+so that generating a datalog is one large write per buffer instead of one
+(or more) per record and field.
+
+The high volume records (PIR, PTR, FTR & PRR) have their own packing methods,
+all other records are written from their record object (see STDFWriter.write).
+
+The standard allows to leave the semi-static fields (limits, units, format 
+strings, ...) out of all but the first PTR/FTR of a test, so the writer keeps 
+a template per TEST_NUM/HEAD_NUM/SITE_NUM : the first emission is a full record,
+all next ones are only the (precomputed) dynamic prefix.
+'''
+import struct
+
+from ATE.utils.compression import compressor, supported_compressions
+from ATE.data.STDF.records import STDFError, sys_endian
+
+default_buffer_size = 4 * 1024 * 1024
+maximum_REC_LEN = 0xFFFF
+
+PTR_prefix = 'IBBBBf' # TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG & RESULT
+FTR_prefix = 'IBBB'   # TEST_NUM, HEAD_NUM, SITE_NUM & TEST_FLG
+
+def Cn(value):
+    '''
+    returns value (a string) encoded for a C*n field (without the count byte), truncated to 255 bytes.
+    '''
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return bytes(value[:255])
+
+class STDFWriter(object):
+    '''
+    Context manager that writes an STDF V4 file (in the endian of the system by default).
+    The FAR is written on opening, the records are packed in a bytearray of buffer_size bytes
+    that is written out (compressed with compression, see ATE.utils.compression) when full.
+    With templates, only the first PTR/FTR of a test (per head and site) is a full record.
+
+        with STDFWriter('lot.std') as stdf:
+            stdf.write(MIR)
+            stdf.PIR(1, 0)
+            stdf.PTR(1000, 1, 0, 1.23)
+            stdf.PRR(1, 0, 0, 1, 1)
+            ...
+    '''
+    def __init__(self, FileName, endian=None, compression=None, buffer_size=default_buffer_size, level=None, templates=True):
+        if endian == None:
+            endian = sys_endian()
+        if endian not in ['<', '>']:
+            raise STDFError("STDFWriter(%s) : unsupported endian '%s'" % (FileName, endian))
+        if compression != None and compression not in supported_compressions:
+            raise STDFError("STDFWriter(%s) : unsupported compression '%s'" % (FileName, compression))
+        self.FileName = FileName
+        self.endian = endian
+        self.version = 'V4'
+        self.compressor = None if compression == None else compressor(compression, level)
+        self.buffer = bytearray(max(buffer_size, 4 + maximum_REC_LEN))
+        self.position = 0 # in the buffer
+        self.written = 0 # uncompressed bytes written out
+        self.layouts = {} # body format : struct.Struct (header included)
+        self.templates = {} if templates else None # (REC_ID, TEST_NUM, HEAD_NUM, SITE_NUM) : struct.Struct of the dynamic prefix
+        self.fd = open(FileName, 'wb')
+        self._emit('BB', 0, 10, 2 if endian == '<' else 1, 4) # FAR
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _layout(self, fmt):
+        '''
+        returns the (cached) struct.Struct of a record with body format fmt (header included).
+        '''
+        layout = self.layouts.get(fmt)
+        if layout == None:
+            layout = struct.Struct('%sHBB%s' % (self.endian, fmt))
+            if layout.size - 4 > maximum_REC_LEN:
+                raise STDFError("STDFWriter : record of %d bytes is too long" % (layout.size - 4))
+            self.layouts[fmt] = layout
+        return layout
+
+    def _pack(self, layout, REC_TYP, REC_SUB, *values):
+        '''
+        packs a record with layout (see _layout) and the body values in the buffer, 
+        the position only moves on once the record is packed (a failing record leaves nothing behind).
+        '''
+        if self.position + layout.size > len(self.buffer):
+            self.flush()
+        layout.pack_into(self.buffer, self.position, layout.size - 4, REC_TYP, REC_SUB, *values)
+        self.position += layout.size
+
+    def _emit(self, fmt, REC_TYP, REC_SUB, *values):
+        '''
+        packs a record with body format fmt and the body values in the buffer.
+        '''
+        self._pack(self._layout(fmt), REC_TYP, REC_SUB, *values)
+
+    def write(self, record):
+        '''
+        writes record (an STDR object, in the endian of this writer)
+        '''
+        if record.endian != self.endian:
+            raise STDFError("STDFWriter.write(%s) : record endian '%s' != '%s'" % (record.id, record.endian, self.endian))
+        if record.is_lazy():
+            record._decode()
+        body = b''.join([record._pack_item(field) for field in record._packed_fields()[3:]])
+        self.write_body(record.get_value('REC_TYP'), record.get_value('REC_SUB'), body)
+
+    def write_body(self, REC_TYP, REC_SUB, body):
+        '''
+        writes a record from its (packed) body.
+        '''
+        if len(body) > maximum_REC_LEN:
+            raise STDFError("STDFWriter.write_body(%s, %s) : record of %d bytes is too long" % (REC_TYP, REC_SUB, len(body)))
+        self._emit('%ds' % len(body), REC_TYP, REC_SUB, body)
+
+    def PIR(self, HEAD_NUM, SITE_NUM):
+        '''
+        writes a Part Information Record.
+        '''
+        self._emit('BB', 5, 10, HEAD_NUM, SITE_NUM)
+
+    def PRR(self, HEAD_NUM, SITE_NUM, PART_FLG, NUM_TEST, HARD_BIN, SOFT_BIN=0xFFFF, X_COORD=-32768, Y_COORD=-32768,
+            TEST_T=0, PART_ID='', PART_TXT='', PART_FIX=b''):
+        '''
+        writes a Part Results Record, PART_FLG is an integer (bit 3 set = part failed)
+        '''
+        PART_ID = Cn(PART_ID)
+        PART_TXT = Cn(PART_TXT)
+        PART_FIX = bytes(PART_FIX[:255])
+        self._emit('BBBHHHhhIB%dsB%dsB%ds' % (len(PART_ID), len(PART_TXT), len(PART_FIX)), 5, 20,
+                   HEAD_NUM, SITE_NUM, PART_FLG, NUM_TEST, HARD_BIN, SOFT_BIN, X_COORD, Y_COORD, TEST_T,
+                   len(PART_ID), PART_ID, len(PART_TXT), PART_TXT, len(PART_FIX), PART_FIX)
+
+    def _template(self, REC_ID, TEST_NUM, HEAD_NUM, SITE_NUM):
+        '''
+        returns the struct.Struct of the dynamic prefix if a full REC_ID of this test is already written, 
+        None otherwise (and then the caller writes the full record, see _register).
+        '''
+        if self.templates == None:
+            return None
+        return self.templates.get((REC_ID, TEST_NUM, HEAD_NUM, SITE_NUM))
+
+    def _register(self, REC_ID, TEST_NUM, HEAD_NUM, SITE_NUM):
+        '''
+        makes the full REC_ID of this test that is just written the template of the next ones.
+        '''
+        if self.templates != None:
+            self.templates[(REC_ID, TEST_NUM, HEAD_NUM, SITE_NUM)] = self._layout(PTR_prefix if REC_ID == 'PTR' else FTR_prefix)
+
+    def PTR(self, TEST_NUM, HEAD_NUM, SITE_NUM, RESULT, TEST_FLG=0, PARM_FLG=0, TEST_TXT='', ALARM_ID='',
+            OPT_FLAG=None, RES_SCAL=None, LLM_SCAL=None, HLM_SCAL=None, LO_LIMIT=None, HI_LIMIT=None,
+            UNITS='', C_RESFMT='', C_LLMFMT='', C_HLMFMT='', LO_SPEC=None, HI_SPEC=None):
+        '''
+        writes a Parametric Test Record, the flags are integers.
+        
+        With templates the first PTR of a test is a full record, OPT_FLAG (if not given) marks the
+        limits, spec limits and scaling exponents that are None as invalid. The next PTR's of the test
+        are only the dynamic prefix (see PTR_prefix), the other arguments are ignored then.
+        Without templates, the record ends after ALARM_ID (or after RESULT if TEST_TXT and ALARM_ID are
+        empty) if there is no OPT_FLAG and no limit, as the standard allows.
+        '''
+        template = self._template('PTR', TEST_NUM, HEAD_NUM, SITE_NUM)
+        if template != None:
+            self._pack(template, 15, 10, TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG, RESULT)
+            return
+        semi_static = (RES_SCAL, LO_LIMIT, HI_LIMIT, LO_SPEC, HI_SPEC)
+        if self.templates == None and OPT_FLAG == None and semi_static == (None,) * 5:
+            if TEST_TXT == '' and ALARM_ID == '':
+                self._emit(PTR_prefix, 15, 10, TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG, RESULT)
+            else:
+                TEST_TXT = Cn(TEST_TXT)
+                ALARM_ID = Cn(ALARM_ID)
+                self._emit('%sB%dsB%ds' % (PTR_prefix, len(TEST_TXT), len(ALARM_ID)), 15, 10,
+                           TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG, RESULT,
+                           len(TEST_TXT), TEST_TXT, len(ALARM_ID), ALARM_ID)
+            return
+        if OPT_FLAG == None:
+            OPT_FLAG = 0x02 # bit 1 is reserved (1)
+            for value, bits in zip(semi_static, (0x01, 0x50, 0xA0, 0x04, 0x08)):
+                if value == None:
+                    OPT_FLAG |= bits
+        strings = [Cn(value) for value in (TEST_TXT, ALARM_ID)]
+        units = [Cn(value) for value in (UNITS, C_RESFMT, C_LLMFMT, C_HLMFMT)]
+        fmt = '%sB%dsB%dsBbbbffB%dsB%dsB%dsB%dsff' % ((PTR_prefix,) + tuple(len(value) for value in strings + units))
+        values = [TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, PARM_FLG, RESULT]
+        for value in strings:
+            values += [len(value), value]
+        values += [OPT_FLAG] + [0 if value == None else value for value in (RES_SCAL, LLM_SCAL, HLM_SCAL)]
+        values += [0.0 if value == None else value for value in (LO_LIMIT, HI_LIMIT)]
+        for value in units:
+            values += [len(value), value]
+        values += [0.0 if value == None else value for value in (LO_SPEC, HI_SPEC)]
+        self._emit(fmt, 15, 10, *values)
+        self._register('PTR', TEST_NUM, HEAD_NUM, SITE_NUM)
+
+    def FTR(self, TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG=0, VECT_NAM='', TIME_SET='', OP_CODE='', TEST_TXT='', 
+            ALARM_ID='', PROG_TXT='', RSLT_TXT='', PATG_NUM=255):
+        '''
+        writes a Functional Test Record, TEST_FLG is an integer.
+        
+        The first FTR of a test is a full record (with OPT_FLAG = all optional data invalid, no pin data), 
+        with templates the next FTR's of the test are only the dynamic prefix (see FTR_prefix).
+        '''
+        template = self._template('FTR', TEST_NUM, HEAD_NUM, SITE_NUM)
+        if template != None:
+            self._pack(template, 15, 20, TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG)
+            return
+        strings = [Cn(value) for value in (VECT_NAM, TIME_SET, OP_CODE, TEST_TXT, ALARM_ID, PROG_TXT, RSLT_TXT)]
+        fmt = '%sBIIIIiihHHH%sBH' % (FTR_prefix, ''.join(['B%ds' % len(value) for value in strings]))
+        values = [TEST_NUM, HEAD_NUM, SITE_NUM, TEST_FLG, 0xFF, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+        for value in strings:
+            values += [len(value), value]
+        values += [PATG_NUM, 0]
+        self._emit(fmt, 15, 20, *values)
+        self._register('FTR', TEST_NUM, HEAD_NUM, SITE_NUM)
+
+    def tell(self):
+        '''
+        returns the (uncompressed) size of what is written so far.
+        '''
+        return self.written + self.position
+
+    def flush(self):
+        '''
+        writes the buffer out (one write).
+        '''
+        if self.position == 0:
+            return
+        data = memoryview(self.buffer)[:self.position]
+        if self.compressor != None:
+            data = self.compressor.compress(data)
+        self.fd.write(data)
+        self.written += self.position
+        self.position = 0
+
+    def close(self):
+        if self.fd == None:
+            return
+        try:
+            self.flush()
+            if self.compressor != None:
+                self.fd.write(self.compressor.flush())
+        finally:
+            self.fd.close()
+            self.fd = None
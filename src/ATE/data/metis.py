@@ -3,15 +3,205 @@ Created on Aug 7, 2019
 
 @author: hoeren
 '''
-import os
+import os, numbers, tempfile
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tqdm import tqdm
 
-from ATE.data import STDF
-from ATE.data.STDF.utils import (endian_and_version_from_file, is_STDF,
-                                 ts_to_id, records_from_file, STDFError,
-                                 TS_from_record)
+from ATE.data.STDF.utils import is_STDF, id_to_ts, STDFError, create_record_object
 
-from ATE.utils.compression import get_deflated_file_size
+from ATE.data.STDF.indexing import (index_STDF, indexed_records, index_arrays,
+                                    save_STDF_index, load_STDF_index, following_index, test_catalog)
+
+from ATE.data.STDF.columnar import part_test_matrix
+
+metis_record_tables = ['MIR', 'SDR', 'WIR', 'RDR'] # the records that go (as a table) in the metadata
+metis_meta_fields = ['HEAD_NUM', 'SITE_NUM', 'PF', 'HARD_BIN', 'SOFT_BIN', 'X_COORD', 'Y_COORD', 'WAFER_ID', 'FILE', 'RETEST', 'FINAL']
+metis_complib = 'blosc'
+metis_complevel = 5
+
+def metis_store_name(FileName):
+    '''
+    returns the name of the (HDF5) store of the STDF file FileName, the target directory comes 
+    from the environment variable 'metis_dir', by default the store is next to FileName.
+    '''
+    directory = os.environ.get('metis_dir', os.path.dirname(os.path.abspath(FileName)))
+    return os.path.join(directory, "%s.h5" % os.path.basename(FileName))
+
+def test_key(TEST_NUM):
+    '''
+    returns the key of the column of TEST_NUM in a store.
+    '''
+    return "tests/T%d" % TEST_NUM
+
+def stdf_index(FileName, workers=None, progress=False):
+    '''
+    returns the index (in array form, see index_arrays) of the STDF file FileName, from its sidecar, or 
+    indexed now by workers processes (and kept in the sidecar, so that FileName is only indexed once).
+    '''
+    index = load_STDF_index(FileName)
+    if index == None:
+        index = index_STDF(FileName, workers, progress)
+        try:
+            save_STDF_index(FileName, index)
+        except OSError:
+            pass
+        saved = load_STDF_index(FileName, check_fingerprint=False)
+        index = saved if saved != None else index_arrays(index)
+    return index
+
+def record_tables(FileName, index):
+    '''
+    returns {REC_ID : DataFrame} with one row per record (and one column per field) 
+    for the REC_ID's in metis_record_tables.
+    '''
+    ID2TS = id_to_ts(index['version'])
+    tables = {}
+    records = indexed_records(FileName, index.get('checkpoints'))
+    try:
+        for REC_ID in metis_record_tables:
+            REC_TYP, REC_SUB = ID2TS[REC_ID]
+            rows = []
+            for offset in index['offsets'][index['codes'] == REC_TYP * 256 + REC_SUB]:
+                record = create_record_object(index['version'], index['endian'], REC_ID, records[offset])
+                rows.append({field : record.get_value(field) for field in record.get_fields() if field not in ['REC_LEN', 'REC_TYP', 'REC_SUB']})
+            tables[REC_ID] = pd.DataFrame(rows)
+    finally:
+        records.close()
+    return tables
+
+def stdf_columns(FileName, workers=None, progress=False):
+    '''
+    returns the columnar content of the STDF file FileName in a dictionary with :
+        'index'   : the index (see stdf_index)
+        'catalog' : the test catalog (see test_catalog)
+        'matrix'  : the part x test matrix and the per part arrays (see part_test_matrix), 
+                    plus the WAFER_ID of each part ('' if the part is not on a wafer)
+        'tables'  : the metadata tables (see record_tables)
+    '''
+    index = stdf_index(FileName, workers, progress)
+    catalog = test_catalog(FileName, index)
+    matrix = part_test_matrix(FileName, index, catalog)
+    tables = record_tables(FileName, index)
+    WAFER_ID = np.full(len(matrix['HEAD_NUM']), '', dtype=object)
+    if len(tables['WIR']) != 0:
+        ID2TS = id_to_ts(index['version'])
+        WIR_offsets = index['offsets'][index['codes'] == ID2TS['WIR'][0] * 256 + ID2TS['WIR'][1]]
+        first_offsets = index['offsets'][index['part_records'][index['part_pointers'][:-1].astype(np.int64)]]
+        wafers = np.searchsorted(WIR_offsets, first_offsets) - 1
+        on_wafer = wafers >= 0
+        WAFER_ID[on_wafer] = tables['WIR']['WAFER_ID'].to_numpy(dtype=object)[wafers[on_wafer]]
+    matrix['WAFER_ID'] = WAFER_ID
+    return {'index' : index, 'catalog' : catalog, 'matrix' : matrix, 'tables' : tables}
+
+def partial_columns(FileName, spill=False):
+    '''
+    Worker of Metis.import_many, returns the columnar content of FileName (see stdf_columns) 
+    without the index (that doesn't need to travel back), FileName is indexed by this worker only.
+    if spill is True, the part x test matrix is saved in a temporary .npy file and 'RESULT' is the 
+    name of that file, so that it doesn't travel back through the pipe (see merge_columns).
+    '''
+    columns = stdf_columns(FileName, workers=1)
+    del columns['index']
+    if spill:
+        fd, name = tempfile.mkstemp(prefix='metis_', suffix='.npy')
+        with os.fdopen(fd, 'wb') as npy:
+            np.save(npy, columns['matrix']['RESULT'])
+        columns['matrix']['RESULT'] = name
+    return columns
+
+def remove_spilled(partials):
+    '''
+    removes the temporary .npy files (see partial_columns) that are left in partials.
+    '''
+    for partial in partials:
+        if partial != None and isinstance(partial['matrix']['RESULT'], str):
+            if os.path.exists(partial['matrix']['RESULT']):
+                os.remove(partial['matrix']['RESULT'])
+            partial['matrix']['RESULT'] = None
+
+def retest_bins(tables):
+    '''
+    returns the retest hardware bins of a file from its metadata tables (see record_tables) :
+        None        : the file is not a retest (no RDR and MIR.RTST_COD is not 'Y' or a digit)
+        []          : all bins are retested (an RDR without bins)
+        [bins, ...] : the bins in the RDR
+        'failing'   : the file is a retest (MIR.RTST_COD) but there is no RDR, the failing parts are retested
+    '''
+    if len(tables['RDR']) != 0:
+        bins = []
+        for RTST_BIN in tables['RDR']['RTST_BIN'].tolist():
+            if isinstance(RTST_BIN, list):
+                bins += RTST_BIN
+        return bins
+    if len(tables['MIR']) != 0:
+        RTST_COD = str(tables['MIR']['RTST_COD'].iloc[0]).strip()
+        if RTST_COD == 'Y' or RTST_COD.isdigit():
+            return 'failing'
+    return None
+
+def merge_columns(partials, numbers=None):
+    '''
+    Merges the columnar content of several files (see partial_columns) of one lot, in the order of 
+    MIR.START_T, with retest handling :
+        - parts on a wafer are identified by WAFER_ID, X_COORD and Y_COORD, the last result of a part is final.
+        - the other parts are superseded by a later retest file (see retest_bins) if their HARD_BIN is retested.
+    numbers are the 'FILE' numbers of the partials (default their position), a spilled 'RESULT' (see 
+    partial_columns) is memory mapped for the scatter and its file is removed afterwards.
+    returns the merged catalog (DataFrame), matrix (plus 'FILE', 'RETEST' and 'FINAL') and tables.
+    '''
+    if numbers == None:
+        numbers = list(range(len(partials)))
+    def START_T(partial):
+        MIR = partial['tables']['MIR']
+        return int(MIR['START_T'].iloc[0]) if len(MIR) != 0 else 0
+    order = sorted(range(len(partials)), key=lambda number: (START_T(partials[number]), number))
+    catalog = pd.concat([pd.DataFrame(partials[number]['catalog']) for number in order], ignore_index=True)
+    catalog = catalog.drop_duplicates('TEST_NUM').sort_values('TEST_NUM').reset_index(drop=True)
+    TEST_NUMs = catalog['TEST_NUM'].to_numpy()
+    parts = [len(partials[number]['matrix']['HEAD_NUM']) for number in order]
+    pointers = np.zeros(len(order) + 1, dtype=np.int64)
+    pointers[1:] = np.cumsum(parts)
+    matrix = {'RESULT' : np.full((pointers[-1], len(TEST_NUMs)), np.nan, dtype=np.float32)}
+    for position, number in enumerate(order): # one block scatter per file
+        partial = partials[number]['matrix']
+        columns = np.searchsorted(TEST_NUMs, partial['TEST_NUM'])
+        if isinstance(partial['RESULT'], str):
+            RESULT = np.load(partial['RESULT'], mmap_mode='r')
+            matrix['RESULT'][pointers[position]:pointers[position + 1], columns] = RESULT
+            del RESULT # the map has to be closed before the file can be removed
+            os.remove(partial['RESULT'])
+        else:
+            matrix['RESULT'][pointers[position]:pointers[position + 1], columns] = partial['RESULT']
+        partial['RESULT'] = None
+    for name in metis_meta_fields:
+        if len(order) != 0 and name in partials[order[0]]['matrix']:
+            matrix[name] = np.concatenate([partials[number]['matrix'][name] for number in order])
+    matrix['TEST_NUM'] = TEST_NUMs
+    matrix['FILE'] = np.repeat(np.array([numbers[number] for number in order], dtype=np.int64), parts)
+    bins = [retest_bins(partials[number]['tables']) for number in order]
+    matrix['RETEST'] = np.repeat(np.cumsum([retest != None for retest in bins]), parts)
+    # retests
+    on_wafer = (matrix['X_COORD'] != -32768) & (matrix['Y_COORD'] != -32768)
+    final = np.ones(pointers[-1], dtype=bool)
+    keys = pd.DataFrame({'WAFER_ID' : matrix['WAFER_ID'][on_wafer], 'X_COORD' : matrix['X_COORD'][on_wafer], 'Y_COORD' : matrix['Y_COORD'][on_wafer]})
+    final[on_wafer] = ~keys.duplicated(keep='last').to_numpy()
+    for position, retest in enumerate(bins):
+        if retest == None:
+            continue
+        earlier = ~on_wafer[:pointers[position]]
+        if retest == 'failing':
+            earlier &= ~matrix['PF'][:pointers[position]]
+        elif len(retest) != 0:
+            earlier &= np.isin(matrix['HARD_BIN'][:pointers[position]], retest)
+        final[:pointers[position]][earlier] = False
+    matrix['FINAL'] = final
+    tables = {}
+    for REC_ID in metis_record_tables:
+        frames = [partials[number]['tables'][REC_ID].assign(FILE=numbers[number]) for number in order]
+        tables[REC_ID] = pd.concat(frames, ignore_index=True) if len(frames) != 0 else pd.DataFrame()
+    return catalog, matrix, tables
 
 class Metis(object):
     '''
@@ -20,217 +210,200 @@ class Metis(object):
     
     def __init__(self):
         self.df = None
+        self.followed = {} # FileName : following_index
+        self.source = None # the STDF file
+        self.store = None # the (HDF5) store the tests are pulled in from
+        self.catalog = None # the test catalog (DataFrame)
+        self.tables = {} # REC_ID : DataFrame (see metis_record_tables)
     
-    def import_stdf(self, FileName, progress=True):
+    def import_stdf(self, FileName, progress=True, workers=None):
         '''
         This method will add FileName to this Metis object.
+        Uncompressed files are indexed in parallel by workers processes (default = number of CPU's),
+        the index is kept next to FileName, so that FileName is only indexed once.
         '''
-        index = {}
-        offset = 0
-        
-        
-    
         if is_STDF(FileName):
-            endian, version = endian_and_version_from_file(FileName)
-            index['version'] = version
-            index['endian'] = endian  
-            index['records'] = {}
-            index['indexes'] = {}
-            index['parts'] = {}
-            PIP = {} # parts in process
-            PN = 1
-    
-            TS2ID = ts_to_id(version)
-
-        # indexing the stdf file
-            if progress:
-                desc= "Indexing STDF file '%s'" % os.path.basename(FileName)
-                total = get_deflated_file_size(FileName)
-                progress_bar = tqdm(total=total, desc=desc, leave=False, unit='b')
-    
-            for _, REC_TYP, REC_SUB, REC in records_from_file(FileName):
-                REC_ID = TS2ID[(REC_TYP, REC_SUB)]
-                REC_LEN = len(REC)
-                if REC_ID not in index['records']: 
-                    index['records'][REC_ID] = [] 
-                index['indexes'][offset] = REC
-                index['records'][REC_ID].append(offset)
-                if REC_ID in ['PIR', 'PRR', 'PTR', 'FTR', 'MPR']:
-                    if REC_ID == 'PIR':
-                        pir = STDF.PIR(index['version'], index['endian'], REC)
-                        pir_HEAD_NUM = pir.get_value('HEAD_NUM')
-                        pir_SITE_NUM = pir.get_value('SITE_NUM')
-                        if (pir_HEAD_NUM, pir_SITE_NUM) in PIP:
-                            raise Exception("One should not be able to reach this point !")
-                        PIP[(pir_HEAD_NUM, pir_SITE_NUM)] = PN
-                        index['parts'][PN]=[]
-                        index['parts'][PN].append(offset)
-                        PN+=1  
-                    elif REC_ID == 'PRR':
-                        prr = STDF.PRR(index['version'], index['endian'], REC)
-                        prr_HEAD_NUM = prr.get_value('HEAD_NUM') 
-                        prr_SITE_NUM = prr.get_value('SITE_NUM')
-                        if (prr_HEAD_NUM, prr_SITE_NUM) not in PIP:
-                            raise Exception("One should not be able to reach this point!")
-                        pn = PIP[(prr_HEAD_NUM, prr_SITE_NUM)]
-                        index['parts'][pn].append(offset)
-                        del PIP[(prr_HEAD_NUM, prr_SITE_NUM)]
-                    elif REC_ID == 'PTR': #TODO: move this one to be the first to be checked, as this will be the most common one!
-                        ptr = STDF.PTR(index['version'], index['endian'], REC)
-                        ptr_HEAD_NUM = ptr.get_value('HEAD_NUM') 
-                        ptr_SITE_NUM = ptr.get_value('SITE_NUM')
-                        if (ptr_HEAD_NUM, ptr_SITE_NUM) not in PIP:
-                            raise Exception("One should not be able to reach this point!")
-                        pn = PIP[(ptr_HEAD_NUM, ptr_SITE_NUM)]
-                        index['parts'][pn].append(offset)
-                    elif REC_ID == 'FTR':
-                        ftr = STDF.FTR(index['version'], index['endian'], REC)
-                        ftr_HEAD_NUM = ftr.get_value('HEAD_NUM') 
-                        ftr_SITE_NUM = ftr.get_value('SITE_NUM')
-                        if (ftr_HEAD_NUM, ftr_SITE_NUM) not in PIP:
-                            raise Exception("One should not be able to reach this point!")
-                        pn = PIP[(ftr_HEAD_NUM, ftr_SITE_NUM)]
-                        index['parts'][pn].append(offset)
-                    elif REC_ID == 'MPR':
-                        mpr = STDF.MPR(index['version'], index['endian'], REC)
-                        mpr_HEAD_NUM = mpr.get_value('HEAD_NUM') 
-                        mpr_SITE_NUM = mpr.get_value('SITE_NUM')
-                        if (mpr_HEAD_NUM, mpr_SITE_NUM) not in PIP:
-                            raise Exception("One should not be able to reach this point!")
-                        pn = PIP[(mpr_HEAD_NUM, mpr_SITE_NUM)]
-                        index['parts'][pn].append(offset)
-                    else:
-                        raise Exception("One should not be able to reach this point! (%s)" % REC_ID)
-                if progress: 
-                    progress_bar.update(REC_LEN)
-                offset += REC_LEN
-
-        # analyzing TDR's
-            if progress:
-                progress_bar.close()
-                desc = "Analyzing TDF's "
-                total = len(index['records']['TSR'])
-                progress_bar = tqdm(total=total, desc=desc, leave=False, unit='tests')
-                    
+            columns = stdf_columns(FileName, workers, progress)
+            catalog = columns['catalog']
             TEST_NUM_NAM = {}
-            
-            for tsr_offset in index['records']['TSR']:
-                tsr = STDF.TSR(index['version'], index['endian'], index['indexes'][tsr_offset])
-                TEST_NUM = tsr.get_value('TEST_NUM')
-                TEST_NAM = tsr.get_value('TEST_NAM')
-                TEST_TYP = tsr.get_value('TEST_TYP').upper()
-                if TEST_NUM not in TEST_NUM_NAM:
-                    TEST_NUM_NAM[TEST_NUM] = []
-                if (TEST_NAM, TEST_TYP) not in TEST_NUM_NAM[TEST_NUM]:
-                    TEST_NUM_NAM[TEST_NUM].append((TEST_NAM, TEST_TYP))
-                if progress:
-                    progress_bar.update()
-
-        # creating dataframe
-            if progress:
-                progress_bar.close()
-                desc = "Creating dataframe "
-                total = len(TEST_NUM_NAM)
-                progress_bar = tqdm(total=total, desc=desc, leave=False, unit='tests')
-            
-            ROW_index = sorted(list(index['parts']))
-            TEST_ITM_index = ['LOT_ID', 'MOD_COD', 'X_POS', 'Y_POS'] #TODO: add more ...
-            TEST_NAM_index = ['Meta'] * len(TEST_ITM_index)
-            TEST_NUM_index = ['Meta'] * len(TEST_ITM_index)
-            for TEST_NUM in sorted(TEST_NUM_NAM):
-                TEST_TYP = TEST_NUM_NAM[TEST_NUM][1]
-                if TEST_TYP == 'P':
-                    PTR_FIELDS = ['LO_SPEC', 'LO_LIMIT', 'RESULT', 'HI_LIMIT', 'HI_LIMIT', 'UNITS', 'PF']
-                    TEST_ITM_index+=PTR_FIELDS
-                    TEST_NAM_index+=[TEST_NUM_NAM[TEST_NUM][1]]*len(PTR_FIELDS)
-                    TEST_NUM_index+=[TEST_NUM]*len(PTR_FIELDS)
-                elif TEST_TYP == 'F':
-                    
-                    TEST_NUM_index+=[TEST_NUM]*5
-                    TEST_NAM_index+=[TEST_NUM_NAM[TEST_NUM][1]]*5     # VECT_NAME TIME_SET NUM_FAIL X_FAIL_AD Y_FAIL_AD PF
-                elif TEST_TYP == 'M':
-                    pass
-                else:
-                    raise STDFError("Test Type '%s' is unknown" % TEST_TYP)
-                if progress:
-                    progress_bar.update()
-                    
-        # filling the dataframe
-                    
-     
-                
-            # print("\n\n\n")
-                
-                
-            # for record_offset in index['parts'][1]:
-            #     record = index['indexes'][record_offset]
-            #     T, S = TS_from_record(record)
-            #     ID = TS2ID[(T,S)]
-            #     if ID == 'PTR':
-            #         ptr = STDF.PTR(index['version'], index['endian'], record)
-            #         print(ptr)
-            #     if ID == 'PIR':
-            #         pir = STDF.PIR(index['version'], index['endian'], record)
-            #         print(pir)
-            #     if ID == 'PRR':
-            #         prr = STDF.PRR(index['version'], index['endian'], record)
-            #         print(prr)
-                
-                
-                
-                
-                
-    #         if progress:
-    #             description = "Constructing data-frame"
-    #             constructing_progress = tqdm(total=len(index['parts']), ascii=True, position=2, disable=not progress, desc=description, leave=False, unit='parts')
-    #         
-    #         for part in index['parts']:
-    #             for record_offset in index['parts'][part]:
-    #                 Type, SubType = TS_from_record(index['indexes'][record_offset])
-    #                 ID = TS2ID[(Type, SubType)]
-    #                 if ID == 'FTR':
-    #                     ftr = FTR(index['version'], index['endian'], index['indexes'][record_offset])
-    #                     
-    #                 
-    #                 if ID == 'PTR':
-    #                     ptr = PTR(index['version'], index['endian'], index['indexes'][record_offset])
-    #                 
-    #                 if ID == 'MPR':
-    #                     ptr = MPR(index['version'], index['endian'], index['indexes'][record_offset])
-    #                     
-    # 
-    # 
-    #             constructing_progress.update()
-            
-            
-            
-    
-    
-                
-                
-            if progress:
-                # progress_bar.close()
-                progress_bar.close()
-    #             constructing_progress.close()
-        
-            return index, TEST_NUM_NAM
+            for TEST_NUM, TEST_NAM, TEST_TYP in zip(catalog['TEST_NUM'].tolist(), catalog['TEST_NAM'].tolist(), catalog['TEST_TYP'].tolist()):
+                TEST_NUM_NAM[TEST_NUM] = (TEST_NAM, TEST_TYP)
+            self._from_columns(catalog, columns['matrix'], columns['tables'])
+            self.source = FileName
+            return columns['index'], TEST_NUM_NAM
         
         else: #not an STDF file
             pass
+
+    def import_many(self, paths, workers=None, progress=True):
+        '''
+        This method will add the STDF files in paths (a lot : retests, multiple testers, ...) to this Metis object.
+        The files are parsed concurrently by workers processes (default = number of CPU's), each returns its 
+        columnar partial result (see stdf_columns), these are merged in the order of the files (MIR START_T).
+        The part x test matrix of a worker comes back through a temporary .npy file that is memory mapped 
+        for the merge, only the small per part arrays and tables are pickled (see partial_columns).
+        Paths that are not STDF files are skipped.
+        The Meta columns get (see retest_bins) :
+            'FILE'   : the index of the file in paths (also the 'FILE' column of the tables)
+            'RETEST' : 0 for the parts of a first pass file, n for the parts of the n-th retest file
+            'FINAL'  : True if this is the last (retest) result of the part
+        returns the number of parts.
+        '''
+        numbers = [number for number, path in enumerate(paths) if is_STDF(path)]
+        paths = [paths[number] for number in numbers]
+        if workers == None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise STDFError("Metis.import_many(%s) : need at least one worker" % workers)
+        partials = [None] * len(paths)
+        progress_bar = tqdm(total=len(paths), desc="Importing lot ", leave=False, unit='files', disable=not progress)
+        futures = {}
+        try:
+            if workers == 1 or len(paths) <= 1:
+                for number, path in enumerate(paths):
+                    partials[number] = partial_columns(path)
+                    progress_bar.update()
+            else:
+                with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                    futures = {executor.submit(partial_columns, path, True) : number for number, path in enumerate(paths)}
+                    for future in as_completed(futures):
+                        partials[futures[future]] = future.result()
+                        progress_bar.update()
+            progress_bar.close()
+            catalog, matrix, tables = merge_columns(partials, numbers)
+        finally:
+            for future, number in futures.items(): # also the spills of the other files if one failed
+                if future.done() and not future.cancelled() and future.exception() == None:
+                    partials[number] = future.result()
+            remove_spilled(partials)
+        self._from_columns(catalog, matrix, tables)
+        self.source = None
+        return len(matrix['HEAD_NUM'])
+
+    def _from_columns(self, catalog, matrix, tables):
+        '''
+        Sets the data-frame, the catalog and the tables of this object from columnar data (see stdf_columns),
+        without per cell work.
+        '''
+        catalog = pd.DataFrame(catalog).reset_index(drop=True)
+        ROW_index = pd.RangeIndex(1, len(matrix['HEAD_NUM']) + 1, name='PART')
+        meta = pd.DataFrame({('Meta', name) : matrix[name] for name in metis_meta_fields if name in matrix}, index=ROW_index)
+        columns = pd.MultiIndex.from_arrays([catalog['TEST_NUM'].tolist(), catalog['TEST_NAM'].tolist()])
+        results = pd.DataFrame(matrix['RESULT'], index=ROW_index, columns=columns, copy=False)
+        results = results.loc[:, [TEST_TYP not in ['M', ''] for TEST_TYP in catalog['TEST_TYP'].tolist()]] # '' = only a TSR, no results
+        self.df = pd.concat([meta, results], axis=1, copy=False)
+        self.df.columns.names = ['TEST_NUM', 'TEST_NAM']
+        self.catalog = catalog
+        self.tables = tables
+        self.store = None
    
-    def save(self):
+    def follow_stdf(self, FileName):
         '''
-        this method saves this object in an HDF5 container.
-        ps: the target (base) directory comes from the environment variable 'metis_dir' (or so) 
+        This method indexes FileName while it is still being written (live yield monitoring).
+        The first call indexes what is there, every next call only indexes the records that
+        are appended since, from the last complete record boundary on (see following_index).
+        returns the index (see index_STDF) and the number of new records.
         '''
-        pass
-    
+        if FileName not in self.followed:
+            self.followed[FileName] = following_index(FileName)
+        follower = self.followed[FileName]
+        new_records = follower.update()
+        return follower.index, new_records
+
+    def save(self, FileName=None):
+        '''
+        this method saves this object in an HDF5 container (FileName, default see metis_store_name)
+        
+        The container is a chunked, compressed columnar store :
+            'meta'         : the Meta columns (one row per part)
+            'catalog'      : the test catalog
+            'records/<ID>' : the metadata tables (see metis_record_tables)
+            'tests/T<NUM>' : the results of one test (see test_key), so that pull_in only reads the tests it needs
+        The container is written to a temporary file first, there are never half-written containers.
+        returns the name of the container.
+        '''
+        if self.df is None:
+            raise STDFError("Metis.save() : nothing to save")
+        if FileName == None:
+            if self.source == None:
+                raise STDFError("Metis.save() : no container name (and no STDF file to derive it from)")
+            FileName = metis_store_name(self.source)
+        if self.store != None: # not all tests might be pulled in yet
+            self.pull_in()
+        source = {'source' : self.source, 'size' : None, 'mtime' : None}
+        if self.source != None and os.path.exists(self.source):
+            stat = os.stat(self.source)
+            source['size'] = stat.st_size
+            source['mtime'] = stat.st_mtime_ns
+        temporary = "%s.%s.tmp" % (FileName, os.getpid())
+        try:
+            with pd.HDFStore(temporary, mode='w', complevel=metis_complevel, complib=metis_complib) as store:
+                store.put('meta', self.df['Meta'], format='table')
+                store.get_storer('meta').attrs.metis = source
+                store.put('catalog', self.catalog, format='table')
+                for REC_ID, table in self.tables.items():
+                    store.put('records/%s' % REC_ID, table)
+                present = set(self.df.columns.get_level_values(0))
+                for TEST_NUM in self.catalog['TEST_NUM'].tolist():
+                    if TEST_NUM in present:
+                        store.put(test_key(TEST_NUM), self.df[TEST_NUM].iloc[:, 0])
+            os.replace(temporary, FileName)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return FileName
+
+    def load(self, FileName):
+        '''
+        this method loads the Meta columns, the test catalog and the metadata tables from the container
+        of FileName (an STDF file, see metis_store_name, or the container itself), the tests are pulled 
+        in lazily (see pull_in).
+        returns False if there is no container, or if the STDF file changed since it was saved.
+        '''
+        store = FileName if FileName.endswith('.h5') else metis_store_name(FileName)
+        if not os.path.exists(store):
+            return False
+        with pd.HDFStore(store, mode='r') as container:
+            source = container.get_storer('meta').attrs.metis
+            if source['source'] != None and os.path.exists(source['source']):
+                stat = os.stat(source['source'])
+                if (stat.st_size, stat.st_mtime_ns) != (source['size'], source['mtime']):
+                    return False
+            meta = container['meta']
+            self.catalog = container['catalog']
+            self.tables = {key.split('/')[-1] : container[key] for key in container.keys() if key.startswith('/records/')}
+        meta.columns = pd.MultiIndex.from_arrays([['Meta'] * len(meta.columns), list(meta.columns)], names=['TEST_NUM', 'TEST_NAM'])
+        self.df = meta
+        self.source = source['source']
+        self.store = store
+        return True
+
     def pull_in(self, what=''):
         '''
         this method will pull in 'what' to the data-frame.
+        what is a TEST_NUM, a TEST_NAM or a list of these ('' = all tests), only the tests 
+        that are not in the data-frame yet are read from the container (see load).
         '''
-        
-
+        if self.store == None:
+            return
+        catalog = self.catalog[~self.catalog['TEST_TYP'].isin(['M', ''])]
+        if isinstance(what, (numbers.Integral, str)):
+            what = [what]
+        if what == ['']:
+            selection = catalog
+        else:
+            selection = catalog[catalog['TEST_NUM'].isin([item for item in what if isinstance(item, numbers.Integral)]) | 
+                                catalog['TEST_NAM'].isin([item for item in what if isinstance(item, str)])]
+        present = set(self.df.columns.get_level_values(0))
+        selection = selection[~selection['TEST_NUM'].isin(present)]
+        if len(selection) == 0:
+            return
+        with pd.HDFStore(self.store, mode='r') as container:
+            columns = [container[test_key(TEST_NUM)] for TEST_NUM in selection['TEST_NUM'].tolist()]
+        results = pd.concat(columns, axis=1, copy=False)
+        results.columns = pd.MultiIndex.from_arrays([selection['TEST_NUM'].tolist(), selection['TEST_NAM'].tolist()], names=['TEST_NUM', 'TEST_NAM'])
+        results.index = self.df.index
+        self.df = pd.concat([self.df, results], axis=1, copy=False)
 
 
 if __name__ == '__main__':
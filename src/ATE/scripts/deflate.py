@@ -27,7 +27,7 @@ if DEBUG or TESTRUN or PROFILE:
     if project not in sys.path:
         sys.path.insert(0, project)
     
-from ATE.utils.compression.deflate import deflate, supported_compressions, default_compression
+from ATE.utils.compression import deflate, supported_compressions, default_compression
 
 default_extensions = ['.stdf', '.std']
 
@@ -95,6 +95,8 @@ USAGE
         parser.add_argument("-p", "--progress", action="store_true", default=False, help="Disable the progress bar(s) [default:%(default)s]")
         parser.add_argument("-c", "--compression", action='store', default=default_compression, choices=list(supported_compressions), help="The compression method to use. [default: %(default)s]")
         parser.add_argument("-e", "--extension", dest='extensions', action='append', default=default_extensions, help="Extensions to deflate. [default: %(default)s]")
+        parser.add_argument("-w", "--workers", action='store', type=int, default=None, help="The number of files to compress concurrently. [default: number of CPU's]")
+        parser.add_argument("-b", "--block-size", dest='block_size', action='store', type=int, default=None, help="Write multi-block xz files with blocks of this many MiB (lzma only). [default: single block]")
         parser.add_argument("-s", "--summary", action='store_true', default=False, help="Disable the summary at the end. [default: %(default)s]")
         parser.add_argument('-V', '--version', action='version', version=program_version_message)
         parser.add_argument(dest="paths", help="Paths to file(s)/direcctory(s) to process", metavar="path", nargs='+')
@@ -107,6 +109,8 @@ USAGE
         compression = args.compression
         extensions = args.extensions
         summary = not args.summary
+        workers = args.workers
+        block_size = None if args.block_size == None else args.block_size * 1024 * 1024
         paths = args.paths
 
         if TESTRUN:
@@ -116,6 +120,8 @@ USAGE
             print("compression = %s" % compression)
             print("extensions = %s" % extensions)
             print("summary = %s" % summary)
+            print("workers = %s" % workers)
+            print("block_size = %s" % block_size)
             print("paths = %s" % paths)
             print("-" * 50)
 
@@ -151,7 +157,7 @@ USAGE
         # book keeping
         files_to_process = len(good_file_paths)
         # do the work
-        deflate(good_file_paths, compression=compression, progress=progress)
+        deflate(good_file_paths, compression=compression, progress=progress, workers=workers, block_size=block_size)
             
         if TESTRUN:
             print("-" * 50)
@@ -10,11 +10,12 @@ ATE.scripts.deflate -- decompresses file(s)
 
 import sys
 import os
+import re
 
 from argparse import ArgumentParser
 from argparse import RawDescriptionHelpFormatter
 
-from ATE.utils.compression.inflate import inflate
+from ATE.utils.compression import inflate, supported_compressions_extensions
 
 __all__ = []
 __version__ = 0.1
@@ -66,9 +67,10 @@ USAGE
         # Setup argument parser
         parser = ArgumentParser(description=program_license, formatter_class=RawDescriptionHelpFormatter)
         parser.add_argument("-r", "--recursive", dest="recurse", action="store_true", help="recurse into subfolders [default: %(default)s]")
-        parser.add_argument("-v", "--verbose", dest="verbose", action="count", help="set verbosity level [default: %(default)s]")
+        parser.add_argument("-v", "--verbose", dest="verbose", action="count", default=0, help="set verbosity level [default: %(default)s]")
         parser.add_argument("-i", "--include", dest="include", help="only include paths matching this regex pattern. Note: exclude is given preference over include. [default: %(default)s]", metavar="RE" )
         parser.add_argument("-e", "--exclude", dest="exclude", help="exclude paths matching this regex pattern. [default: %(default)s]", metavar="RE" )
+        parser.add_argument("-w", "--workers", dest="workers", action="store", type=int, default=None, help="the number of files to decompress concurrently [default: number of CPU's]")
         parser.add_argument('-V', '--version', action='version', version=program_version_message)
         parser.add_argument(dest="paths", help="paths to folder(s) with source file(s) [default: %(default)s]", metavar="path", nargs='+')
 
@@ -80,6 +82,7 @@ USAGE
         recurse = args.recurse
         inpat = args.include
         expat = args.exclude
+        workers = args.workers
 
         if verbose > 0:
             print("Verbose mode on")
@@ -91,9 +94,25 @@ USAGE
         if inpat and expat and inpat == expat:
             raise CLIError("include and exclude pattern are equal! Nothing will be processed.")
 
+        file_paths = []
         for inpath in paths:
-            ### do something with inpath ###
-            print(inpath)
+            if os.path.isfile(inpath):
+                candidates = [inpath]
+            elif recurse:
+                candidates = [os.path.join(root, name) for root, _, names in os.walk(inpath) for name in names]
+            else:
+                candidates = [os.path.join(inpath, name) for name in os.listdir(inpath)]
+            for candidate in candidates:
+                if os.path.splitext(candidate)[1] not in supported_compressions_extensions:
+                    continue
+                if expat and re.search(expat, candidate):
+                    continue
+                if inpat and not re.search(inpat, candidate):
+                    continue
+                file_paths.append(candidate)
+        if verbose > 0:
+            print("de-compressing %d files" % len(file_paths))
+        inflate(sorted(set(file_paths)), progress=verbose > 0, workers=workers)
         return 0
     except KeyboardInterrupt:
         ### handle keyboard interrupt ###
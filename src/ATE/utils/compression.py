@@ -4,10 +4,15 @@ Created on Sep 13, 2019
 @author: hoeren
 '''
 import os, sys, tqdm
-import gzip, bz2, lzma
+import gzip, bz2, lzma, zlib
+import struct, pickle
+from collections import deque
+import multiprocessing, threading
+from queue import Queue, Empty
+from concurrent.futures import ProcessPoolExecutor, wait
 
-from ATE.utils import DT
 from ATE.utils.magicnumber import extension_from_magic_number_in_file
+from ATE.utils.seekable import xz_checkpoints
 
 supported_compressions = {'lzma' : '.xz', 'gzip' : '.gz', 'bz2' : '.bz2'}
 supported_compressions_extensions = {supported_compressions[k]:k for k in supported_compressions}
@@ -16,80 +21,477 @@ default_compression = 'lzma'
 if default_compression not in supported_compressions:
     raise KeyError("%s not in %s" % (default_compression, supported_compressions))
 
-def deflate(FileNames, compression=default_compression, progress=True, bs=128*1024, use_hash=False):
+xz_block_size = 32 * 1024 * 1024 # default block size of multi-block xz files
+xz_dict_size = 8 * 1024 * 1024   # the dictionary of the default preset (6)
+xz_check = 0x01                  # CRC32
+
+gzip_ISIZE_limit = (1 << 32) // 1032 # deflate inflates at most 1032:1, a (single member) gzip file below this size can't reach 4GiB, so ISIZE is the size
+
+def xz_varint(value):
     '''
-    compresses all give 'FileNames' 
-    
-    TODO: add the hashing possibility
+    returns the xz multibyte integer encoding of value.
     '''
-    def comp(FileName, compression='lzma', annotation='', bs=128*1024, progress=False, indent=0, callback=None):
-        lbl = "Compressing %s : '%s' with %s" % (annotation, os.path.split(FileName)[1], compression)
-        ttl = os.stat(FileName)[6]
-        dt = DT(FileName)
-        pb = tqdm.tqdm(total=ttl, desc=lbl, unit='B', unit_scale=True, leave=False, disable=not progress, position=indent)
-        ext = supported_compressions[compression]
-        if compression=='lzma':
-            with open(FileName, 'rb') as fdi, lzma.open(FileName+ext, 'wb') as fdo:
-                chunk = fdi.read(bs)
-                while len(chunk) == bs:
-                    fdo.write(chunk)
-                    pb.update(bs)
-                    if progress and callback!=None: callback(bs)
-                    chunk = fdi.read(bs)
-                fdo.write(chunk)
-                pb.update(bs)
-                if progress and callback!=None: callback(bs)
-            os.utime(FileName+ext, times=(dt.epoch, dt.epoch))
-        elif compression=='bz2':
-            with open(FileName, 'rb') as fdi, bz2.open(FileName+ext, 'wb') as fdo:
+    retval = bytearray()
+    while value >= 0x80:
+        retval.append((value & 0x7F) | 0x80)
+        value >>= 7
+    retval.append(value)
+    return bytes(retval)
+
+def xz_padding(size):
+    '''
+    returns the zero padding that aligns size to 4 bytes.
+    '''
+    return b'\x00' * (-size % 4)
+
+def xz_block(data, preset=None):
+    '''
+    compresses data in one independent xz block (header, LZMA2 data, padding & CRC32 check).
+    returns (the block, its unpadded size) for the index of the stream.
+    '''
+    dict_size = 1 << max(12, min(xz_dict_size.bit_length() - 1, (max(len(data), 1) - 1).bit_length()))
+    filters = [{'id' : lzma.FILTER_LZMA2, 'preset' : 6 if preset == None else preset, 'dict_size' : dict_size}]
+    compressed = lzma.compress(data, format=lzma.FORMAT_RAW, filters=filters)
+    header = bytearray(b'\x00\xC0') # size (later), flags : 1 filter, compressed & uncompressed size present
+    header += xz_varint(len(compressed)) + xz_varint(len(data))
+    header += b'\x21\x01' + bytes([2 * (dict_size.bit_length() - 1 - 12)]) # LZMA2, 1 property byte (dictionary size)
+    header += xz_padding(len(header) + 4)
+    header[0] = (len(header) + 4) // 4 - 1
+    header += struct.pack('<I', zlib.crc32(header))
+    check = struct.pack('<I', zlib.crc32(data))
+    return b''.join([header, compressed, xz_padding(len(compressed)), check]), len(header) + len(compressed) + len(check)
+
+def deflate_xz_blocks(fdi, fdo, block_size=xz_block_size, level=None, workers=1, callback=None):
+    '''
+    compresses the (binary) file object fdi into a multi-block xz stream on fdo, the blocks of block_size 
+    are compressed independently (by workers processes) and the stream gets a proper index, so it can be 
+    read from any block on (see ATE.utils.seekable). At most 2 x workers blocks are in flight.
+    callback (if any) is called with the number of bytes consumed from fdi.
+    '''
+    flags = bytes([0, xz_check])
+    fdo.write(b'\xFD7zXZ\x00' + flags + struct.pack('<I', zlib.crc32(flags)))
+    records = []
+    def emit(block, unpadded_size, uncompressed_size):
+        fdo.write(block)
+        records.append(xz_varint(unpadded_size) + xz_varint(uncompressed_size))
+        if callback != None: callback(uncompressed_size)
+    if workers == 1:
+        data = fdi.read(block_size)
+        while len(data) != 0:
+            emit(*xz_block(data, level), len(data))
+            data = fdi.read(block_size)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            data = fdi.read(block_size)
+            while len(data) != 0 or len(in_flight) != 0:
+                while len(data) != 0 and len(in_flight) < 2 * workers:
+                    in_flight.append((executor.submit(xz_block, data, level), len(data)))
+                    data = fdi.read(block_size)
+                future, size = in_flight.popleft()
+                emit(*future.result(), size)
+    index = bytearray(b'\x00') + xz_varint(len(records)) + b''.join(records)
+    index += xz_padding(len(index))
+    index += struct.pack('<I', zlib.crc32(index))
+    fdo.write(index)
+    footer = struct.pack('<I', len(index) // 4 - 1) + flags
+    fdo.write(struct.pack('<I', zlib.crc32(footer)) + footer + b'YZ')
+
+def deflate_file(FileName, compression=default_compression, bs=128*1024, callback=None, level=None, block_size=None, workers=1):
+    '''
+    compresses FileName to FileName + the extension of compression, in chunks of bs bytes.
+    For lzma with a block_size, the xz file is made of independent blocks, compressed by workers 
+    processes (see deflate_xz_blocks).
+    The compressed file gets the modification time of FileName, it is written to a temporary file 
+    first, so there are never half-written compressed files.
+    callback (if any) is called with the number of bytes consumed from FileName.
+    returns the name of the compressed file.
+    '''
+    if compression not in supported_compressions:
+        raise Exception("don't know how to handle '%s' compression" % compression)
+    target = FileName + supported_compressions[compression]
+    temporary = "%s.%s.tmp" % (target, os.getpid())
+    mtime = os.stat(FileName).st_mtime_ns
+    try:
+        with open(FileName, 'rb') as fdi, open(temporary, 'wb') as fdo:
+            if compression == 'lzma' and block_size != None:
+                deflate_xz_blocks(fdi, fdo, block_size, level, workers, callback)
+            else:
+                codec = compressor(compression, level)
                 chunk = fdi.read(bs)
-                while len(chunk) == bs:
-                    fdo.write(chunk)
-                    pb.update(bs)
-                    if progress and callback!=None: callback(bs)
+                while len(chunk) != 0:
+                    fdo.write(codec.compress(chunk))
+                    if callback != None: callback(len(chunk))
                     chunk = fdi.read(bs)
+                fdo.write(codec.flush())
+        os.utime(temporary, ns=(mtime, mtime))
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return target
+
+def _deflate_worker(FileName, compression, bs, queue, block_size):
+    '''
+    worker (process) of deflate, reports the consumed bytes on queue.
+    '''
+    return deflate_file(FileName, compression, bs, queue.put, block_size=block_size)
+
+def deflate(FileNames, compression=default_compression, progress=True, bs=128*1024, use_hash=False, workers=1, block_size=None):
+    '''
+    compresses all give 'FileNames' (see deflate_file)
+    
+    With workers > 1 (None = the number of CPU's) the files are compressed concurrently by a pool 
+    of worker processes, that report to the aggregate progress bar. Each worker streams its file 
+    in chunks of bs bytes, so the memory use stays bounded by workers x (bs + compressor state).
+    For lzma with a block_size (see xz_block_size) the xz files are multi-block (randomly seekable by block),
+    a single file is then compressed by the workers block by block (see deflate_xz_blocks).
+    
+    TODO: add the hashing possibility
+    '''
+    if compression not in supported_compressions:
+        raise Exception("don't know how to handle '%s' compression" % compression)
+    if isinstance(FileNames, str): # single file
+        FileNames = [FileNames]
+    if workers == None:
+        workers = os.cpu_count() or 1
+    label = "%s progress of %d files" % (compression, len(FileNames))
+    total = 0
+    for FileName in FileNames:
+        total+=os.stat(FileName)[6]
+    tpb = tqdm.tqdm(total=total, desc=label, unit='B', unit_scale=True, leave=False, disable=not progress)
+    if workers == 1 or len(FileNames) <= 1:
+        for FileNumber, FileName in enumerate(FileNames):
+            lbl = "Compressing file %s/%s : '%s' with %s" % (FileNumber+1, len(FileNames), os.path.split(FileName)[1], compression)
+            pb = tqdm.tqdm(total=os.stat(FileName)[6], desc=lbl, unit='B', unit_scale=True, leave=False, disable=not progress, position=1)
+            def callback(size):
+                pb.update(size)
+                tpb.update(size)
+            deflate_file(FileName, compression, bs, callback, block_size=block_size, workers=workers)
+            pb.close()
+    else:
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=min(workers, len(FileNames))) as executor:
+            queue = manager.Queue()
+            pending = {executor.submit(_deflate_worker, FileName, compression, bs, queue, block_size) for FileName in FileNames}
+            while len(pending) != 0:
+                done, pending = wait(pending, timeout=0.1)
+                for future in done:
+                    future.result()
+                try:
+                    while True:
+                        tpb.update(queue.get_nowait())
+                except Empty:
+                    pass
+    tpb.close()
+
+def compressor(compression=default_compression, level=None):
+    '''
+    returns a streaming compressor object (with compress(data) and flush()) for compression, 
+    that produces the same container as deflate does (xz, bz2 or gzip).
+    level is the compression level (or preset for lzma), default is the default of the codec.
+    '''
+    if compression == 'lzma':
+        return lzma.LZMACompressor(format=lzma.FORMAT_XZ, preset=level)
+    elif compression == 'bz2':
+        return bz2.BZ2Compressor(9 if level == None else level)
+    elif compression == 'gzip':
+        return zlib.compressobj(9 if level == None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    raise Exception("don't know how to handle '%s' compression" % compression)
+
+def compression_of(FileName):
+    '''
+    returns the (supported) compression of FileName (from its magic number) or '' 
+    '''
+    ext = extension_from_magic_number_in_file(FileName, list(supported_compressions_extensions))
+    if len(ext) == 1:
+        return supported_compressions_extensions[ext[0]]
+    return ''
+
+def inflate_file(FileName, bs=1024*1024, callback=None, expected_hash=None):
+    '''
+    de-compresses FileName (to FileName without the extension of its compression) in chunks of bs bytes,
+    the decompressed contents are hashed on the fly (see ATE.utils.hashing).
+    The decompressed file gets the modification time of FileName, it is written to a temporary file 
+    first and only renamed if the hash matches expected_hash (if any), so there are never half-written 
+    (or corrupt) decompressed files.
+    callback (if any) is called with the number of (compressed) bytes consumed from FileName.
+    returns (the name of the decompressed file, the hash of its contents)
+    '''
+    from ATE.utils.hashing import hasher
+    compression = compression_of(FileName)
+    if compression == '':
+        raise Exception("'%s' is not a (supported) compressed file" % FileName)
+    ext = supported_compressions[compression]
+    if not FileName.endswith(ext):
+        raise Exception("'%s' is %s compressed, but doesn't end with '%s'" % (FileName, compression, ext))
+    target = FileName[:-len(ext)]
+    temporary = "%s.%s.tmp" % (target, os.getpid())
+    mtime = os.stat(FileName).st_mtime_ns
+    opener = {'lzma' : lzma.open, 'bz2' : bz2.open, 'gzip' : gzip.open}[compression]
+    _hash = hasher()
+    try:
+        with open(FileName, 'rb') as raw, opener(raw, 'rb') as fdi, open(temporary, 'wb') as fdo:
+            consumed = 0
+            chunk = fdi.read(bs)
+            while len(chunk) != 0:
+                _hash.update(chunk)
                 fdo.write(chunk)
-                pb.update(bs)
-                if progress and callback!=None: callback(bs)
-            os.utime(FileName+ext, times=(dt.epoch, dt.epoch))
-        elif compression=='gzip':
-            with open(FileName, 'rb') as fdi, gzip.open(FileName+ext, 'wb') as fdo:
+                if callback != None:
+                    position = raw.tell()
+                    callback(position - consumed)
+                    consumed = position
                 chunk = fdi.read(bs)
-                while len(chunk) == bs:
-                    fdo.write(chunk)
-                    pb.update(bs)
-                    if progress and callback!=None: callback(bs)
-                    chunk = fdi.read(bs)
-                fdo.write(chunk)
-                pb.update(bs)
-                if progress and callback!=None: callback(bs)
-            os.utime(FileName+ext, times=(dt.epoch, dt.epoch))
-        else:
-            raise Exception("Supported but un-implemented compression '%s'" % compression)
-        pb.close()
+        if expected_hash != None and _hash.hexdigest() != expected_hash.lower():
+            raise Exception("'%s' decompresses to hash %s instead of %s" % (FileName, _hash.hexdigest(), expected_hash))
+        os.utime(temporary, ns=(mtime, mtime))
+        os.replace(temporary, target)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return target, _hash.hexdigest()
+
+def _inflate_worker(FileName, bs, queue, expected_hash):
+    '''
+    worker (process) of inflate, reports the consumed bytes on queue.
+    '''
+    return inflate_file(FileName, bs, queue.put, expected_hash)
+
+def inflate(FileNames, progress=True, bs=1024*1024, workers=1, hashes=None):
+    '''
+    de-compress *ALL* given FileNames (see inflate_file)
     
+    The decompressed contents are verified against hashes ({FileName : hash}), or against the name of
+    the file if it is a hash name (see ATE.utils.hashing.is_hash_name).
+    With workers > 1 (None = the number of CPU's) the files are decompressed concurrently by a pool of 
+    worker processes, that report to the aggregate progress bar.
+    returns {FileName : (decompressed file name, hash)}
+    '''
+    from ATE.utils.hashing import is_hash_name
+    if isinstance(FileNames, str): # single file
+        FileNames = [FileNames]
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if hashes == None:
+        hashes = {}
+    expected = {}
+    for FileName in FileNames:
+        expected[FileName] = hashes.get(FileName)
+        if expected[FileName] == None and is_hash_name(FileName):
+            expected[FileName] = os.path.split(FileName)[1].split('.')[0]
+    label = "de-compressing %d files" % len(FileNames)
+    total = 0
+    for FileName in FileNames:
+        total+=os.stat(FileName)[6]
+    tpb = tqdm.tqdm(total=total, desc=label, unit='B', unit_scale=True, leave=False, disable=not progress)
+    retval = {}
+    if workers == 1 or len(FileNames) <= 1:
+        for FileName in FileNames:
+            retval[FileName] = inflate_file(FileName, bs, tpb.update, expected[FileName])
+    else:
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=min(workers, len(FileNames))) as executor:
+            queue = manager.Queue()
+            pending = {executor.submit(_inflate_worker, FileName, bs, queue, expected[FileName]) : FileName for FileName in FileNames}
+            remaining = set(pending)
+            while len(remaining) != 0:
+                done, remaining = wait(remaining, timeout=0.1)
+                for future in done:
+                    retval[pending[future]] = future.result()
+                try:
+                    while True:
+                        tpb.update(queue.get_nowait())
+                except Empty:
+                    pass
+    tpb.close()
+    return retval
+
+def _decompressing_reader(FileName, compression, bs, chunks):
+    '''
+    background thread of recompress_file, puts (de-compressed chunk, compressed bytes consumed) on the 
+    (bounded) queue chunks, then (b'', 0) at the end, or the exception if something goes wrong.
+    '''
+    opener = {'lzma' : lzma.open, 'bz2' : bz2.open, 'gzip' : gzip.open}[compression]
+    try:
+        with open(FileName, 'rb') as raw, opener(raw, 'rb') as fdi:
+            consumed = 0
+            chunk = fdi.read(bs)
+            while len(chunk) != 0:
+                position = raw.tell()
+                chunks.put((chunk, position - consumed))
+                consumed = position
+                chunk = fdi.read(bs)
+        chunks.put((b'', 0))
+    except Exception as e:
+        chunks.put(e)
+
+def recompress_file(FileName, compression=default_compression, bs=1024*1024, callback=None, level=None, expected_hash=None, queue_size=8):
+    '''
+    re-compresses FileName (compressed with another supported compression) to compression, without an 
+    uncompressed copy on disk : a background thread de-compresses in chunks of bs bytes into a bounded
+    queue (of queue_size chunks), this thread hashes and compresses them (the codecs release the GIL,
+    so this runs at the speed of the slower codec).
+    The new file gets the modification time of FileName, it is written to a temporary file first and only
+    renamed if the hash of the payload matches expected_hash (if any).
+    callback (if any) is called with the number of (compressed) bytes consumed from FileName.
+    returns (the name of the re-compressed file, the hash of the payload)
+    '''
+    from ATE.utils.hashing import hasher
+    source = compression_of(FileName)
+    if source == '':
+        raise Exception("'%s' is not a (supported) compressed file" % FileName)
     if compression not in supported_compressions:
         raise Exception("don't know how to handle '%s' compression" % compression)
-        
+    ext = supported_compressions[source]
+    if not FileName.endswith(ext):
+        raise Exception("'%s' is %s compressed, but doesn't end with '%s'" % (FileName, source, ext))
+    target = FileName[:-len(ext)] + supported_compressions[compression]
+    if target == FileName:
+        raise Exception("'%s' is already %s compressed" % (FileName, compression))
+    temporary = "%s.%s.tmp" % (target, os.getpid())
+    mtime = os.stat(FileName).st_mtime_ns
+    codec = compressor(compression, level)
+    _hash = hasher()
+    chunks = Queue(maxsize=queue_size)
+    reader = threading.Thread(target=_decompressing_reader, args=(FileName, source, bs, chunks), daemon=True)
+    reader.start()
+    try:
+        with open(temporary, 'wb') as fdo:
+            while True:
+                item = chunks.get()
+                if isinstance(item, Exception):
+                    raise item
+                chunk, consumed = item
+                if len(chunk) == 0:
+                    break
+                _hash.update(chunk)
+                fdo.write(codec.compress(chunk))
+                if callback != None: callback(consumed)
+            fdo.write(codec.flush())
+        reader.join()
+        if expected_hash != None and _hash.hexdigest() != expected_hash.lower():
+            raise Exception("'%s' holds hash %s instead of %s" % (FileName, _hash.hexdigest(), expected_hash))
+        os.utime(temporary, ns=(mtime, mtime))
+        os.replace(temporary, target)
+    finally:
+        while reader.is_alive(): # unblock the reader (on errors)
+            try:
+                chunks.get(timeout=0.1)
+            except Empty:
+                pass
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return target, _hash.hexdigest()
+
+def _recompress_worker(FileName, compression, bs, queue, expected_hash, remove_source):
+    '''
+    worker (process) of recompress, reports the consumed bytes on queue.
+    '''
+    retval = recompress_file(FileName, compression, bs, queue.put, expected_hash=expected_hash)
+    if remove_source:
+        os.remove(FileName)
+    return retval
+
+def recompress(FileNames, compression=default_compression, progress=True, bs=1024*1024, workers=1, hashes=None, remove_source=False):
+    '''
+    re-compresses *ALL* given FileNames to compression (see recompress_file), the sources are removed
+    after a successful re-compression if remove_source is True.
+    
+    The payloads are verified against hashes ({FileName : hash}), or against the name of the file if 
+    it is a hash name (see ATE.utils.hashing.is_hash_name).
+    With workers > 1 (None = the number of CPU's) the files are re-compressed concurrently by a pool of 
+    worker processes, that report to the aggregate progress bar.
+    returns {FileName : (re-compressed file name, hash)}
+    '''
+    from ATE.utils.hashing import is_hash_name
     if isinstance(FileNames, str): # single file
-        comp(FileNames, progress=progress)
-    if isinstance(FileNames, list): # multiple files
-        label = "%s progress of %d files" % (compression, len(FileNames))
-        total = 0
+        FileNames = [FileNames]
+    if workers == None:
+        workers = os.cpu_count() or 1
+    if hashes == None:
+        hashes = {}
+    expected = {}
+    for FileName in FileNames:
+        expected[FileName] = hashes.get(FileName)
+        if expected[FileName] == None and is_hash_name(FileName):
+            expected[FileName] = os.path.split(FileName)[1].split('.')[0]
+    label = "re-compressing %d files to %s" % (len(FileNames), compression)
+    total = 0
+    for FileName in FileNames:
+        total+=os.stat(FileName)[6]
+    tpb = tqdm.tqdm(total=total, desc=label, unit='B', unit_scale=True, leave=False, disable=not progress)
+    retval = {}
+    if workers == 1 or len(FileNames) <= 1:
         for FileName in FileNames:
-            total+=os.stat(FileName)[6]
-        tpb = tqdm.tqdm(total=total, desc=label, unit='B', unit_scale=True, leave=False, disable=not progress)
-        for FileNumber, FileName in enumerate(FileNames):
-            annotation = 'file %s/%s' % (FileNumber+1, len(FileNames))
-            comp(FileName, annotation = annotation, progress=progress, indent=1, callback=tpb.update)
-        tpb.close()
+            retval[FileName] = recompress_file(FileName, compression, bs, tpb.update, expected_hash=expected[FileName])
+            if remove_source:
+                os.remove(FileName)
+    else:
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=min(workers, len(FileNames))) as executor:
+            progress_queue = manager.Queue()
+            pending = {executor.submit(_recompress_worker, FileName, compression, bs, progress_queue, expected[FileName], remove_source) : FileName for FileName in FileNames}
+            remaining = set(pending)
+            while len(remaining) != 0:
+                done, remaining = wait(remaining, timeout=0.1)
+                for future in done:
+                    retval[pending[future]] = future.result()
+                try:
+                    while True:
+                        tpb.update(progress_queue.get_nowait())
+                except Empty:
+                    pass
+    tpb.close()
+    return retval
+
+def deflated_size_cache_name():
+    '''
+    returns the name of the persistent cache of (de-compressed) file sizes, in the directory of the 
+    environment variable 'ATE_cache' (default ~/.cache/ATE).
+    '''
+    directory = os.environ.get('ATE_cache', os.path.join(os.path.expanduser('~'), '.cache', 'ATE'))
+    return os.path.join(directory, 'deflated_sizes.pickle')
+
+def _deflated_size_cache():
+    '''
+    returns the persistent cache {(path, size, mtime) : de-compressed size}, empty if there is none (or it is unreadable).
+    '''
+    try:
+        with open(deflated_size_cache_name(), 'rb') as fd:
+            cache = pickle.load(fd)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def _cache_deflated_size(key, size):
+    '''
+    adds key (path, size, mtime) : size to the persistent cache, entries of files that changed or 
+    disappeared are dropped. The cache is written to a temporary file first.
+    '''
+    cache = {}
+    for (path, file_size, mtime), value in _deflated_size_cache().items():
+        if path != key[0] and os.path.exists(path):
+            cache[(path, file_size, mtime)] = value
+    cache[key] = size
+    name = deflated_size_cache_name()
+    temporary = "%s.%s.tmp" % (name, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(name), exist_ok=True)
+        with open(temporary, 'wb') as fd:
+            pickle.dump(cache, fd)
+        os.replace(temporary, name)
+    except OSError:
+        pass # the cache is an optimization
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
 
-def inflate(FileNames, progress=True, bs=128*1024):
+def _gzip_single_member(data):
     '''
-    de-compress *ALL* given FileNames
+    returns True if the gzip file content data surely holds one member.
+    
+    Every member starts with the magic number and method (1F 8B 08), so if that sequence doesn't occur after the
+    first header, there is no second member. The sequence can also occur inside the compressed data, in which case
+    False is returned and the caller has to de-compress.
     '''
-    def decomp(FileName, compression='lzma', annotation='', bs=128*1024, progress=False, indent=0, callback=None):
-        pass
+    return data.find(b'\x1f\x8b\x08', 10) == -1
 
 def get_deflated_file_size(FileName):
     '''
@@ -97,28 +499,41 @@ def get_deflated_file_size(FileName):
     
     if FileName is a compressed file, but not supported, -1 is returned.
     if FileName is not (recognized) as a compressed file, the filesize is returned.
+    
+    The de-compressed size is looked up without de-compressing where possible :
+        lzma : from the index of the xz stream(s) (see ATE.utils.seekable.xz_checkpoints)
+        gzip : from ISIZE (the size modulo 2**32) of files below gzip_ISIZE_limit, if they have a single member
+               (ISIZE is the size of the last member only, see _gzip_single_member)
+    the others are de-compressed once, and their size is kept in a persistent cache (see deflated_size_cache_name)
+    keyed on (path, size, mtime).
     '''
-    compression = ''
-    ext = extension_from_magic_number_in_file(FileName, list(supported_compressions_extensions))
-    if len(ext) == 1:
-        compression = supported_compressions_extensions[ext[0]]
-
-    if compression=='lzma':
-        with lzma.open(FileName, 'rb') as fd:
-            fd.seek(0, 2)
-            size = fd.tell()
-    elif compression=='bz2':
-        with bz2.open(FileName, 'rb') as fd:
-            fd.seek(0, 2)
-            size = fd.tell()
-    elif compression=='gzip':
-        with gzip.open(FileName, 'rb') as fd:
-            fd.seek(0, 2)
-            size = fd.tell()
-    else:
+    compression = compression_of(FileName)
+    stat = os.stat(FileName)
+    if compression == '':
+        return stat.st_size
+    if compression == 'lzma':
+        with open(FileName, 'rb') as fd:
+            try:
+                return xz_checkpoints(fd, stat.st_size)[1]
+            except Exception: # no (complete) index (yet), de-compress
+                pass
+    elif compression == 'gzip' and 18 <= stat.st_size <= gzip_ISIZE_limit:
         with open(FileName, 'rb') as fd:
-            fd.seek(0,2)
-            size = fd.tell()
+            data = fd.read()
+        if _gzip_single_member(data):
+            return struct.unpack('<I', data[-4:])[0]
+    key = (os.path.abspath(FileName), stat.st_size, stat.st_mtime_ns)
+    cache = _deflated_size_cache()
+    if key in cache:
+        return cache[key]
+    opener = {'lzma' : lzma.open, 'bz2' : bz2.open, 'gzip' : gzip.open}[compression]
+    size = 0
+    with opener(FileName, 'rb') as fd:
+        chunk = fd.read(1024*1024)
+        while len(chunk) != 0:
+            size += len(chunk)
+            chunk = fd.read(1024*1024)
+    _cache_deflated_size(key, size)
     return size
 
 if __name__ == '__main__':
@@ -0,0 +1,479 @@
+'''
+Created on Oct 18, 2026
+
+Random access in compressed (lzma, bz2 and gzip) files.
+
+A compressed file can only be decompressed from a point where the decompressor
+doesn't need anything that came before, such a point is a checkpoint :
+
+    (uncompressed offset, compressed start (in bits), compressed end (in bits), header offset)
+
+  - xz : every block of every stream, read from the block index at the end of each stream (no decompression needed)
+  - bz2 : every block of every stream, the block magic can start on any bit, the blocks are found while decompressing
+  - gzip : every member, plus (in memory only) a copy of the decompressor every snapshot_step bytes
+
+A checkpoint that starts at its header offset is the start of a stream (or member), that is decompressed up
+to its end. Any other checkpoint is in the middle of a stream, the stream header is put in front of the data
+from the compressed start up to the compressed end (the index of the xz stream, the end of stream marker of
+the bz2 stream) and after that the decompression continues with the next stream.
+
+seekable_file builds the checkpoints while reading (the first scan), so that seeking backwards (or far
+forward in a region that is already scanned) only has to decompress from the nearest checkpoint on.
+The checkpoints can be saved (see checkpoint_table) and passed to a later seekable_file on the same file.
+'''
+import os
+import struct
+import bisect
+import zlib, bz2, lzma
+
+import numpy as np
+
+from ATE.utils.magicnumber import extension_from_magic_number_in_file
+
+compressions = {'.xz' : 'lzma', '.bz2' : 'bz2', '.gz' : 'gzip'}
+
+stream_magic = {'lzma' : b'\xFD7zXZ\x00', 'bz2' : b'BZh', 'gzip' : b'\x1F\x8B'}
+stream_header_size = {'lzma' : 12, 'bz2' : 4, 'gzip' : 0}
+
+xz_footer_magic = b'YZ'
+bz2_block_magic = 0x314159265359
+bz2_end_of_stream_magic = 0x177245385090
+bz2_end_of_stream_bits = 40 # the first 5 bytes of the end of stream magic, the bz2 decompressor then waits for the 6th
+
+read_size = 64 * 1024
+snapshot_step = 16 * 1024 * 1024
+
+def bit_patterns(magic):
+    '''
+    returns for each bit shift (0..7) of the 48 bit magic (MSB first) a tuple (shift, core, value),
+    where core are the 5 bytes that are fully covered by the magic if it starts on that bit of a byte.
+    '''
+    retval = []
+    for shift in range(8):
+        value = magic << (8 - shift)
+        retval.append((shift, value.to_bytes(7, 'big')[1:6], magic))
+    return retval
+
+bz2_block_patterns = bit_patterns(bz2_block_magic)
+bz2_end_of_stream_patterns = bit_patterns(bz2_end_of_stream_magic)
+
+def find_bit_patterns(data, patterns, base=0):
+    '''
+    returns the (sorted) bit offsets (+ base bits) in data where one of the bit_patterns starts.
+    '''
+    retval = []
+    mask = (1 << 48) - 1
+    for shift, core, magic in patterns:
+        position = data.find(core, 1)
+        while position != -1:
+            start = position - 1
+            window = data[start:start + 7]
+            if len(window) == 7 or (shift == 0 and len(window) == 6):
+                value = int.from_bytes(window.ljust(7, b'\x00'), 'big')
+                if (value >> (8 - shift)) & mask == magic:
+                    retval.append(base + start * 8 + shift)
+            position = data.find(core, position + 1)
+    return sorted(retval)
+
+def varint(data, position):
+    '''
+    decodes the xz multibyte integer at position in data, returns (value, next position)
+    '''
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80 == 0:
+            return value, position
+        shift += 7
+
+def xz_checkpoints(fd, size):
+    '''
+    returns the checkpoints (a dictionary, see seekable_file) of the xz file behind fd (of size bytes),
+    from the index of every stream (starting at the back of the file), and the uncompressed size.
+    '''
+    streams = []
+    end = size
+    while end > 0:
+        fd.seek(end - 4)
+        while end >= 16 and fd.read(4) == b'\x00\x00\x00\x00': # stream padding
+            end -= 4
+            fd.seek(end - 4)
+        fd.seek(end - 12)
+        footer = fd.read(12)
+        if len(footer) != 12 or footer[10:12] != xz_footer_magic:
+            raise Exception("no xz stream footer @ %s" % (end - 12))
+        index_size = (struct.unpack_from('<I', footer, 4)[0] + 1) * 4
+        index_start = end - 12 - index_size
+        fd.seek(index_start)
+        index = fd.read(index_size)
+        if len(index) != index_size or index[0] != 0:
+            raise Exception("no xz stream index @ %s" % index_start)
+        records, position = varint(index, 1)
+        blocks = []
+        for _ in range(records):
+            unpadded_size, position = varint(index, position)
+            uncompressed_size, position = varint(index, position)
+            blocks.append((-(-unpadded_size // 4) * 4, uncompressed_size))
+        stream_start = index_start - sum([block[0] for block in blocks]) - 12
+        if stream_start < 0:
+            raise Exception("xz stream @ %s before the start of the file" % stream_start)
+        streams.insert(0, (stream_start, index_start, blocks))
+        end = stream_start
+    checkpoints = {}
+    uncompressed = 0
+    for stream_start, index_start, blocks in streams:
+        if uncompressed not in checkpoints:
+            checkpoints[uncompressed] = (stream_start * 8, 0, stream_start)
+        block_start = stream_start + 12
+        for number, (compressed_size, uncompressed_size) in enumerate(blocks):
+            if number != 0 and uncompressed not in checkpoints:
+                checkpoints[uncompressed] = (block_start * 8, index_start * 8, stream_start)
+            block_start += compressed_size
+            uncompressed += uncompressed_size
+    return checkpoints, uncompressed
+
+def compression_of_file(FileName):
+    '''
+    returns the (supported) compression of FileName ('lzma', 'bz2' or 'gzip') or None
+    '''
+    ext = extension_from_magic_number_in_file(FileName, list(compressions))
+    if len(ext) != 1:
+        return None
+    return compressions[ext[0]]
+
+class seekable_file(object):
+    '''
+    A (binary, read-only) file object on the uncompressed contents of the compressed FileName
+    that seeks from the nearest checkpoint on (see the module documentation).
+
+    checkpoints (optional) are the ones of a previous seekable_file on FileName (see checkpoint_table).
+    '''
+    def __init__(self, FileName, checkpoints=None):
+        self.name = FileName
+        self.compression = compression_of_file(FileName)
+        if self.compression == None:
+            raise Exception("'%s' is not a (supported) compressed file" % FileName)
+        self.fd = open(FileName, 'rb')
+        self.size = None # uncompressed, known once the end is reached
+        self.checkpoints = {} # uncompressed offset : (compressed start, compressed end, header offset)
+        self.snapshots = {}   # uncompressed offset : (compressed position, member start, decompressor)
+        if checkpoints is not None:
+            for offset, start, end, header in checkpoints:
+                self.checkpoints[int(offset)] = (int(start), int(end), int(header))
+        elif self.compression == 'lzma':
+            try:
+                self.checkpoints, self.size = xz_checkpoints(self.fd, os.fstat(self.fd.fileno()).st_size)
+            except Exception: # not (yet) a complete xz file, find the streams while reading
+                self.checkpoints = {}
+        if 0 not in self.checkpoints:
+            self.checkpoints[0] = (0, 0, 0)
+        self.keys = sorted(self.checkpoints)
+        self.snapshot_keys = []
+        self.offset = 0
+        self._start(0, self.checkpoints[0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self.fd != None:
+            self.fd.close()
+            self.fd = None
+        self.decoder = None
+        self.buffer = b''
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.offset
+
+    def seek(self, offset, whence=0):
+        if whence == 0:
+            self.offset = offset
+        elif whence == 1:
+            self.offset += offset
+        elif whence == 2:
+            self.offset = self._size() + offset
+        else:
+            raise ValueError("seek : invalid whence (%s)" % whence)
+        if self.offset < 0:
+            raise ValueError("seek : negative offset (%s)" % self.offset)
+        return self.offset
+
+    def read(self, size=-1):
+        '''
+        returns size bytes from the current offset on (less at the end of the file), all if size is negative
+        '''
+        if self.fd == None:
+            raise ValueError("read from a closed file")
+        if size == None or size < 0:
+            size = None
+        if not (self.buffer_offset <= self.offset <= self.buffer_offset + len(self.buffer)):
+            self._reposition(self.offset)
+        parts = []
+        while size == None or size > 0:
+            start = self.offset - self.buffer_offset
+            if start < len(self.buffer):
+                if size == None:
+                    part = self.buffer[start:]
+                else:
+                    part = self.buffer[start:start + size]
+                    size -= len(part)
+                parts.append(part)
+                self.offset += len(part)
+            elif not self._advance():
+                break
+        return b''.join(parts)
+
+    def checkpoint_table(self):
+        '''
+        returns the (persistent) checkpoints as a numpy array (uint64) with one row per checkpoint :
+            (uncompressed offset, compressed start (bits), compressed end (bits), header offset)
+        '''
+        table = np.zeros((len(self.keys), 4), dtype=np.uint64)
+        for row, offset in enumerate(self.keys):
+            table[row] = (offset,) + self.checkpoints[offset]
+        return table
+
+    def _size(self):
+        if self.size == None: # decompress from the last known checkpoint to the end
+            self._reposition(self.keys[-1])
+            while self._advance():
+                pass
+        return self.size
+
+    def _new_decoder(self):
+        if self.compression == 'lzma':
+            return lzma.LZMADecompressor()
+        elif self.compression == 'bz2':
+            return bz2.BZ2Decompressor()
+        return zlib.decompressobj(wbits=31)
+
+    def _decompress(self, data):
+        '''
+        decompresses data, and drains the decompressor (it might hold on to output when all input is consumed)
+        '''
+        output = [self.decoder.decompress(data)]
+        while not self.decoder.eof:
+            more = self.decoder.decompress(b'')
+            if not more:
+                break
+            output.append(more)
+        return b''.join(output)
+
+    def _deliver(self, output):
+        self.buffer_offset += len(self.buffer)
+        self.buffer = output
+
+    def _add_checkpoint(self, offset, checkpoint):
+        if offset not in self.checkpoints:
+            self.checkpoints[offset] = checkpoint
+            bisect.insort(self.keys, offset)
+
+    def _start(self, offset, checkpoint):
+        '''
+        (re)starts decompressing at the checkpoint for the uncompressed offset
+        '''
+        start, end, header = checkpoint
+        self.decoder = self._new_decoder()
+        self.buffer_offset = offset
+        self.buffer = b''
+        self.candidates = []
+        self.member_start = header
+        if start == header * 8:
+            self.run = 'member'
+            self.position = header
+            self.tail = b''
+            self.found = header * 8
+        else:
+            if self.compression == 'bz2':
+                end += bz2_end_of_stream_bits
+            self.run = 'segment'
+            self.fd.seek(header)
+            self.feed = self._bits(start, end)
+            self._deliver(self._decompress(self.fd.read(stream_header_size[self.compression])))
+
+    def _resume(self, offset, snapshot):
+        '''
+        resumes decompressing from the (gzip) snapshot for the uncompressed offset
+        '''
+        position, member_start, decoder = snapshot
+        self.decoder = decoder.copy()
+        self.buffer_offset = offset
+        self.buffer = b''
+        self.candidates = []
+        self.member_start = member_start
+        self.run = 'member'
+        self.position = position
+        self.tail = b''
+        self.found = position * 8
+
+    def _reposition(self, offset):
+        '''
+        makes sure the decompression continues before (or at) offset, from the nearest checkpoint (or snapshot),
+        unless the current decompression is already closer.
+        '''
+        best = self.keys[bisect.bisect_right(self.keys, offset) - 1]
+        snapshot = None
+        position = bisect.bisect_right(self.snapshot_keys, offset) - 1
+        if position >= 0 and self.snapshot_keys[position] > best:
+            snapshot = self.snapshot_keys[position]
+        produced = self.buffer_offset + len(self.buffer)
+        if self.buffer_offset <= offset and produced >= max(best, snapshot or 0):
+            return
+        if snapshot != None:
+            self._resume(snapshot, self.snapshots[snapshot])
+        else:
+            self._start(best, self.checkpoints[best])
+
+    def _bits(self, start, end):
+        '''
+        generator of the compressed data from bit start up to bit end (MSB first,
+        shifted to start on a byte boundary, the last byte is completed with the bits after end)
+        '''
+        position = start // 8
+        shift = start % 8
+        last = -(-end // 8)
+        while position < last:
+            self.fd.seek(position)
+            size = min(read_size, last - position)
+            data = self.fd.read(size + (1 if shift else 0))
+            if not data:
+                return
+            size = min(size, len(data))
+            if shift:
+                value = int.from_bytes(data, 'big') << shift
+                data = (value & ((1 << (8 * len(data))) - 1)).to_bytes(len(data), 'big')[:size]
+            yield data
+            position += size
+
+    def _advance(self):
+        '''
+        decompresses the next piece (that becomes the buffer), returns False at the end of the file.
+        '''
+        if self.run == 'member':
+            return self._advance_member()
+        elif self.run == 'segment':
+            return self._advance_segment()
+        return False
+
+    def _advance_segment(self):
+        data = next(self.feed, None)
+        if data != None:
+            self._deliver(self._decompress(data))
+            return True
+        offset = self.buffer_offset + len(self.buffer)
+        if offset in self.checkpoints: # the start of the next stream
+            start, end, header = self.checkpoints[offset]
+            if start == header * 8:
+                self._start(offset, self.checkpoints[offset])
+                return True
+        self._end(offset)
+        return False
+
+    def _advance_member(self):
+        if self.decoder == None and not self._next_member():
+            return False
+        self.fd.seek(self.position)
+        data = self.fd.read(read_size)
+        if not data: # truncated (or still being written), the next read continues from here
+            self._reached(self.buffer_offset + len(self.buffer))
+            return False
+        cuts = []
+        if self.compression == 'bz2': # feed up to (and including) the first byte of every block magic
+            for bit in find_bit_patterns(self.tail + data, bz2_block_patterns, (self.position - len(self.tail)) * 8):
+                if bit > self.found:
+                    self.found = bit
+                    cuts.append(bit)
+            self.tail = data[-7:]
+        produced = self.buffer_offset + len(self.buffer)
+        output = []
+        fed = 0
+        for bit in cuts + [None]:
+            if bit == None:
+                piece = data[fed:]
+            else:
+                piece = data[fed:max(fed, bit // 8 + 1 - self.position)]
+            if len(piece) != 0:
+                output.append(self._decompress(piece))
+                produced += len(output[-1])
+                fed += len(piece)
+            if bit != None and bit != self.member_start * 8 + 32: # not the first block
+                self.candidates.append((bit, produced))
+            if self.decoder.eof:
+                break
+        self.position += fed
+        if self.decoder.eof:
+            self.position -= len(self.decoder.unused_data)
+            self._deliver(b''.join(output))
+            self._end_of_member(produced)
+            return True
+        if self.compression == 'gzip' and produced // snapshot_step != (produced - sum(map(len, output))) // snapshot_step:
+            if produced not in self.snapshots:
+                self.snapshots[produced] = (self.position, self.member_start, self.decoder.copy())
+                bisect.insort(self.snapshot_keys, produced)
+        self._deliver(b''.join(output))
+        return True
+
+    def _end_of_member(self, offset):
+        '''
+        the stream (or member) ends at self.position, with the uncompressed offset
+        commits the bz2 blocks, and continues with the next stream (if any)
+        '''
+        if self.compression == 'bz2':
+            start = max(self.member_start, self.position - 11)
+            self.fd.seek(start)
+            ends = find_bit_patterns(self.fd.read(self.position - start), bz2_end_of_stream_patterns, start * 8)
+            if len(ends) != 0:
+                for bit, block_offset in self.candidates:
+                    if bit < ends[-1] and block_offset < offset:
+                        self._add_checkpoint(block_offset, (bit, ends[-1], self.member_start))
+        self.candidates = []
+        self.decoder = None
+        self._next_member()
+
+    def _next_member(self):
+        '''
+        looks for the next stream (or member) from self.position on (after the padding),
+        returns True if it is there, False if not (yet, the file might still be growing)
+        '''
+        offset = self.buffer_offset + len(self.buffer)
+        self.fd.seek(self.position)
+        data = self.fd.read(read_size)
+        padding = len(data) - len(data.lstrip(b'\x00'))
+        while padding == len(data) and len(data) != 0:
+            self.position += padding
+            data = self.fd.read(read_size)
+            padding = len(data) - len(data.lstrip(b'\x00'))
+        self.position += padding
+        magic = stream_magic[self.compression]
+        if len(data) - padding < len(magic) and magic.startswith(data[padding:]):
+            self._reached(offset)
+            return False
+        if not data[padding:].startswith(magic):
+            self._end(offset)
+            return False
+        self._add_checkpoint(offset, (self.position * 8, 0, self.position))
+        self.decoder = self._new_decoder()
+        self.member_start = self.position
+        self.tail = b''
+        self.found = self.position * 8
+        return True
+
+    def _reached(self, offset):
+        if self.size == None or offset > self.size:
+            self.size = offset
+
+    def _end(self, offset):
+        self.run = None
+        self._reached(offset)